@@ -1,9 +1,18 @@
 import os
 
+import redis
 from celery import Celery, Task
 from flask import Flask
 from ._version import __version__
 from .main import main as main_blueprint
+from .result_store import RESULT_STORE_MAX_BYTES, ResultStore
+from .results_cache import (
+    RESULTS_CACHE_MAX_BYTES,
+    RESULTS_CACHE_TTL,
+    RESULTS_CACHE_USER_MAX_BYTES,
+    ResultsCache,
+    SharedResultsCache,
+)
 
 
 # create app config
@@ -26,8 +35,32 @@ def create_app():
     }
     app.config.from_prefixed_env()
 
-    # initialize in-memory cache
-    app.TEMP_RESULTS_CACHE = {}
+    # initialize the results cache (LRU with TTL expiry and byte budgets), backed by
+    # Redis so results are shared across worker processes; set
+    # FLASK_RESULTS_CACHE_REDIS_URL="" to keep results in process memory only
+    cache_limits = dict(
+        max_bytes=int(app.config.get("RESULTS_CACHE_MAX_BYTES", RESULTS_CACHE_MAX_BYTES)),
+        user_max_bytes=int(app.config.get("RESULTS_CACHE_USER_MAX_BYTES", RESULTS_CACHE_USER_MAX_BYTES)),
+        ttl=int(app.config.get("RESULTS_CACHE_TTL", RESULTS_CACHE_TTL)),
+    )
+    redis_url = app.config.get("RESULTS_CACHE_REDIS_URL", app.config["CELERY"]["broker_url"])
+    if redis_url:
+        client = redis.Redis.from_url(redis_url, socket_connect_timeout=1, socket_timeout=5)
+        app.TEMP_RESULTS_CACHE = SharedResultsCache(client, **cache_limits)
+    else:
+        app.TEMP_RESULTS_CACHE = ResultsCache(**cache_limits)
+
+    # initialize the persistent result store so computed metrics survive restarts;
+    # set FLASK_RESULT_STORE_PATH="" to disable it
+    store_path = app.config.get("RESULT_STORE_PATH", os.path.join(app.root_path, "data", "results.sqlite3"))
+    if store_path:
+        app.RESULT_STORE = ResultStore(
+            store_path,
+            version=__version__,
+            max_bytes=int(app.config.get("RESULT_STORE_MAX_BYTES", RESULT_STORE_MAX_BYTES)),
+        )
+    else:
+        app.RESULT_STORE = None
 
     celery_init_app(app)
     app.register_blueprint(
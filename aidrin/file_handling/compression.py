@@ -0,0 +1,96 @@
+import bz2
+import gzip
+import io
+import lzma
+
+# Notes:
+# Compressed uploads are kept compressed on disk. The compression is detected
+# from the file's leading magic bytes (not its name), and text readers
+# decompress the stream while they parse it. zstd support needs the optional
+# 'zstandard' package (pip install aidrin[zstd]).
+
+# magic bytes -> compression name (the names pandas accepts for `compression`)
+COMPRESSION_MAGIC = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "xz",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+MAGIC_LENGTH = max(len(magic) for magic in COMPRESSION_MAGIC)
+
+
+def detect_compression(file_path):
+    """
+
+    Detects the compression of a file from its magic bytes.
+
+    Parameters
+    ----------
+    file_path: str
+        relative or absolute path of the file.
+    Returns
+    ----------
+    str or None
+    "gzip", "bz2", "xz" or "zstd", None for an uncompressed file.
+    """
+    with open(file_path, "rb") as f:
+        head = f.read(MAGIC_LENGTH)
+    for magic, compression in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def _open_zstd(file_path):
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError(
+            "zstd-compressed uploads need the 'zstandard' package (pip install aidrin[zstd])."
+        )
+    return zstandard.ZstdDecompressor().stream_reader(open(file_path, "rb"), closefd=True)
+
+
+def open_binary(file_path):
+    """
+
+    Opens a file for reading, decompressing it on the fly if it is compressed.
+
+    Parameters
+    ----------
+    file_path: str
+        relative or absolute path of the file.
+    Returns
+    ----------
+    file-like
+    Binary stream of the (decompressed) contents.
+    """
+    compression = detect_compression(file_path)
+    if compression == "gzip":
+        return gzip.open(file_path, "rb")
+    if compression == "bz2":
+        return bz2.open(file_path, "rb")
+    if compression == "xz":
+        return lzma.open(file_path, "rb")
+    if compression == "zstd":
+        return _open_zstd(file_path)
+    return open(file_path, "rb")
+
+
+def open_text(file_path, encoding=None):
+    """
+
+    Opens a file as text, decompressing it on the fly if it is compressed.
+
+    Parameters
+    ----------
+    file_path: str
+        relative or absolute path of the file.
+    encoding: str or None
+        text encoding, the platform default if None (as with open()).
+    Returns
+    ----------
+    file-like
+    Text stream of the (decompressed) contents.
+    """
+    return io.TextIOWrapper(open_binary(file_path), encoding=encoding)
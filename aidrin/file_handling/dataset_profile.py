@@ -0,0 +1,190 @@
+import json
+import math
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from aidrin.file_handling.snapshot import content_hash
+
+# Notes:
+# A dataset profile is a small JSON sidecar stored next to an upload and named
+# after its content hash. It holds what the feature-set and summary-statistics
+# views need (column kinds, null counts, distinct counts, min/max, row count,
+# formatted describe() output), so those views do not re-parse the dataset.
+
+PROFILE_SUFFIX = "_profile.json"
+# bump when the profile layout changes so stale sidecars are rebuilt
+PROFILE_VERSION = 1
+
+
+def profile_path(file_path, reader_name):
+    """
+
+    Returns the profile sidecar location for a file parsed with a given reader.
+
+    Parameters
+    ----------
+    file_path: str
+        relative or absolute path of the uploaded file.
+    reader_name: str
+        name of the reader class used to parse the file.
+    Returns
+    ----------
+    str
+    Path of the profile sidecar.
+    """
+    profile_name = f"{content_hash(file_path)}_{reader_name}{PROFILE_SUFFIX}"
+    return os.path.join(os.path.dirname(os.path.abspath(file_path)), profile_name)
+
+
+def _json_value(value):
+    # numpy scalars -> Python values, NaN -> None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def column_kind(dtype):
+    """
+
+    Classifies a column dtype the way the feature lists do.
+
+    Returns
+    ----------
+    str
+    "numerical", "categorical" or "other".
+    """
+    if pd.api.types.is_numeric_dtype(dtype):
+        return "numerical"
+    if pd.api.types.is_object_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype):
+        return "categorical"
+    return "other"
+
+
+def summary_statistics(df):
+    """
+
+    Formats df.describe() for the summary statistics view.
+
+    Returns
+    ----------
+    dict
+    {column: {statistic: value}} with percentiles renamed to "25th percentile" etc.
+    """
+    stats = df.describe().applymap(
+        lambda x: f"{x:.2e}" if abs(x) < 0.001 else round(x, 2)
+    ).to_dict()
+
+    for v in stats.values():
+        for old_key in v:
+            if old_key in ["25%", "50%", "75%"]:
+                new_key = old_key.replace("%", "th percentile")
+                v[new_key] = v.pop(old_key)
+    return stats
+
+
+def build_profile(df):
+    """
+
+    Computes the profile of a parsed dataset.
+
+    Parameters
+    ----------
+    df: pd.DataFrame
+        parsed data.
+    Returns
+    ----------
+    dict
+    JSON-serializable profile.
+    """
+    columns = []
+    for name, series in df.items():
+        kind = column_kind(series.dtype)
+        column = {
+            "name": _json_value(name),
+            "dtype": str(series.dtype),
+            "kind": kind,
+            "null_count": int(series.isna().sum()),
+            "nunique": int(series.nunique()),
+            "min": None,
+            "max": None,
+        }
+        if kind == "numerical" and not pd.api.types.is_bool_dtype(series.dtype):
+            column["min"] = _json_value(series.min())
+            column["max"] = _json_value(series.max())
+        columns.append(column)
+
+    try:
+        stats = summary_statistics(df)
+    except Exception:
+        # e.g. no numerical columns; the view reports the error from the dataset itself
+        stats = None
+
+    return {
+        "version": PROFILE_VERSION,
+        "records_count": len(df),
+        "features_count": len(df.columns),
+        "columns": columns,
+        "summary_statistics": stats,
+    }
+
+
+def load_profile(path):
+    """
+
+    Loads a profile sidecar.
+
+    Parameters
+    ----------
+    path: str
+        path of the profile sidecar.
+    Returns
+    ----------
+    dict or None
+    Profile, None if no usable sidecar exists.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            profile = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if profile.get("version") != PROFILE_VERSION:
+        return None
+    return profile
+
+
+def write_profile(profile, path, logger):
+    """
+
+    Writes a profile sidecar under a temporary name and renames it into place.
+
+    Parameters
+    ----------
+    profile: dict
+        profile to store.
+    path: str
+        path of the profile sidecar.
+    logger: logging.Logger
+        logger used to report failures.
+    Returns
+    ----------
+    bool
+    True if the sidecar was written.
+    """
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(profile, f, default=_json_value)
+        os.replace(tmp_path, path)
+        return True
+    except Exception as e:
+        logger.warning(f"Unable to write dataset profile: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
@@ -1,11 +1,19 @@
 import logging
 import os
 
+import pandas as pd
+
+from aidrin.file_handling.compression import detect_compression
+from aidrin.file_handling.dataset_profile import build_profile, load_profile, profile_path, write_profile
 from aidrin.file_handling.readers.csv_reader import csvReader
 from aidrin.file_handling.readers.excel_reader import excelReader
+from aidrin.file_handling.readers.feather_reader import featherReader
 from aidrin.file_handling.readers.hdf5_reader import hdf5Reader
 from aidrin.file_handling.readers.json_reader import jsonReader
 from aidrin.file_handling.readers.npz_reader import npzReader
+from aidrin.file_handling.readers.orc_reader import orcReader
+from aidrin.file_handling.readers.parquet_reader import parquetReader
+from aidrin.file_handling.snapshot import load_snapshot, snapshot_path, write_snapshot
 
 # Notes:
 # To add support for new file types:
@@ -17,10 +25,13 @@ from aidrin.file_handling.readers.npz_reader import npzReader
 # Reader Map. Used to create file type specific parsing
 READER_MAP = {
     ".csv": csvReader,
-    ".npz": npzReader,
+    ".npz, .npy": npzReader,
     ".xls, .xlsb, .xlsx, .xlsm": excelReader,
     ".json": jsonReader,
     ".h5": hdf5Reader,
+    ".parquet": parquetReader,
+    ".feather, .arrow": featherReader,
+    ".orc": orcReader,
     # Add additional file types here
 }
 
@@ -29,8 +40,11 @@ SUPPORTED_FILE_TYPES = [
     (".csv", "CSV"),
     (".xls, .xlsb, .xlsx, .xlsm", "Excel"),
     (".json", "JSON"),
-    (".npz", "NumPy"),
+    (".npz, .npy", "NumPy"),
     (".h5", "HDF5"),
+    (".parquet", "Parquet"),
+    (".feather, .arrow", "Feather / Arrow IPC"),
+    (".orc", "ORC"),
     # Add additional file types here using the format:
     # (file_type,file_type_name)
 ]
@@ -38,6 +52,11 @@ SUPPORTED_FILE_TYPES = [
 # logger config
 file_upload_time_log = logging.getLogger("file_upload")
 
+# Load-time dtype optimization applied to every DataFrame read_file returns
+OPTIMIZE_DTYPES = True
+# string columns with at most this share of distinct values become categorical
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
 
 def parse_file(file_info):
     """
@@ -96,6 +115,9 @@ def filter_file(file_info, kept_keys):
             file_path, file_upload_time_log
         ).filter(kept_keys)
         file_upload_time_log.info(f"Filtered File saved to: {filtered_data_path}")
+        # profile the filtered file now, as for an upload
+        if isinstance(filtered_data_path, str) and os.path.exists(filtered_data_path):
+            profile_file((filtered_data_path, file_info[1], file_type))
     else:
         file_upload_time_log.warning(f"Unsupported file type: {file_type}")
         return None
@@ -106,7 +128,7 @@ def filter_file(file_info, kept_keys):
 # Parses the uploaded file into a pandas database
 
 
-def read_file(file_info):
+def read_file(file_info, columns=None):
     """
 
     Parses a given file into pandas Dataframe.
@@ -118,11 +140,20 @@ def read_file(file_info):
             -file_path: str, relative or absolute path of the file.
             -file_name: str, file name.
             -file_type: str, file format. Passed from front end select value.
+    columns: list or None
+        Column names to load. All columns are loaded if None; requested
+        columns that are not in the file are ignored.
     Returns
     ----------
     pd.Dataframe, None, or str
     Parsed data as a DataFrame, None if file is unsupported,
     or error message string if an exception occurs.
+
+    The first successful parse is stored as a columnar snapshot keyed by the
+    file's content hash; later calls load the snapshot instead of re-parsing.
+    Projected reads load only the requested columns, from the snapshot when
+    it exists and from the raw file otherwise. The returned DataFrame goes
+    through optimize_dtypes().
     """
     file_upload_time_log.info("File parsing initiated...")
 
@@ -140,8 +171,25 @@ def read_file(file_info):
     try:
         df = None
         if file_type in READER_MAP:
-            df = READER_MAP[file_type](file_path, file_upload_time_log).read()
+            reader = READER_MAP[file_type]
+            compression = detect_compression(file_path)
+            if compression and not reader.supports_compression:
+                file_upload_time_log.error(f"Compressed ({compression}) upload for a binary file type: {file_type}")
+                return f"{compression} compressed uploads are only supported for CSV and JSON files."
+            snapshot = snapshot_path(file_path, reader.__name__)
+            df = load_snapshot(snapshot, columns)
+            if df is not None:
+                file_upload_time_log.info("File loaded from columnar snapshot")
+                return optimize_dtypes(df) if OPTIMIZE_DTYPES else df
+            df = reader(file_path, file_upload_time_log).read(columns)
             file_upload_time_log.info("File successfully parsed!")
+            # optimized before the snapshot is written, so the snapshot stores
+            # categorical columns dictionary-encoded
+            if OPTIMIZE_DTYPES and df is not None:
+                df = optimize_dtypes(df)
+            # only a full parse is worth materializing as the snapshot
+            if columns is None and df is not None and write_snapshot(df, snapshot, file_upload_time_log):
+                file_upload_time_log.info(f"Columnar snapshot saved to: {snapshot}")
             # file_upload_time_log.info(df.to_string())
         else:
             file_upload_time_log.warning(f"Unsupported file type: {file_type}")
@@ -151,3 +199,102 @@ def read_file(file_info):
     except Exception as e:
         file_upload_time_log.error(f"Error while Reading File: {e}")
         return str(e)
+
+
+def profile_file(file_info):
+    """
+
+    Returns the dataset profile of a file (see dataset_profile.build_profile).
+    The profile is computed from the parsed file on first use and stored as
+    a JSON sidecar keyed by the file's content hash, so later calls only
+    load the sidecar.
+
+    Parameters
+    ----------
+    file_info: tuple
+        (file_path, file_name, file_type) where:
+            -file_path: str, relative or absolute path of the file.
+            -file_name: str, file name.
+            -file_type: str, file format. Passed from front end select value.
+    Returns
+    ----------
+    dict, None, or str
+    Profile as a dict, None if file is unsupported,
+    or error message string if the file cannot be read.
+    """
+    file_path, _, file_type = file_info
+    if file_type not in READER_MAP:
+        file_upload_time_log.warning(f"Unsupported file type: {file_type}")
+        return None
+    if not file_path or not os.path.exists(file_path):
+        return f"File not found: {file_path}"
+
+    path = profile_path(file_path, READER_MAP[file_type].__name__)
+    profile = load_profile(path)
+    if profile is not None:
+        return profile
+
+    df = read_file(file_info)
+    if not isinstance(df, pd.DataFrame):
+        return df
+    profile = build_profile(df)
+    if write_profile(profile, path, file_upload_time_log):
+        file_upload_time_log.info(f"Dataset profile saved to: {path}")
+    return profile
+
+
+def update_profile(file_info, profile):
+    """
+
+    Stores a profile extended by the caller (e.g. with rendered histograms)
+    back to the file's sidecar.
+
+    Parameters
+    ----------
+    file_info: tuple
+        (file_path, file_name, file_type), as for profile_file.
+    profile: dict
+        profile returned by profile_file.
+    """
+    file_path, _, file_type = file_info
+    if file_type in READER_MAP:
+        write_profile(profile, profile_path(file_path, READER_MAP[file_type].__name__), file_upload_time_log)
+
+
+def optimize_dtypes(df):
+    """
+
+    Reduces the memory footprint of a parsed DataFrame without changing its
+    values: string columns with few distinct values become categorical and
+    integer columns are downcast to the smallest integer type holding them.
+    Float columns are left alone, since computing in float32 would change
+    metric results.
+
+    Parameters
+    ----------
+    df: pd.DataFrame
+        parsed data, converted in place.
+    Returns
+    ----------
+    pd.DataFrame
+    The same DataFrame with optimized column dtypes.
+    """
+    before = df.memory_usage(deep=True).sum()
+    # positional access so duplicate column names are handled
+    for i in range(df.shape[1]):
+        series = df.iloc[:, i]
+        if pd.api.types.is_object_dtype(series.dtype):
+            # only pure string columns, so categories stay sortable; checked
+            # first since nunique() fails on unhashable values (e.g. HDF5 arrays)
+            if (
+                pd.api.types.infer_dtype(series, skipna=True) == "string"
+                and series.nunique() <= CATEGORY_MAX_UNIQUE_RATIO * len(series)
+            ):
+                df.isetitem(i, series.astype("category"))
+        elif pd.api.types.is_integer_dtype(series.dtype) and series.dtype.itemsize > 1:
+            df.isetitem(i, pd.to_numeric(series, downcast="integer"))
+    after = df.memory_usage(deep=True).sum()
+    file_upload_time_log.info(
+        f"Dtype optimization: {before / 1024 ** 2:.2f} MiB -> {after / 1024 ** 2:.2f} MiB"
+    )
+    return df
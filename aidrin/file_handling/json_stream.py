@@ -0,0 +1,292 @@
+import json
+import re
+
+# Notes:
+# JSONTokenStream walks a JSON document incrementally from a text file.
+# Containers are entered token by token, individual values are decoded with
+# the C-accelerated json decoder and values that are not needed are skipped
+# (or copied) without being kept, so neither the file nor the full parsed
+# document is ever held in memory.
+
+READ_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# characters that can continue a number
+_NUMBER_TAIL = re.compile(r"[-+.eE0-9]*")
+_DECODER = json.JSONDecoder()
+
+
+class JSONTokenStream:
+    def __init__(self, f, chunk_size=READ_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        # characters dropped from the front of the buffer, for error offsets
+        self.offset = 0
+        # buffer position that must be kept when the buffer is refilled
+        self.mark = None
+        self.eof = False
+
+    def _fill(self, size=None):
+        """
+
+        Appends the next chunk of the file to the buffer, dropping text that
+        has already been consumed.
+
+        Returns
+        ----------
+        bool
+        False once the end of the file is reached.
+        """
+        if self.eof:
+            return False
+        chunk = self.f.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        keep = self.pos if self.mark is None else self.mark
+        self.buf = self.buf[keep:] + chunk
+        self.pos -= keep
+        self.offset += keep
+        if self.mark is not None:
+            self.mark = 0
+        return True
+
+    def _error(self, message):
+        return ValueError(f"Invalid JSON at offset {self.offset + self.pos}: {message}")
+
+    def peek(self):
+        """
+
+        Skips whitespace and returns the next character without consuming it.
+
+        Returns
+        ----------
+        str
+        Next character, or an empty string at the end of the input.
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise self._error(f"expected '{char}'")
+        self.pos += 1
+
+    def read_value(self):
+        """
+
+        Decodes the next complete JSON value.
+
+        Returns
+        ----------
+        object
+        Decoded value.
+        """
+        if self.peek() == "":
+            raise self._error("unexpected end of input")
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if not self._fill(size):
+                    raise self._error(e.msg)
+                # grow the read size so long values are not re-decoded too often
+                size *= 2
+                continue
+            # a number cut off by the end of the buffer ("1." or "1e") decodes as a
+            # shorter number, so read on until a non-number character follows
+            if _NUMBER_TAIL.match(self.buf, end).end() == len(self.buf) and self._fill(size):
+                continue
+            self.pos = end
+            return value
+
+    def skip_value(self, out=None):
+        """
+
+        Moves past the next JSON value. Values that fit in the buffer are
+        scanned by the C decoder in one call; larger containers are walked
+        member by member so memory stays bounded by the buffer size.
+
+        Parameters
+        ----------
+        out: file-like or None
+            if given, the text of the value is written to it.
+        """
+        char = self.peek()
+        if char not in ("{", "["):
+            self.mark = self.pos
+            self.read_value()
+            if out is not None:
+                out.write(self.buf[self.mark:self.pos])
+            self.mark = None
+            return
+
+        # make sure at least half a chunk is buffered before trying the fast path
+        if len(self.buf) - self.pos < self.chunk_size // 2:
+            self._fill()
+        try:
+            _, end = _DECODER.raw_decode(self.buf, self.pos)
+        except json.JSONDecodeError:
+            # larger than the buffer (or invalid): walk the container
+            if char == "{":
+                self._skip_members(self.iter_object(), "{", "}", out)
+            else:
+                self._skip_members(self.iter_array(), "[", "]", out)
+            return
+        if out is not None:
+            out.write(self.buf[self.pos:end])
+        self.pos = end
+
+    def _skip_members(self, members, opening, closing, out):
+        if out is not None:
+            out.write(opening)
+        for i, key in enumerate(members):
+            if out is not None:
+                if i:
+                    out.write(", ")
+                if key is not None:
+                    out.write(f"{json.dumps(key)}: ")
+            self.skip_value(out)
+        if out is not None:
+            out.write(closing)
+
+    def iter_object(self):
+        """
+
+        Enters the object at the current position and yields its keys.
+        The caller must consume each member's value (read_value or
+        skip_value) before asking for the next key.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise self._error("expected an object key")
+            key = self.read_value()
+            self.expect(":")
+            yield key
+            char = self.peek()
+            self.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise self._error("expected ',' or '}'")
+
+    def iter_array(self):
+        """
+
+        Enters the array at the current position and yields once per item.
+        The caller must consume each item before the next one is reached.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise self._error("expected ',' or ']'")
+
+    def expect_end(self):
+        if self.peek() != "":
+            raise self._error("extra data after the JSON document")
+
+
+def iter_records(stream):
+    """
+
+    Yields every object that is an item of a list, walking nested objects
+    recursively. Lists nested directly in lists and non-object list items
+    are skipped.
+
+    Parameters
+    ----------
+    stream: JSONTokenStream
+        stream positioned at the start of a value.
+    Returns
+    ----------
+    generator of dict
+    """
+    char = stream.peek()
+    if char == "{":
+        for _ in stream.iter_object():
+            yield from iter_records(stream)
+    elif char == "[":
+        for _ in stream.iter_array():
+            if stream.peek() == "{":
+                yield stream.read_value()
+            else:
+                stream.skip_value()
+    else:
+        stream.skip_value()
+
+
+def object_keys(stream):
+    """
+
+    Lists the keys of the top-level object without decoding its values.
+
+    Parameters
+    ----------
+    stream: JSONTokenStream
+        stream positioned at the start of the document.
+    Returns
+    ----------
+    list or None
+    Keys in document order, None if the document is not an object.
+    """
+    if stream.peek() != "{":
+        return None
+    keys = []
+    for key in stream.iter_object():
+        keys.append(key)
+        stream.skip_value()
+    stream.expect_end()
+    # duplicate keys collapse to one entry, as with json.load
+    return list(dict.fromkeys(keys))
+
+
+def write_object_members(stream, out, kept_keys):
+    """
+
+    Writes an object holding only the kept top-level members. Kept values
+    are copied member by member without holding the document in memory,
+    in document order.
+
+    Parameters
+    ----------
+    stream: JSONTokenStream
+        stream positioned at the start of the document.
+    out: file-like
+        text file the filtered document is written to.
+    kept_keys: iterable of str
+        top-level keys to keep.
+    """
+    kept_keys = set(kept_keys)
+    written = set()
+    out.write("{")
+    if stream.peek() == "{":
+        for key in stream.iter_object():
+            if key in kept_keys and key not in written:
+                if written:
+                    out.write(",")
+                out.write(f"\n    {json.dumps(key)}: ")
+                stream.skip_value(out)
+                written.add(key)
+            else:
+                stream.skip_value()
+        stream.expect_end()
+    out.write("\n}" if written else "}")
@@ -6,11 +6,17 @@ below to add your own file parsing logic.
 
 
 class BaseFileReader:
+    # text formats set this to read gzip/bz2/xz/zstd compressed uploads
+    # through aidrin.file_handling.compression
+    supports_compression = False
+
     def __init__(self, file_path: str, logger):
         self.file_path = file_path
         self.logger = logger
 
-    def read(self):
+    # columns: optional list of column names to load, all columns if None.
+    # Names that are not present in the file are ignored.
+    def read(self, columns=None):
         raise NotImplementedError("Subclasses must implement the read() method.")
 
     # Optional method: parse hierarchical group identifiers
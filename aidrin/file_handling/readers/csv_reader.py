@@ -1,8 +1,179 @@
+import io
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+
 import pandas as pd
+from flask import current_app, has_app_context
 
+from aidrin.file_handling.compression import detect_compression, open_binary
 from aidrin.file_handling.readers.base_reader import BaseFileReader
 
+# Notes:
+# Large CSV files are parsed in parallel. The file is split into byte ranges
+# at line boundaries, each range is parsed by a worker with the column names
+# and string columns taken from a leading sample, and the parts are
+# concatenated in file order. A split is only valid outside quoted fields, so
+# the quote characters before every split point are counted and the file is
+# parsed in a single pass if a split landed inside a multi-line quoted field.
+# A column inferred as numeric from the sample can hold strings further down;
+# if the ranges disagree on such a column, the ranges are parsed again with it
+# read as strings, as a single-pass parse would.
+# The defaults below can be overridden through the app config
+# (e.g. FLASK_CSV_PARSE_WORKERS=8 in the environment).
+
+CSV_PARSE_WORKERS = os.cpu_count() or 1
+CSV_PARALLEL_MIN_BYTES = 64 * 1024 * 1024  # smaller files are parsed in one pass
+CSV_RANGE_BYTES = 64 * 1024 * 1024  # upper bound on the size of one byte range
+CSV_SAMPLE_ROWS = 10_000
+QUOTE_CHAR = b'"'
+
+
+def _parse_byte_range(file_path, start, end, names, dtype, usecols):
+    """
+
+    Parses the lines in [start, end) of a CSV file.
+
+    Returns
+    ----------
+    tuple
+    (DataFrame of the range, number of quote characters in the range)
+    """
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    df = pd.read_csv(
+        io.BytesIO(data),
+        header=None,
+        names=names,
+        index_col=False,
+        dtype=dtype,
+        usecols=usecols,
+    )
+    return df, data.count(QUOTE_CHAR)
+
+
+def _mixed_columns(frames):
+    """
+
+    Returns the columns whose dtype differs between the parsed ranges and is
+    not numeric in every range. Ranges that only disagree between integer
+    and float are upcast by concat, as in a single-pass parse.
+    """
+    mixed = []
+    for col in frames[0].columns:
+        dtypes = {df[col].dtype for df in frames}
+        if len(dtypes) > 1 and not all(
+            pd.api.types.is_numeric_dtype(d) and not pd.api.types.is_bool_dtype(d) for d in dtypes
+        ):
+            mixed.append(col)
+    return mixed
+
+
+def _config(name, default):
+    if has_app_context():
+        return current_app.config.get(name, default)
+    return default
+
 
 class csvReader(BaseFileReader):
-    def read(self):
-        return pd.read_csv(self.file_path, index_col=False)
+    supports_compression = True
+
+    def read(self, columns=None):
+        # callable usecols skips requested columns that are not in the file
+        usecols = None if columns is None else set(columns).__contains__
+        if detect_compression(self.file_path):
+            # compressed streams cannot be split into byte ranges
+            with open_binary(self.file_path) as f:
+                return pd.read_csv(f, index_col=False, usecols=usecols)
+
+        workers = int(_config("CSV_PARSE_WORKERS", CSV_PARSE_WORKERS))
+        min_bytes = int(_config("CSV_PARALLEL_MIN_BYTES", CSV_PARALLEL_MIN_BYTES))
+        if workers > 1 and os.path.getsize(self.file_path) >= min_bytes:
+            df = self._read_parallel(workers, columns)
+            if df is not None:
+                return df
+
+        return pd.read_csv(self.file_path, index_col=False, usecols=usecols)
+
+    def _split_points(self, data_start, file_size, workers):
+        # at least one range per worker, and no range above CSV_RANGE_BYTES
+        range_bytes = int(_config("CSV_RANGE_BYTES", CSV_RANGE_BYTES))
+        num_ranges = max(workers, math.ceil((file_size - data_start) / range_bytes))
+        step = (file_size - data_start) // num_ranges
+        bounds = [data_start]
+        with open(self.file_path, "rb") as f:
+            for i in range(1, num_ranges):
+                f.seek(data_start + i * step)
+                # move to the start of the next line
+                f.readline()
+                if bounds[-1] < f.tell() < file_size:
+                    bounds.append(f.tell())
+        bounds.append(file_size)
+        return bounds
+
+    def _read_parallel(self, workers, columns):
+        """
+
+        Parses the file as byte ranges in a pool of workers.
+
+        Returns
+        ----------
+        pd.DataFrame or None
+        Parsed data, None if the file cannot be split safely.
+        """
+        with open(self.file_path, "rb") as f:
+            header = f.readline()
+        if not header.strip():
+            return None
+        # leading sample: column names, and columns that must stay strings in every range
+        sample = pd.read_csv(self.file_path, index_col=False, nrows=CSV_SAMPLE_ROWS)
+        names = list(sample.columns)
+        usecols = None if columns is None else [col for col in names if col in columns]
+        dtype = {col: object for col, col_dtype in sample.dtypes.items() if col_dtype == object}
+
+        bounds = self._split_points(len(header), os.path.getsize(self.file_path), workers)
+        try:
+            parts = self._parse_ranges(bounds, workers, names, dtype, usecols)
+        except pd.errors.ParserError:
+            # a split inside a quoted field can leave a range unparseable
+            self.logger.info("CSV could not be split into byte ranges, parsing in a single pass")
+            return None
+
+        # every split point must be outside a quoted field
+        quotes = header.count(QUOTE_CHAR)
+        for _, range_quotes in parts:
+            if quotes % 2:
+                self.logger.info("CSV has multi-line quoted fields, parsing in a single pass")
+                return None
+            quotes += range_quotes
+
+        mixed = _mixed_columns([df for df, _ in parts])
+        if mixed:
+            self.logger.info(f"CSV columns with strings past the sample, parsing them as strings: {mixed}")
+            dtype.update({col: object for col in mixed})
+            parts = self._parse_ranges(bounds, workers, names, dtype, usecols)
+
+        self.logger.info(f"CSV parsed in {len(parts)} byte ranges with {workers} workers")
+        return pd.concat([df for df, _ in parts], ignore_index=True)
+
+    def _parse_ranges(self, bounds, workers, names, dtype, usecols):
+        # worker processes cannot be started from a daemon process (e.g. a Celery worker)
+        if multiprocessing.current_process().daemon:
+            executor_cls = ThreadPoolExecutor
+        else:
+            executor_cls = ProcessPoolExecutor
+        with executor_cls(max_workers=min(workers, len(bounds) - 1)) as pool:
+            return list(
+                pool.map(
+                    _parse_byte_range,
+                    repeat(self.file_path),
+                    bounds[:-1],
+                    bounds[1:],
+                    repeat(names),
+                    repeat(dtype),
+                    repeat(usecols),
+                )
+            )
@@ -4,5 +4,7 @@ from aidrin.file_handling.readers.base_reader import BaseFileReader
 
 
 class excelReader(BaseFileReader):
-    def read(self):
-        return pd.read_excel(self.file_path)
+    def read(self, columns=None):
+        # callable usecols skips requested columns that are not in the file
+        usecols = None if columns is None else set(columns).__contains__
+        return pd.read_excel(self.file_path, usecols=usecols)
@@ -0,0 +1,34 @@
+import pyarrow as pa
+
+from aidrin.file_handling.readers.base_reader import BaseFileReader
+
+
+def _open_ipc(source, columns=None):
+    """
+    Opens an Arrow IPC file (Feather v2) or, failing that, an IPC stream.
+    With columns, only the requested fields are read and decompressed.
+    """
+    try:
+        open_reader = pa.ipc.open_file
+        reader = open_reader(source)
+    except pa.ArrowInvalid:
+        source.seek(0)
+        open_reader = pa.ipc.open_stream
+        reader = open_reader(source)
+    if columns is None:
+        return reader
+    fields = [i for i, name in enumerate(reader.schema.names) if name in columns]
+    if not fields:
+        # an empty field list would read every field
+        return None
+    source.seek(0)
+    return open_reader(source, options=pa.ipc.IpcReadOptions(included_fields=fields))
+
+
+class featherReader(BaseFileReader):
+    def read(self, columns=None):
+        with pa.memory_map(self.file_path) as source:
+            reader = _open_ipc(source, columns)
+            if reader is None:
+                return pa.table({}).to_pandas()
+            return reader.read_all().to_pandas()
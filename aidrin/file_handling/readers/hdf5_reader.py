@@ -1,4 +1,5 @@
 import os
+import time
 import uuid
 
 import h5py
@@ -8,45 +9,80 @@ from flask import current_app, session
 from aidrin.file_handling.readers.base_reader import BaseFileReader
 
 
+def _decode_strings(values, dtype):
+    """
+    Decodes an array of HDF5 byte strings to str in one vectorized pass.
+    Fixed-length ("S") and variable-length string members are decoded;
+    every other array is returned unchanged.
+    """
+    if dtype.kind == "S" or h5py.check_string_dtype(dtype) is not None:
+        return pd.Series(values).str.decode("utf-8").to_numpy()
+    return values
+
+
+def _dataset_frame(dataset, columns=None):
+    """
+    Builds a DataFrame for one HDF5 dataset straight from its array.
+    Compound datasets produce one column per field, 1D and 2D arrays produce
+    integer-labelled columns and scalar datasets a single "value" column.
+    Returns None when none of the requested columns are in the dataset.
+    """
+    fields = dataset.dtype.names
+    if fields:
+        if columns is not None:
+            # read only the requested fields of a compound dataset
+            fields = [f for f in fields if f in columns]
+            if not fields:
+                return None
+            data = dataset.fields(fields)[()]
+        else:
+            data = dataset[()]
+        frame = {}
+        for field in fields:
+            values = _decode_strings(data[field], dataset.dtype.fields[field][0])
+            # array-valued fields are kept as one array per row
+            frame[field] = list(values) if values.ndim > 1 else values
+        return pd.DataFrame(frame)
+
+    data = dataset[()]
+    if data.ndim == 0:
+        # Scalar dataset
+        data = _decode_strings(data.reshape(1), dataset.dtype)
+        return pd.DataFrame({"value": data})
+    if data.ndim == 1:
+        return pd.DataFrame({0: _decode_strings(data, dataset.dtype)})
+    if data.ndim == 2:
+        return pd.DataFrame(
+            {i: _decode_strings(data[:, i], dataset.dtype) for i in range(data.shape[1])}
+        )
+    # higher dimensional arrays keep one sub-array per cell
+    return pd.DataFrame(list(data))
+
+
 class hdf5Reader(BaseFileReader):
-    def read(self):
+    def read(self, columns=None):
+        """
+        Reads every dataset in the file into one DataFrame, appending the
+        rows of each dataset in visit order. Groups are selected with
+        filter(), which writes the kept groups to a new file.
+        """
         try:
-            rows = []
-            # Clean up byte strings in all object columns
-
-            def decode_bytes(df):
-                for col in df.columns:
-                    if df[col].dtype == object:
-                        df[col] = df[col].apply(
-                            lambda x: x.decode("utf-8") if isinstance(x, bytes) else x
-                        )
-                return df
-
-            def recurse(name, obj, path=[]):
+            frames = []
+
+            def visit(name, obj):
                 if isinstance(obj, h5py.Dataset):
-                    data = obj[()]
-                    # If it's a 1D or structured dataset, load it into dicts
-                    if isinstance(data, (list, tuple)) or hasattr(data, "dtype"):
-                        try:
-                            df = pd.DataFrame(data)
-                        except Exception:
-                            df = pd.DataFrame(data.tolist())  # base
-                        for _, row in df.iterrows():
-                            row_dict = row.to_dict()
-                            rows.append(row_dict)
-                    else:
-                        # Scalar or flat dataset
-                        row_dict = {"value": data}
-                        rows.append(row_dict)
+                    frame = _dataset_frame(obj, columns)
+                    if frame is not None:
+                        frames.append(frame)
 
             with h5py.File(self.file_path, "r") as f:
-
-                def visit(name, obj):
-                    recurse(name, obj, name.strip("/").split("/"))
-
                 f.visititems(visit)
-            df = pd.DataFrame(rows)
-            df = decode_bytes(df)
+
+            if not frames:
+                return pd.DataFrame()
+            df = pd.concat(frames, ignore_index=True, sort=False)
+            if columns is not None:
+                df = df[[col for col in df.columns if col in columns]]
             return df
         except Exception as e:
             self.logger.error(f"Error while reading: {e}")
@@ -75,24 +111,38 @@ class hdf5Reader(BaseFileReader):
             f"filtered_{uuid.uuid4().hex}_{session.get('uploaded_file_name')}"
         )
         new_file_path = os.path.join(current_app.config["UPLOAD_FOLDER"], new_file_name)
+        start_time = time.time()
+        copied_bytes = 0
         with (
             h5py.File(self.file_path, "r") as src,
             h5py.File(new_file_path, "w") as tgt,
         ):
 
             def copy_group(path, src_group, tgt_group):
+                nonlocal copied_bytes
                 for name, obj in src_group.items():
                     full_path = f"{path}/{name}".strip("/")
                     if isinstance(obj, h5py.Group):
                         if full_path in kept_keys:
                             tgt_subgroup = tgt_group.create_group(name)
+                            tgt_subgroup.attrs.update(obj.attrs)
                             copy_group(full_path, obj, tgt_subgroup)
                         else:
                             copy_group(full_path, obj, tgt_group)
                     elif isinstance(obj, h5py.Dataset):
                         if path.strip("/") in kept_keys:
-                            tgt_group.create_dataset(name, data=obj[()])
+                            # native object copy: moves the stored (compressed) chunks
+                            # without loading the dataset, and keeps its chunk layout,
+                            # filters and attributes
+                            src_group.copy(obj, tgt_group, name=name)
+                            copied_bytes += obj.id.get_storage_size()
 
             copy_group("", src, tgt)
 
+        elapsed = time.time() - start_time
+        throughput = copied_bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+        self.logger.info(
+            f"Copied {copied_bytes} bytes of HDF5 datasets in {elapsed:.2f} seconds "
+            f"({throughput:.2f} MiB/s)"
+        )
         return new_file_path
@@ -1,59 +1,66 @@
-import json
 import os
 import uuid
 
 import pandas as pd
 from flask import current_app, session
 
+from aidrin.file_handling.compression import open_text
+from aidrin.file_handling.json_stream import (
+    JSONTokenStream,
+    iter_records,
+    object_keys,
+    write_object_members,
+)
 from aidrin.file_handling.readers.base_reader import BaseFileReader
 
+# records collected before they are converted into a DataFrame chunk
+RECORD_CHUNK_ROWS = 50_000
+
 
 class jsonReader(BaseFileReader):
-    def read(self):
-        # flatten data recursively (either dict or list)
-        def flatten_json(data):
-            rows = []
-            # recursively parse data to find low level lists
-
-            def recurse(obj, path=[]):
-                if isinstance(obj, dict):
-                    for key, val in obj.items():
-                        recurse(val, path + [key])
-                elif isinstance(obj, list):
-                    for item in obj:
-                        if isinstance(item, dict):
-                            row = item.copy()
-                            rows.append(row)
-
-            recurse(data)
-            return pd.DataFrame(rows)
-
-        with open(self.file_path) as f:
-            data = json.load(f)
-        df = flatten_json(data)
-        return df
+    supports_compression = True
+
+    def read(self, columns=None):
+        # flatten data recursively (either dict or list): every object found
+        # in a list becomes a row, streamed into DataFrame chunks
+        frames = []
+        rows = []
+        with open_text(self.file_path) as f:
+            stream = JSONTokenStream(f)
+            for item in iter_records(stream):
+                if columns is None:
+                    rows.append(item)
+                else:
+                    rows.append({k: v for k, v in item.items() if k in columns})
+                if len(rows) >= RECORD_CHUNK_ROWS:
+                    frames.append(pd.DataFrame(rows))
+                    rows = []
+            stream.expect_end()
+        if rows or not frames:
+            frames.append(pd.DataFrame(rows))
+        if len(frames) == 1:
+            return frames[0]
+        # columns that were all null in one chunk come back as object dtype
+        return pd.concat(frames, ignore_index=True).infer_objects()
 
     def parse(self):
-        with open(self.file_path) as f:
-            data = json.load(f)
+        with open_text(self.file_path) as f:
             # only parse hierarchical data
-            if isinstance(data, dict):
-                self.logger.info("Keys found: %s", data.keys())
-                return list(data.keys())
+            keys = object_keys(JSONTokenStream(f))
+        if keys is not None:
+            self.logger.info("Keys found: %s", keys)
+        return keys
 
     def filter(self, kept_keys):
-        with open(self.file_path) as f:
-            data = json.load(f)
         # fix str passing
         if isinstance(kept_keys, str):
             kept_keys = kept_keys.split(",")
-        # Only keep keys the user selected
-        filtered_data = {k: data[k] for k in kept_keys if k in data}
 
         new_file_name = (
             f"filtered_{uuid.uuid4().hex}_{session.get('uploaded_file_name')}"
         )
         new_file_path = os.path.join(current_app.config["UPLOAD_FOLDER"], new_file_name)
-        with open(new_file_path, "w") as f:
-            json.dump(filtered_data, f, indent=4)
+        # Only keep keys the user selected, copying their values without parsing them
+        with open_text(self.file_path) as src, open(new_file_path, "w") as tgt:
+            write_object_members(JSONTokenStream(src), tgt, kept_keys)
         return new_file_path
@@ -1,10 +1,130 @@
+import struct
+import zipfile
+
 import numpy as np
 import pandas as pd
 
 from aidrin.file_handling.readers.base_reader import BaseFileReader
 
+# Notes:
+# Members stored uncompressed in an .npz archive (np.savez) are memory-mapped
+# straight out of the zip file; compressed members (np.savez_compressed) and
+# object arrays are loaded normally. A 2-D member becomes numbered columns
+# "<key>_0", "<key>_1", ... that are views of the array, not copies.
+
+NPY_SUFFIX = ".npy"
+ZIP_LOCAL_HEADER_SIZE = 30
+
+
+def _stored_member_memmap(file_path, info):
+    """
+
+    Memory-maps an uncompressed .npy member of a zip archive.
+
+    Parameters
+    ----------
+    file_path: str
+        path of the .npz file.
+    info: zipfile.ZipInfo
+        member to map.
+    Returns
+    ----------
+    np.memmap or None
+    Mapped array, None if the member cannot be mapped.
+    """
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+    with open(file_path, "rb") as f:
+        # the member data starts after its local header, file name and extra field
+        f.seek(info.header_offset)
+        header = f.read(ZIP_LOCAL_HEADER_SIZE)
+        name_length, extra_length = struct.unpack("<HH", header[26:30])
+        f.seek(info.header_offset + ZIP_LOCAL_HEADER_SIZE + name_length + extra_length)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        elif version == (2, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        else:
+            return None
+        offset = f.tell()
+    if dtype.hasobject or not shape or 0 in shape:
+        return None
+    return np.memmap(
+        file_path,
+        dtype=dtype,
+        mode="r",
+        offset=offset,
+        shape=shape,
+        order="F" if fortran_order else "C",
+    )
+
+
+def _array_columns(key, array):
+    """
+
+    Splits an array into DataFrame columns. 2-D arrays become one numbered
+    column per array column, each a view into the array.
+    """
+    if array.ndim == 2 and array.shape[1] == 1:
+        return {key: array[:, 0]}
+    if array.ndim == 2:
+        return {f"{key}_{i}": array[:, i] for i in range(array.shape[1])}
+    if array.ndim > 2:
+        # Otherwise, store the whole array as a column of objects (fallback)
+        return {key: [row for row in array]}
+    return {key: array}
+
+
+def _is_requested(key, columns):
+    # a member is needed if it, or one of its numbered columns, was requested
+    if columns is None:
+        return True
+    prefix = f"{key}_"
+    return any(col == key or (isinstance(col, str) and col.startswith(prefix)) for col in columns)
+
 
 class npzReader(BaseFileReader):
-    def read(self):
+    def read(self, columns=None):
+        if self.file_path.endswith(NPY_SUFFIX):
+            arrays = self._read_npy()
+        else:
+            arrays = self._read_npz(columns)
+
+        data_dict = {}
+        for key, array in arrays:
+            data_dict.update(_array_columns(key, array))
+        df = pd.DataFrame(data_dict, copy=False)
+        if columns is not None:
+            df = df[[col for col in df.columns if col in columns]]
+        return df
+
+    def _read_npy(self):
+        # a single .npy array has no member name
+        key = "array"
+        try:
+            return [(key, np.load(self.file_path, mmap_mode="r"))]
+        except ValueError:
+            # object arrays cannot be memory-mapped
+            return [(key, np.load(self.file_path, allow_pickle=True))]
+
+    def _read_npz(self, columns):
+        arrays = []
         npz_data = np.load(self.file_path, allow_pickle=True)
-        return pd.DataFrame({key: npz_data[key] for key in npz_data.files})
+        with npz_data, zipfile.ZipFile(self.file_path) as archive:
+            # only load the requested members
+            members = {
+                name[: -len(NPY_SUFFIX)]: archive.getinfo(name)
+                for name in archive.namelist()
+                if name.endswith(NPY_SUFFIX)
+            }
+            for key in npz_data.files:
+                if not _is_requested(key, columns):
+                    continue
+                array = None
+                if key in members:
+                    array = _stored_member_memmap(self.file_path, members[key])
+                if array is None:
+                    array = npz_data[key]
+                arrays.append((key, array))
+        return arrays
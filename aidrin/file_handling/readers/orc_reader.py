@@ -0,0 +1,15 @@
+import pyarrow.orc as orc
+
+from aidrin.file_handling.readers.base_reader import BaseFileReader
+
+
+class orcReader(BaseFileReader):
+    def read(self, columns=None):
+        orc_file = orc.ORCFile(self.file_path)
+        return orc_file.read(columns=self._projection(orc_file, columns)).to_pandas()
+
+    def _projection(self, orc_file, columns):
+        # requested columns that are not in the file are ignored
+        if columns is None:
+            return None
+        return [name for name in orc_file.schema.names if name in columns]
@@ -0,0 +1,16 @@
+import pyarrow.parquet as pq
+
+from aidrin.file_handling.readers.base_reader import BaseFileReader
+
+
+class parquetReader(BaseFileReader):
+    def read(self, columns=None):
+        # only the requested column chunks are read from each row group
+        return pq.read_table(self.file_path, columns=self._projection(columns)).to_pandas()
+
+    def _projection(self, columns):
+        # requested columns that are not in the file are ignored
+        if columns is None:
+            return None
+        schema = pq.read_schema(self.file_path)
+        return [name for name in schema.names if name in columns]
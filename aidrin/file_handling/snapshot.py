@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# Notes:
+# A snapshot is an uncompressed Arrow IPC (Feather v2) copy of a parsed upload.
+# It lives next to the upload in UPLOAD_FOLDER and is named after the upload's
+# content hash, so every later read memory-maps the columnar copy instead of
+# re-parsing the raw CSV/Excel/JSON/HDF5 file.
+# Arrow only stores string column names, so frames with other labels (e.g. the
+# integer columns of a 2-D HDF5 dataset) are stored under the labels' string
+# form and the original labels are restored from the schema metadata on load.
+
+SNAPSHOT_EXTENSION = ".feather"
+HASH_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+# schema metadata key holding [stored name, original label] pairs
+COLUMN_LABELS_KEY = b"aidrin_column_labels"
+
+# (path, size, mtime) -> content hash, so each process hashes a file only once;
+# least recently used first, bounded so long-running workers do not grow it forever
+HASH_MEMO_SIZE = 1024
+_HASH_MEMO = OrderedDict()
+
+
+def _memoize_hash(memo_key, digest):
+    _HASH_MEMO[memo_key] = digest
+    _HASH_MEMO.move_to_end(memo_key)
+    while len(_HASH_MEMO) > HASH_MEMO_SIZE:
+        _HASH_MEMO.popitem(last=False)
+    return digest
+
+
+def content_hash(file_path):
+    """
+
+    Computes the SHA-256 content hash of a file, streaming it in chunks.
+
+    Parameters
+    ----------
+    file_path: str
+        relative or absolute path of the file.
+    Returns
+    ----------
+    str
+    Hex digest of the file contents.
+    """
+    stat = os.stat(file_path)
+    memo_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    if memo_key in _HASH_MEMO:
+        _HASH_MEMO.move_to_end(memo_key)
+        return _HASH_MEMO[memo_key]
+
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return _memoize_hash(memo_key, digest.hexdigest())
+
+
+def remember_content_hash(file_path, digest):
+    """
+
+    Records the content hash of a file whose hash is already known (e.g.
+    computed while the upload was written), so content_hash does not read
+    the file again.
+
+    Parameters
+    ----------
+    file_path: str
+        relative or absolute path of the file.
+    digest: str
+        hex SHA-256 digest of the file contents.
+    """
+    stat = os.stat(file_path)
+    _memoize_hash((os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns), digest)
+
+
+def snapshot_path(file_path, reader_name):
+    """
+
+    Returns the snapshot location for a file parsed with a given reader.
+    The reader name is part of the key because the same bytes parsed as a
+    different file type produce a different DataFrame.
+
+    Parameters
+    ----------
+    file_path: str
+        relative or absolute path of the uploaded file.
+    reader_name: str
+        name of the reader class used to parse the file.
+    Returns
+    ----------
+    str
+    Path of the snapshot file.
+    """
+    snapshot_name = f"{content_hash(file_path)}_{reader_name}{SNAPSHOT_EXTENSION}"
+    return os.path.join(os.path.dirname(os.path.abspath(file_path)), snapshot_name)
+
+
+def load_snapshot(path, columns=None):
+    """
+
+    Loads a snapshot into a DataFrame through a memory map.
+
+    Parameters
+    ----------
+    path: str
+        path of the snapshot file.
+    columns: list or None
+        columns to load, all columns if None. Columns missing from the
+        snapshot are ignored.
+    Returns
+    ----------
+    pd.DataFrame or None
+    Snapshot contents, None if no snapshot exists.
+    """
+    if not os.path.exists(path):
+        return None
+    with pa.memory_map(path) as source:
+        schema = pa.ipc.open_file(source).schema
+    labels = _column_labels(schema)
+    if columns is not None:
+        columns = [name for name in schema.names if labels.get(name, name) in columns]
+    df = feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+    if labels:
+        df.columns = [labels.get(name, name) for name in df.columns]
+    return df
+
+
+def _column_labels(schema):
+    # stored name -> original column label, empty if all labels are strings
+    if not schema.metadata or COLUMN_LABELS_KEY not in schema.metadata:
+        return {}
+    return {name: label for name, label in json.loads(schema.metadata[COLUMN_LABELS_KEY])}
+
+
+def _label_value(label):
+    # numpy scalars -> Python values; None for labels that cannot be restored from JSON
+    if isinstance(label, np.generic):
+        label = label.item()
+    if isinstance(label, (str, int, float)) and not isinstance(label, bool):
+        return label
+    return None
+
+
+def write_snapshot(df, path, logger):
+    """
+
+    Writes a parsed DataFrame as an uncompressed Feather snapshot.
+    The file is written under a temporary name and renamed into place so
+    concurrent readers never observe a partial snapshot.
+
+    Parameters
+    ----------
+    df: pd.DataFrame
+        parsed data.
+    path: str
+        path of the snapshot file.
+    logger: logging.Logger
+        logger used to report failures.
+    Returns
+    ----------
+    bool
+    True if the snapshot was written.
+    """
+    labels = None
+    if not all(isinstance(label, str) for label in df.columns):
+        labels = [[str(label), _label_value(label)] for label in df.columns]
+        if any(label is None for _, label in labels) or len({name for name, _ in labels}) != len(labels):
+            logger.warning("Unable to write columnar snapshot: column labels cannot be stored as names")
+            return False
+        df = df.set_axis([name for name, _ in labels], axis=1)
+
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        table = pa.Table.from_pandas(df)
+        if labels is not None:
+            table = table.replace_schema_metadata(
+                {**(table.schema.metadata or {}), COLUMN_LABELS_KEY: json.dumps(labels)}
+            )
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+        return True
+    except Exception as e:
+        # e.g. mixed-type object columns cannot be stored in Arrow
+        logger.warning(f"Unable to write columnar snapshot: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
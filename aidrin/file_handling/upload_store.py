@@ -0,0 +1,76 @@
+import hashlib
+import os
+import re
+import uuid
+
+from aidrin.file_handling.snapshot import HASH_CHUNK_SIZE, remember_content_hash
+
+# Notes:
+# Uploads are stored content-addressed: the stream is hashed while it is
+# written and the file is named after its SHA-256 digest (plus the upload's
+# extension, which some readers rely on). Identical uploads, from any user,
+# resolve to the same stored file, so its columnar snapshot, profile and
+# cached metric results are reused instead of being rebuilt.
+
+# keep at most two suffixes, e.g. ".csv.gz"
+MAX_SUFFIXES = 2
+_SUFFIX = re.compile(r"\.[A-Za-z0-9]+$")
+
+
+def upload_extension(filename):
+    """
+
+    Returns the lower-case extension of an uploaded file name, e.g.
+    ".csv" or ".csv.gz". Characters unsafe in a path are dropped.
+    """
+    extension = ""
+    stem = os.path.basename(filename or "")
+    for _ in range(MAX_SUFFIXES):
+        match = _SUFFIX.search(stem)
+        if not match or match.start() == 0:
+            break
+        extension = match.group().lower() + extension
+        stem = stem[: match.start()]
+    return extension
+
+
+def store_upload(stream, upload_folder, filename):
+    """
+
+    Writes an upload to the content-addressed store.
+
+    Parameters
+    ----------
+    stream: file-like
+        binary stream of the uploaded file.
+    upload_folder: str
+        folder holding the uploads.
+    filename: str
+        name of the uploaded file, only its extension is used.
+    Returns
+    ----------
+    tuple
+    (file_path, content_hash, deduplicated) where deduplicated is True if
+    identical content was already stored.
+    """
+    tmp_path = os.path.join(upload_folder, f"upload_{uuid.uuid4().hex}.tmp")
+    digest = hashlib.sha256()
+    try:
+        with open(tmp_path, "wb") as f:
+            for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+                f.write(chunk)
+        content_hash = digest.hexdigest()
+        file_path = os.path.join(upload_folder, f"{content_hash}{upload_extension(filename)}")
+
+        deduplicated = os.path.exists(file_path)
+        # the bytes are identical, so renaming over a stored copy is safe and
+        # also refreshes the age used by the upload folder cleanup
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    remember_content_hash(file_path, content_hash)
+    return file_path, content_hash, deduplicated
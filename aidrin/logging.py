@@ -1,6 +1,10 @@
 import logging
+import logging.handlers
 import os
 
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
 
 # Initialize time log
 def setup_logging():
@@ -8,12 +12,15 @@ def setup_logging():
     os.makedirs(log_dir, exist_ok=True)  # Ensure logs directory exists
 
     log_path = os.path.join(log_dir, "aidrin.log")
-    open(log_path, "w").close()  # Clear the log file on startup
+    # keep the log across restarts, rotating it instead of letting it grow unbounded
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT
+    )
     logging.basicConfig(
         level=logging.INFO,
         format="%(asctime)s | %(name)s | %(levelname)s | %(message)s",
-        datefmt="%H:%M.%S",
-        handlers=[logging.FileHandler(log_path), logging.StreamHandler()],
+        datefmt="%Y-%m-%d %H:%M.%S",
+        handlers=[file_handler, logging.StreamHandler()],
     )
     # Suppress specific Celery loggers
     for name in [
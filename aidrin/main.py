@@ -6,11 +6,8 @@ import uuid
 import io
 import base64
 
-import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-import redis
 from celery.result import AsyncResult
 from flask import (
     Blueprint,
@@ -24,11 +21,25 @@ from flask import (
     session,
     url_for,
 )
+from aidrin.file_handling.compression import detect_compression
+from aidrin.file_handling.dataset_profile import summary_statistics as format_summary_statistics
 from aidrin.file_handling.file_parser import (
     SUPPORTED_FILE_TYPES,
+    profile_file,
     read_file as read_file_parser,
+    update_profile,
 )
+from aidrin.file_handling.upload_store import store_upload
 from aidrin.logging import setup_logging
+from aidrin.metric_cache import (
+    cache_result,
+    cache_task_result,
+    get_cached_result,
+    get_current_user_id,
+    metric_cache_key,
+    register_task,
+    user_alias_key,
+)
 from aidrin.structured_data_metrics.add_noise import return_noisy_stats
 from aidrin.structured_data_metrics.class_imbalance import (
     calc_imbalance_degree,
@@ -39,23 +50,17 @@ from aidrin.structured_data_metrics.conditional_demo_disp import (
     conditional_demographic_disparity,
 )
 from aidrin.structured_data_metrics.correlation_score import calc_correlations
+from aidrin.structured_data_metrics.data_quality import data_quality_profile
 from aidrin.structured_data_metrics.duplicity import duplicity
 from aidrin.structured_data_metrics.FAIRness_datacite import categorize_keys_fair
 from aidrin.structured_data_metrics.FAIRness_dcat import (
     categorize_metadata,
     extract_keys_and_values,
 )
-from aidrin.structured_data_metrics.feature_relevance import (
-    data_cleaning,
-    pearson_correlation,
-    plot_features,
-)
+from aidrin.structured_data_metrics.feature_relevance import feature_relevance_workflow
 from aidrin.structured_data_metrics.outliers import outliers
 from aidrin.structured_data_metrics.privacy_measure import (
-    compute_entropy_risk,
-    compute_k_anonymity,
-    compute_l_diversity,
-    compute_t_closeness,
+    compute_equivalence_class_metrics,
     calculate_single_attribute_risk_score,
     calculate_multiple_attribute_risk_score
 )
@@ -67,8 +72,6 @@ from aidrin.structured_data_metrics.statistical_rate import calculate_statistica
 
 # Setup #####
 main = Blueprint("main", __name__)  # register main blueprint
-# initialize Redis client for result storage
-redis_client = redis.StrictRedis(host="localhost", port=6379, db=0)
 # Logging ###
 setup_logging()  # sets log config
 file_upload_time_log = logging.getLogger("file_upload")  # file upload related logs
@@ -83,72 +86,144 @@ time_log = logging.getLogger('aidrin')
 # Caching Functions
 
 
-def get_current_user_id():
-    """Get current user ID from session or generate one."""
-    if 'user_id' not in session:
-        session['user_id'] = str(uuid.uuid4())
-    return session['user_id']
-
-
-def generate_metric_cache_key(file_name, metric_type, **params):
+def async_task_placeholder(task_id, metric_name):
     """
-    Generate a user-specific cache key for metrics.
+    Result entry for a metric still being computed by a Celery task.
+    The frontend polls /check_and_update_task/<task_id>/<metric_name> for it.
     """
-    user_id = get_current_user_id()
-    cache_parts = [f"user:{user_id}", f"file:{file_name}"]
-
-    if metric_type == "dp":
-        features = params.get('features', [])
-        epsilon = params.get('epsilon', 0.1)
-        cache_parts.append(f"dp:features:{', '.join(sorted(features))}:epsilon:{epsilon}")
-
-    elif metric_type == "single":
-        id_feature = params.get('id_feature', '')
-        qis = params.get('qis', [])
-        cache_parts.append(f"single:id:{id_feature}:qis:{', '.join(sorted(qis))}")
-
-    elif metric_type == "multiple":
-        id_feature = params.get('id_feature', '')
-        qis = params.get('qis', [])
-        cache_parts.append(f"multiple:id:{id_feature}:qis:{', '.join(sorted(qis))}")
-
-    elif metric_type == "kanon":
-        qis = params.get('qis', [])
-        cache_parts.append(f"kanon:qis:{', '.join(sorted(qis))}")
-
-    elif metric_type == "ldiv":
-        qis = params.get('qis', [])
-        sensitive = params.get('sensitive', '')
-        cache_parts.append(f"ldiv:qis:{', '.join(sorted(qis))}:sensitive:{sensitive}")
+    return {
+        "task_id": task_id,
+        "status": "processing",
+        "message": f"{metric_name} is being processed asynchronously. Please check back later.",
+        "is_async": True,
+        # key check_task_status stores the finished result under
+        "cache_key": f"{task_id}_{metric_name}"
+    }
 
-    elif metric_type == "tclose":
-        qis = params.get('qis', [])
-        sensitive = params.get('sensitive', '')
-        cache_parts.append(f"tclose:qis:{', '.join(sorted(qis))}:sensitive:{sensitive}")
 
-    elif metric_type == "entropy":
-        qis = params.get('qis', [])
-        cache_parts.append(f"entropy:qis:{', '.join(sorted(qis))}")
+# metric -> (start of its "no data left" error, start of its timeout error, name used in messages)
+EQUIVALENCE_CLASS_ERRORS = {
+    "k-Anonymity": ("No data left after dropping rows with missing quasi-identifiers", "K anonymity task timed out", "K-Anonymity"),
+    "l-Diversity": (
+        "No data left after dropping rows with missing quasi-identifiers or sensitive values",
+        "L Diversity task timed out",
+        "L-Diversity",
+    ),
+    "t-Closeness": ("No data left after dropping rows with missing values", "T Closeness task timed out", "T-Closeness"),
+    "Entropy Risk": ("No data left after dropping rows with missing values", "Entropy Risk task timed out", "Entropy Risk"),
+}
+
+
+def equivalence_class_error_response(metric, error_message):
+    """Map an exception raised by the equivalence-class job to the error response of one metric."""
+    no_data_message, timeout_message, display_name = EQUIVALENCE_CLASS_ERRORS[metric]
+    if "Input DataFrame is empty" in error_message:
+        return {
+            "Error": "The uploaded dataset contains no data rows.",
+            f"{metric} Visualization": "",
+            "Graph interpretation": "No visualization available due to empty dataset."
+        }
+    elif "not found in the dataset" in error_message:
+        return {
+            "Error": f"Selected columns not found in dataset: {error_message}",
+            f"{metric} Visualization": "",
+            "Graph interpretation": "No visualization available due to missing columns."
+        }
+    elif no_data_message in error_message:
+        return {
+            "Error": "After removing missing values, no data remains.",
+            f"{metric} Visualization": "",
+            "Graph interpretation": "No visualization available due to insufficient data."
+        }
+    elif timeout_message in error_message:
+        return {
+            "Error": f"{display_name} task timed out. The dataset may be too large or complex."
+        }
+    return {
+        "Error": f"Processing error: {error_message}",
+        f"{metric} Visualization": "",
+        "Graph interpretation": "No visualization available due to processing error."
+    }
 
-    elif metric_type == "classimbalance":
-        classes = params.get('classes', '')
-        dist_metric = params.get('dist_metric', 'EU')
-        cache_parts.append(f"classimbalance:classes:{classes}:dist_metric:{dist_metric}")
 
-    return "|".join(cache_parts)
+# exception message marker -> (Error, reason in the graph interpretation, ErrorType)
+RISK_SCORE_ERRORS = [
+    ("Dataset is empty", "Dataset is empty. Please upload a dataset with data.", "empty dataset", "Data Error"),
+    ("No valid quasi-identifiers", "No valid quasi-identifiers provided for {metric}.", "invalid quasi-identifiers", "Selection Error"),
+    ("not found in dataset", "Selected columns not found in dataset: {error}", "missing columns", "Data Error"),
+    ("must contain unique values", "One or more quasi-identifiers have only one unique value.", "non-unique ID values", "Data Error"),
+    (
+        "appear to be numerical",
+        "Selected quasi-identifiers appear to be numerical with too many unique values.",
+        "unsuitable column types",
+        "Data Error",
+    ),
+    ("no data remains", "After removing missing values, no data remains.", "insufficient data", "Data Error"),
+    (
+        "More than 50% of data was removed",
+        "More than 50% of data was removed due to missing values.",
+        "poor data quality",
+        "Data Quality Error",
+    ),
+    ("has only one unique value", "One or more quasi-identifiers have only one unique value.", "insufficient column variation", "Data Error"),
+    ("already a perfect identifier", "One or more quasi-identifiers are already perfect identifiers.", "perfect identification", "Data Error"),
+    ("causing division by zero", "Unexpected data structure causing division by zero.", "data structure issues", "Processing Error"),
+    (
+        "task timed out",
+        "{kind} Attribute Risk task timed out. The dataset may be too large or complex.",
+        "timeout",
+        "Timeout Error",
+    ),
+]
+
+
+def risk_score_error_response(metric, error_message):
+    """Map an exception raised for a single/multiple attribute risk scoring job to its error response."""
+    error, reason, error_type = f"Processing error: {error_message}", "processing error", "Processing Error"
+    for marker, marker_error, marker_reason, marker_type in RISK_SCORE_ERRORS:
+        if marker in error_message:
+            error, reason, error_type = marker_error, marker_reason, marker_type
+            break
+    response = {
+        "Error": error.format(metric=metric.lower(), error=error_message, kind=metric.split()[0]),
+        f"{metric} Visualization": "",
+        "Graph interpretation": f"No visualization available due to {reason}.",
+        "ErrorType": error_type
+    }
+    if error_type == "Data Error" and "Dataset is empty" in error_message:
+        response["Description"] = "The uploaded dataset contains no data rows."
+    return response
 
 
-def is_metric_cache_valid(cache_entry, max_age_minutes=30):
-    """Check if metric cache entry is still valid based on time."""
-    current_time = time.time()
-    expires_at = cache_entry.get('expires_at', 0)
-    is_valid = current_time < expires_at
-    print(f"Cache validation - Current time: {current_time}, Expires at: {expires_at}, Is valid: {is_valid}")
-    return is_valid
+def start_risk_score_task(metric, task, file_info, id_feature, eval_features, qis_ordered=True):
+    """
+    Return the cached result of a single/multiple attribute risk scoring job,
+    or start its Celery task and return the placeholder the frontend polls.
+    Set qis_ordered to False only if the scores do not depend on the order of
+    the quasi-identifiers, so any order shares one cache entry.
+    """
+    unordered = () if qis_ordered else ("qis",)
+    cache_key = metric_cache_key(metric, file_info, unordered=unordered, id_feature=id_feature, qis=eval_features)
+    cached = get_cached_result(cache_key)
+    if cached is not None:
+        return cached
+    try:
+        # Start async task; the worker loads the columns it needs from the upload
+        result = task.delay(file_info, id_feature, eval_features)
+        placeholder = async_task_placeholder(result.id, metric)
+        register_task(result.id, metric, cache_key, placeholder)
+        print(f"Started new Celery task for {metric}: {result.id}")
+        return placeholder
+    except Exception as e:
+        print(f"Error in {metric}: {e}")
+        return risk_score_error_response(metric, str(e))
 
 
 def clear_all_user_cache():
-    """Clear ALL cache entries for current user."""
+    """
+    Clear ALL cache entries for current user.
+    Results shared with other users stay cached; only the user's aliases of them are removed.
+    """
     user_id = get_current_user_id()
     keys_to_remove = []
     for key in current_app.TEMP_RESULTS_CACHE.keys():
@@ -285,21 +360,31 @@ def upload_file():
         file = request.files['file']
 
         if file:
-            # Clear all cache for the user when a new file is uploaded
-            cleared_count = clear_all_user_cache()
-            print(f"Cache cleared for new file upload: {cleared_count} entries removed")
-
-            # create name and add to folder
+            # Cached results are keyed by content hash, so they stay valid for a new upload
             display_name = file.filename
-            filename = f"{uuid.uuid4().hex}_{file.filename}"
-            file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+            # identical content is stored once and shared across sessions
+            file_path, file_hash, deduplicated = store_upload(
+                file.stream, current_app.config['UPLOAD_FOLDER'], file.filename
+            )
             print(f"Saving file to {file_path}")
-            # save file to server
-            file.save(file_path)
+            if deduplicated:
+                file_upload_time_log.info("Upload matches stored content %s, reusing it", file_hash)
+            # compressed uploads are kept compressed and decompressed while parsing
+            compression = detect_compression(file_path)
+            if compression:
+                file_upload_time_log.info("Compressed upload (%s) stored without decompressing", compression)
             # store the file path in the session
             session['uploaded_file_name'] = display_name
             session['uploaded_file_path'] = file_path
             session['uploaded_file_type'] = request.form.get('fileTypeSelector')
+            session['uploaded_file_hash'] = file_hash
+            # profile once at upload so /feature_set and /summary_statistics need no parse
+            start_time = time.time()
+            profile = profile_file((file_path, display_name, session['uploaded_file_type']))
+            if isinstance(profile, dict):
+                file_upload_time_log.info("Dataset profile computed in %.2f seconds", time.time() - start_time)
+            else:
+                file_upload_time_log.warning("Dataset profile not computed: %s", profile)
 
             return redirect(url_for('upload_file'))
 
@@ -329,7 +414,10 @@ def retrieve_uploaded_file():
         # Ensure the file exists at the given path
         if os.path.exists(uploaded_file_path):
             file_upload_time_log.info("File Successfully Found")
-            return send_file(uploaded_file_path, as_attachment=True)
+            # stored under its content hash, so send it under the uploaded name
+            return send_file(
+                uploaded_file_path, as_attachment=True, download_name=session.get('uploaded_file_name')
+            )
         else:
             file_upload_time_log.info("File not found in os")
             return jsonify({"error": "File not found in os"}), 404
@@ -345,6 +433,7 @@ def clear_file():
     session.pop("uploaded_file_path", None)
     session.pop("uploaded_file_name", None)
     session.pop("uploaded_file_type", None)
+    session.pop("uploaded_file_hash", None)
     session.pop("minimize_preview", None)
     session.clear()
     upload_folder = current_app.config["UPLOAD_FOLDER"]
@@ -374,12 +463,29 @@ def dataQuality():
         start_time = time.time()
         metric_time_log.info("Data quality Request Started")
         # check for parameters
-        # Completeness
+        selected_metrics = [
+            metric for metric, field in (
+                ("Completeness", "completeness"),
+                ("Outliers", "outliers"),
+                ("Duplicity", "duplicity"),
+            )
+            if request.form.get(field) == "yes"
+        ]
         try:
-            if request.form.get("completeness") == "yes":
+            # read the dataset once when more than one metric is requested
+            profile = {}
+            if len(selected_metrics) > 1:
+                start_time_profile = time.time()
+                profile = data_quality_profile(file_info, selected_metrics)
+                metric_time_log.info(
+                    "Data quality profile (%s) took %.2f seconds",
+                    ", ".join(selected_metrics),
+                    time.time() - start_time_profile,
+                )
+            # Completeness
+            if "Completeness" in selected_metrics:
                 start_time_completeness = time.time()
-                completeness_result = completeness(file_info)
-                compl_dict = completeness_result
+                compl_dict = profile["Completeness"] if "Completeness" in profile else completeness(file_info)
                 compl_dict["Description"] = (
                     "Indicate the proportion of available data for each feature, "
                     "with values closer to 1 indicating high completeness, and values near "
@@ -392,10 +498,9 @@ def dataQuality():
                     time.time() - start_time_completeness,
                 )
             # Outliers
-            if request.form.get("outliers") == "yes":
+            if "Outliers" in selected_metrics:
                 start_time_outliers = time.time()
-                outliers_result = outliers(file_info)
-                out_dict = outliers_result
+                out_dict = profile["Outliers"] if "Outliers" in profile else outliers(file_info)
                 out_dict["Description"] = (
                     "Outlier scores are calculated for numerical columns using the Interquartile"
                     " Range (IQR) method, where a score of 1 indicates that all data points in a "
@@ -406,10 +511,9 @@ def dataQuality():
                     "Outliers took %.2f seconds", time.time() - start_time_outliers
                 )
             # Duplicity
-            if request.form.get("duplicity") == "yes":
+            if "Duplicity" in selected_metrics:
                 start_time_duplicity = time.time()
-                duplicity_result = duplicity(file_info)
-                dup_dict = duplicity_result
+                dup_dict = profile["Duplicity"] if "Duplicity" in profile else duplicity(file_info)
                 dup_dict["Description"] = (
                     "A value of 0 indicates no duplicates, and a value closer to 1 signifies a higher "
                     "proportion of duplicated data points in the dataset"
@@ -438,7 +542,9 @@ def fairness():
 
     final_dict = {}
 
-    file, uploaded_file_path, uploaded_file_name = read_file()
+    # metrics below load only the columns they use, so the full file is not read here
+    uploaded_file_path = session.get('uploaded_file_path')
+    uploaded_file_name = session.get('uploaded_file_name')
 
     if request.method == 'POST':
         start_time = time.time()
@@ -491,7 +597,6 @@ def fairness():
         # conditional demographic disparity
         if request.form.get("conditional demographic disparity") == "yes":
             start_time_condDemoDisp = time.time()
-            cdd_dict = {}
             target = request.form.get(
                 "target for conditional demographic disparity"
             )
@@ -501,26 +606,33 @@ def fairness():
             accepted_value = request.form.get(
                 "target value for conditional demographic disparity"
             )
-            cond_demo_disp_result = conditional_demographic_disparity.delay(
-                file[target].to_list(), file[sensitive].to_list(), accepted_value
-            )
-            cdd_dict = cond_demo_disp_result.get()
-            cdd_dict["Description"] = (
-                'The conditional demographic disparity metric evaluates the distribution '
-                'of outcomes categorized as positive and negative across various sensitive groups. '
-                'The user specifies which outcome category is considered "positive" for the analysis, '
-                'with all other outcome categories classified as "negative". The metric calculates the '
-                'proportion of outcomes classified as "positive" and "negative" within each sensitive group.'
-                ' A resulting disparity value of True indicates that within a specific sensitive group, '
-                'the proportion of outcomes classified as "negative" exceeds the proportion classified as'
-                ' "positive". This metric provides insights into potential disparities in outcome distribution '
-                'across sensitive groups based on the user-defined positive outcome criterion.'
-            )
-            final_dict["Conditional Demographic Disparity"] = cdd_dict
-            metric_time_log.info(
-                "Conditional Demographic Disparity took %.2f seconds",
-                time.time() - start_time_condDemoDisp,
+            file_info = (uploaded_file_path, uploaded_file_name, session.get('uploaded_file_type'))
+            cache_key = metric_cache_key(
+                "Conditional Demographic Disparity", file_info,
+                target=target, sensitive=sensitive, accepted_value=accepted_value,
             )
+            cached = get_cached_result(cache_key)
+            if cached is not None:
+                final_dict["Conditional Demographic Disparity"] = cached
+            else:
+                try:
+                    # the worker loads the target and sensitive columns from the upload
+                    task = conditional_demographic_disparity.delay(file_info, target, sensitive, accepted_value)
+                    final_dict["Conditional Demographic Disparity"] = async_task_placeholder(
+                        task.id, "Conditional Demographic Disparity"
+                    )
+                    register_task(
+                        task.id, "Conditional Demographic Disparity", cache_key,
+                        final_dict["Conditional Demographic Disparity"],
+                    )
+                    metric_time_log.info(
+                        "Conditional Demographic Disparity submitted as task %s in %.2f seconds",
+                        task.id,
+                        time.time() - start_time_condDemoDisp,
+                    )
+                except Exception as e:
+                    print("Error during Conditional Demographic Disparity analysis:", e)
+                    final_dict["Conditional Demographic Disparity"] = {"Error": str(e)}
 
         end_time = time.time()
         execution_time = end_time - start_time
@@ -536,7 +648,9 @@ def correlationAnalysis():
 
     final_dict = {}
 
-    file, uploaded_file_path, uploaded_file_name = read_file()
+    # calc_correlations loads only the selected columns, so the full file is not read here
+    uploaded_file_path = session.get('uploaded_file_path')
+    uploaded_file_name = session.get('uploaded_file_name')
 
     if request.method == "POST":
         metric_time_log.info("Correlation Analysis Request Started")
@@ -550,23 +664,24 @@ def correlationAnalysis():
                 columns = request.form.getlist("all features for data transformation")
                 # Create file_info tuple for the calc_correlations function
                 file_info = (uploaded_file_path, uploaded_file_name, session.get('uploaded_file_type'))
-                correlations_result = calc_correlations.delay(columns, file_info)
-                corr_dict = correlations_result.get()
-                # catch potential errors
-                if "Message" in corr_dict:
-                    print("Correlation analysis failed:", corr_dict["Message"])
-                    final_dict["Error"] = corr_dict["Message"]
+                # both correlation plots come from one task, each is polled and cached under its own name
+                cache_keys = {
+                    metric_name: metric_cache_key(metric_name, file_info, columns=columns)
+                    for metric_name in ("Correlations Analysis Categorical", "Correlations Analysis Numerical")
+                }
+                cached = {metric_name: get_cached_result(key) for metric_name, key in cache_keys.items()}
+                if all(result is not None for result in cached.values()):
+                    final_dict.update(cached)
                 else:
-                    final_dict["Correlations Analysis Categorical"] = corr_dict[
-                        "Correlations Analysis Categorical"
-                    ]
-                    final_dict["Correlations Analysis Numerical"] = corr_dict[
-                        "Correlations Analysis Numerical"
-                    ]
-                metric_time_log.info(
-                    "Correlations took %.2f seconds",
-                    time.time() - start_time_correlations,
-                )
+                    task = calc_correlations.delay(columns, file_info)
+                    for metric_name, key in cache_keys.items():
+                        final_dict[metric_name] = async_task_placeholder(task.id, metric_name)
+                        register_task(task.id, metric_name, key, final_dict[metric_name])
+                    metric_time_log.info(
+                        "Correlations submitted as task %s in %.2f seconds",
+                        task.id,
+                        time.time() - start_time_correlations,
+                    )
         except Exception as e:
             metric_time_log.error(f"Error: {e}")
             return jsonify({"error": str(e)}), 200
@@ -584,11 +699,9 @@ def featureRelevance():
 
     final_dict = {}
 
-    read_result = read_file()
-    # Check if read_file returned a redirect response (error case)
-    if hasattr(read_result, 'status_code'):  # It's a Response object
-        return read_result
-    file, uploaded_file_path, uploaded_file_name = read_result
+    # the feature relevance chain loads only the selected columns on the worker
+    uploaded_file_path = session.get('uploaded_file_path')
+    uploaded_file_name = session.get('uploaded_file_name')
 
     if request.method == 'POST':
         start_time = time.time()
@@ -608,43 +721,25 @@ def featureRelevance():
 
             target = request.form.get("target for feature relevance")
 
-            try:
-                print("Calling data_cleaning with:", cat_cols, num_cols, target)
-                if target in cat_cols or target in num_cols:
-                    print("Error: Target is same as feature")
-                    return jsonify({"trigger": "correlationError"}), 200
-                # Create file_info tuple for the data_cleaning function
-                file_info = (uploaded_file_path, uploaded_file_name, session.get('uploaded_file_type'))
-                data_cleaning_result = data_cleaning.delay(cat_cols, num_cols, target, file_info)
-                df_json = data_cleaning_result.get()  # json serialized
-                print("Data cleaning returned df with shape:", (pd.DataFrame.from_dict(df_json).shape if df_json is not None else "None"))
-            except Exception as e:
-                print("Error occurred during data cleaning:", e)
-                df_json = None
-
-            # Generate Pearson correlation
-            pearson_corr_result = pearson_correlation.delay(df_json, target)
-            correlations = pearson_corr_result.get()
             # don't let the user check the same target and feature
-            if correlations is None or len(correlations) == 0:
-                print("Error: Correlations is None or empty")
+            if target in cat_cols or target in num_cols:
+                print("Error: Target is same as feature")
                 return jsonify({"trigger": "correlationError"}), 200
 
-            plot_features_result = plot_features.delay(correlations, target)
-            f_plot = plot_features_result.get()
-            f_dict = {}
-
-            f_dict['Pearson Correlation to Target'] = correlations
-            f_dict['Feature Relevance Visualization'] = f_plot
-            f_dict['Description'] = (
-                "With minimum data cleaning (drop missing values, onehot encode "
-                "categorical features, labelencode target feature), the Pearson "
-                "correlation coefficient is calculated for each feature against the "
-                "target variable. A value of 1 indicates a perfect positive "
-                "correlation, while a value of -1 indicates a perfect negative "
-                "correlation."
+            # Create file_info tuple for the data_cleaning function
+            file_info = (uploaded_file_path, uploaded_file_name, session.get('uploaded_file_type'))
+            cache_key = metric_cache_key(
+                "Feature Relevance", file_info, cat_cols=cat_cols, num_cols=num_cols, target=target,
             )
-            final_dict['Feature Relevance'] = f_dict
+            cached = get_cached_result(cache_key)
+            if cached is not None:
+                final_dict['Feature Relevance'] = cached
+            else:
+                print("Starting feature relevance chain with:", cat_cols, num_cols, target)
+                task = feature_relevance_workflow(cat_cols, num_cols, target, file_info).apply_async()
+                final_dict['Feature Relevance'] = async_task_placeholder(task.id, 'Feature Relevance')
+                register_task(task.id, 'Feature Relevance', cache_key, final_dict['Feature Relevance'])
+                print(f"Started new Celery task for Feature Relevance: {task.id}")
 
             end_time = time.time()
             execution_time = end_time - start_time
@@ -660,7 +755,8 @@ def classImbalance():
 
     final_dict = {}
 
-    file, uploaded_file_path, uploaded_file_name = read_file()
+    uploaded_file_path = session.get('uploaded_file_path')
+    uploaded_file_name = session.get('uploaded_file_name')
 
     if request.method == 'POST':
         start_time = time.time()
@@ -668,6 +764,7 @@ def classImbalance():
         if request.form.get("class imbalance") == "yes":
             classes = request.form.get("features for class imbalance")
             dist_metric = request.form.get("distance metric for class imbalance", "EU")
+            file_info = (uploaded_file_path, uploaded_file_name, session.get('uploaded_file_type'))
 
             print("Class Imbalance - Form data:", dict(request.form))
             print("Class Imbalance - Form keys:", list(request.form.keys()))
@@ -675,79 +772,14 @@ def classImbalance():
             print("Class Imbalance - Selected feature:", classes)
             print("Class Imbalance - Selected distance metric:", dist_metric)
 
-            # Generate cache key for class imbalance
-            cache_key = generate_metric_cache_key(
-                uploaded_file_name,
-                "classimbalance",
-                classes=classes,
-                dist_metric=dist_metric
-            )
-
-            print(f"Class Imbalance - Generated cache key: {cache_key}")
-            print(f"Class Imbalance - Current cache keys: {list(current_app.TEMP_RESULTS_CACHE.keys())}")
-
-            # Check if this calculation has been cached
-            if cache_key in current_app.TEMP_RESULTS_CACHE:
-                print(f"Class Imbalance - Cache HIT for key: {cache_key}")
-                cached_entry = current_app.TEMP_RESULTS_CACHE[cache_key]
-                print(f"Class Imbalance - Cached entry: {cached_entry}")
-                if is_metric_cache_valid(cached_entry):
-                    print("Class Imbalance - Cache is VALID, using cached result")
-                    final_dict['Class Imbalance'] = cached_entry['data']
-                    # Reset expiration time when using cached result
-                    current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                        'data': cached_entry['data'],
-                        'timestamp': time.time(),
-                        'expires_at': time.time() + (30 * 60)
-                    }
-                    print(f"Using cached Class Imbalance for key: {cache_key} (expiration reset)")
-                else:
-                    print("Class Imbalance - Cache is EXPIRED, recalculating")
-                    current_app.TEMP_RESULTS_CACHE.pop(cache_key, None)
-                    ci_dict = {}
-
-                    try:
-                        # Generate visualization
-                        ci_dict['Class Imbalance Visualization'] = class_distribution_plot(file, classes)
-                        ci_dict['Description'] = (
-                            "The chart displays the distribution of classes within the "
-                            "specified feature, providing a visual representation of the "
-                            "relative proportions of each class."
-                        )
-
-                        # Calculate imbalance degree
-                        imbalance_result = calc_imbalance_degree(file, classes, dist_metric=dist_metric)
-
-                        # Check if there was an error in imbalance calculation
-                        if 'Error' in imbalance_result:
-                            ci_dict['Error'] = imbalance_result['Error']
-                            ci_dict['ErrorType'] = imbalance_result.get('ErrorType', 'Processing Error')
-                            ci_dict['Class Imbalance Visualization'] = ""
-                            ci_dict['Description'] = f"Error: {imbalance_result['Error']}"
-                        else:
-                            ci_dict['Imbalance degree'] = imbalance_result
-
-                        final_dict['Class Imbalance'] = ci_dict
-                        current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                            'data': ci_dict,
-                            'timestamp': time.time(),
-                            'expires_at': time.time() + (30 * 60)
-                        }
-                        print(f"Cached Class Imbalance for key: {cache_key}")
-
-                    except Exception as e:
-                        error_msg = str(e)
-                        print(f"Class Imbalance - Error: {error_msg}")
-                        ci_dict['Error'] = error_msg
-                        ci_dict['ErrorType'] = 'Processing Error'
-                        ci_dict['Class Imbalance Visualization'] = ""
-                        ci_dict['Description'] = f"Error: {error_msg}"
-                        final_dict['Class Imbalance'] = ci_dict
-            else:
-                print(f"Class Imbalance - Cache MISS for key: {cache_key}")
+            cache_key = metric_cache_key("Class Imbalance", file_info, classes=classes, dist_metric=dist_metric)
+            final_dict['Class Imbalance'] = get_cached_result(cache_key)
+            if final_dict['Class Imbalance'] is None:
                 ci_dict = {}
 
                 try:
+                    # only the selected class column is needed
+                    file = read_file_parser(file_info, columns=[classes])
                     # Generate visualization
                     ci_dict['Class Imbalance Visualization'] = class_distribution_plot(file, classes)
                     ci_dict['Description'] = (
@@ -768,12 +800,7 @@ def classImbalance():
                         ci_dict['Imbalance degree'] = imbalance_result
 
                     final_dict['Class Imbalance'] = ci_dict
-                    current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                        'data': ci_dict,
-                        'timestamp': time.time(),
-                        'expires_at': time.time() + (30 * 60)
-                    }
-                    print(f"Cached Class Imbalance for key: {cache_key}")
+                    cache_result(cache_key, ci_dict)
 
                 except Exception as e:
                     error_msg = str(e)
@@ -801,7 +828,6 @@ def privacyPreservation():
     file_name = session.get("uploaded_file_name")
     file_type = session.get("uploaded_file_type")
     file_info = (file_path, file_name, file_type)
-    file = read_file_parser(file_info)
 
     if request.method == "POST":
         start_time = time.time()
@@ -861,7 +887,7 @@ def privacyPreservation():
                                 }
                             else:
                                 # All validations passed, proceed with processing
-                                process_differential_privacy(file_name, feature_to_add_noise, epsilon, file, final_dict, current_app)
+                                process_differential_privacy(feature_to_add_noise, epsilon, file_info, final_dict)
                         except ValueError:
                             final_dict['DP Statistics'] = {
                                 "Error": "Invalid epsilon value format.",
@@ -875,7 +901,7 @@ def privacyPreservation():
                             }
                     else:
                         # Use default epsilon value
-                        process_differential_privacy(file_name, feature_to_add_noise, epsilon, file, final_dict, current_app)
+                        process_differential_privacy(feature_to_add_noise, epsilon, file_info, final_dict)
 
         # single attribute risk scores using markov model (ASYNC)
         if request.form.get("single attribute risk score") == "yes":
@@ -894,249 +920,13 @@ def privacyPreservation():
                     "ErrorType": "Selection Error"
                 }
             else:
-                # Generate cache key for single attribute risk scoring
-                cache_key = generate_metric_cache_key(
-                    file_name,
-                    "single",
-                    id_feature=id_feature,
-                    qis=eval_features
+                final_dict["Single attribute risk scoring"] = start_risk_score_task(
+                    "Single attribute risk scoring", calculate_single_attribute_risk_score,
+                    file_info, id_feature, eval_features,
+                    # each quasi-identifier is scored on its own
+                    qis_ordered=False,
                 )
 
-                print(f"Privacy - Single Attribute Risk Score Generated cache key: {cache_key}")
-
-                # Check if this calculation has been cached
-                if cache_key in current_app.TEMP_RESULTS_CACHE:
-                    print(f"Privacy - Single Attribute Risk Score Cache HIT for key: {cache_key}")
-                    cached_entry = current_app.TEMP_RESULTS_CACHE[cache_key]
-                    if is_metric_cache_valid(cached_entry):
-                        print("Privacy - Single Attribute Risk Score Cache is VALID, using cached result")
-                        final_dict["Single attribute risk scoring"] = cached_entry['data']
-                        # Reset expiration time when using cached result
-                        current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                            'data': cached_entry['data'],
-                            'timestamp': time.time(),
-                            'expires_at': time.time() + (30 * 60)
-                        }
-                        print(f"Using cached Single attribute risk scoring for key: {cache_key} (expiration reset)")
-                    else:
-                        print("Privacy - Single Attribute Risk Score Cache is EXPIRED, starting new task")
-                        current_app.TEMP_RESULTS_CACHE.pop(cache_key, None)
-                        try:
-                            # Convert DataFrame to JSON for async processing
-                            df_json = file.to_json()
-                            # Start async task
-                            task = calculate_single_attribute_risk_score.delay(df_json, id_feature, eval_features)
-                            final_dict["Single attribute risk scoring"] = {
-                                "task_id": task.id,
-                                "status": "processing",
-                                "message": "Single attribute risk scoring is being processed asynchronously. Please check back later.",
-                                "is_async": True,
-                                "cache_key": cache_key
-                            }
-                            current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                                'data': final_dict["Single attribute risk scoring"],
-                                'timestamp': time.time(),
-                                'expires_at': time.time() + (30 * 60),
-                                'task_id': task.id
-                            }
-                            print(f"Started new Celery task for Single attribute risk scoring: {task.id}")
-                        except Exception as e:
-                            error_message = str(e)
-                            if "Dataset is empty" in error_message:
-                                error_response = {
-                                    "Error": "Dataset is empty. Please upload a dataset with data.",
-                                    "Single attribute risk scoring Visualization": "",
-                                    "Graph interpretation": "No visualization available due to empty dataset.",
-                                    "ErrorType": "Data Error"
-                                }
-                            elif "No valid quasi-identifiers" in error_message:
-                                error_response = {
-                                    "Error": "No valid quasi-identifiers provided for single attribute risk scoring.",
-                                    "Single attribute risk scoring Visualization": "",
-                                    "Graph interpretation": "No visualization available due to invalid quasi-identifiers.",
-                                    "ErrorType": "Selection Error"
-                                }
-                            elif "not found in dataset" in error_message:
-                                error_response = {
-                                    "Error": f"Selected columns not found in dataset: {error_message}",
-                                    "Single attribute risk scoring Visualization": "",
-                                    "Graph interpretation": "No visualization available due to missing columns.",
-                                    "ErrorType": "Data Error"
-                                }
-                            elif "must contain unique values" in error_message:
-                                error_response = {
-                                    "Error": "One or more quasi-identifiers have only one unique value.",
-                                    "Single attribute risk scoring Visualization": "",
-                                    "Graph interpretation": "No visualization available due to non-unique ID values.",
-                                    "ErrorType": "Data Error"
-                                }
-                            elif "appear to be numerical" in error_message:
-                                error_response = {
-                                    "Error": "Selected quasi-identifiers appear to be numerical with too many unique values.",
-                                    "Single attribute risk scoring Visualization": "",
-                                    "Graph interpretation": "No visualization available due to unsuitable column types.",
-                                    "ErrorType": "Data Error"
-                                }
-                            elif "no data remains" in error_message:
-                                error_response = {
-                                    "Error": "After removing missing values, no data remains.",
-                                    "Single attribute risk scoring Visualization": "",
-                                    "Graph interpretation": "No visualization available due to insufficient data.",
-                                    "ErrorType": "Data Error"
-                                }
-                            elif "More than 50% of data was removed" in error_message:
-                                error_response = {
-                                    "Error": "More than 50% of data was removed due to missing values.",
-                                    "Single attribute risk scoring Visualization": "",
-                                    "Graph interpretation": "No visualization available due to poor data quality.",
-                                    "ErrorType": "Data Quality Error"
-                                }
-                            elif "has only one unique value" in error_message:
-                                error_response = {
-                                    "Error": "One or more quasi-identifiers have only one unique value.",
-                                    "Single attribute risk scoring Visualization": "",
-                                    "Graph interpretation": "No visualization available due to insufficient column variation.",
-                                    "ErrorType": "Data Error"
-                                }
-                            elif "already a perfect identifier" in error_message:
-                                error_response = {
-                                    "Error": "One or more quasi-identifiers are already perfect identifiers.",
-                                    "Single attribute risk scoring Visualization": "",
-                                    "Graph interpretation": "No visualization available due to perfect identification.",
-                                    "ErrorType": "Data Error"
-                                }
-                            elif "causing division by zero" in error_message:
-                                error_response = {
-                                    "Error": "Unexpected data structure causing division by zero.",
-                                    "Single attribute risk scoring Visualization": "",
-                                    "Graph interpretation": "No visualization available due to data structure issues.",
-                                    "ErrorType": "Processing Error"
-                                }
-                            elif "task timed out" in error_message:
-                                error_response = {
-                                    "Error": "Single Attribute Risk task timed out. The dataset may be too large or complex.",
-                                    "ErrorType": "Timeout Error"
-                                }
-                            else:
-                                error_response = {
-                                    "Error": f"Processing error: {error_message}",
-                                    "Single attribute risk scoring Visualization": "",
-                                    "Graph interpretation": "No visualization available due to processing error.",
-                                    "ErrorType": "Processing Error"
-                                }
-
-                            final_dict["Single attribute risk scoring"] = error_response
-                            print(f"Error in Single attribute risk scoring: {error_message}")
-                else:
-                    print(f"Privacy - Single Attribute Risk Score Cache MISS for key: {cache_key}")
-                    try:
-                        # Convert DataFrame to JSON for async processing
-                        df_json = file.to_json()
-                        # Start async task
-                        task = calculate_single_attribute_risk_score.delay(df_json, id_feature, eval_features)
-                        final_dict["Single attribute risk scoring"] = {
-                            "task_id": task.id,
-                            "status": "processing",
-                            "message": "Single attribute risk scoring is being processed asynchronously. Please check back later.",
-                            "is_async": True,
-                            "cache_key": cache_key
-                        }
-                        current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                            'data': final_dict["Single attribute risk scoring"],
-                            'timestamp': time.time(),
-                            'expires_at': time.time() + (30 * 60),
-                            'task_id': task.id
-                        }
-                        print(f"Started new Celery task for Single attribute risk scoring: {task.id}")
-                    except Exception as e:
-                        error_message = str(e)
-                        if "Dataset is empty" in error_message:
-                            error_response = {
-                                "Error": "Dataset is empty. Please upload a dataset with data.",
-                                "Description": "The uploaded dataset contains no data rows.",
-                                "Single attribute risk scoring Visualization": "",
-                                "Graph interpretation": "No visualization available due to empty dataset.",
-                                "ErrorType": "Data Error"
-                            }
-                        elif "No valid quasi-identifiers" in error_message:
-                            error_response = {
-                                "Error": "No valid quasi-identifiers provided for single attribute risk scoring.",
-                                "Single attribute risk scoring Visualization": "",
-                                "Graph interpretation": "No visualization available due to invalid quasi-identifiers.",
-                                "ErrorType": "Selection Error"
-                            }
-                        elif "not found in dataset" in error_message:
-                            error_response = {
-                                "Error": f"Selected columns not found in dataset: {error_message}",
-                                "Single attribute risk scoring Visualization": "",
-                                "Graph interpretation": "No visualization available due to missing columns.",
-                                "ErrorType": "Data Error"
-                            }
-                        elif "must contain unique values" in error_message:
-                            error_response = {
-                                "Error": "One or more quasi-identifiers have only one unique value.",
-                                "Single attribute risk scoring Visualization": "",
-                                "Graph interpretation": "No visualization available due to non-unique ID values.",
-                                "ErrorType": "Data Error"
-                            }
-                        elif "appear to be numerical" in error_message:
-                            error_response = {
-                                "Error": "Selected quasi-identifiers appear to be numerical with too many unique values.",
-                                "Single attribute risk scoring Visualization": "",
-                                "Graph interpretation": "No visualization available due to unsuitable column types.",
-                                "ErrorType": "Data Error"
-                            }
-                        elif "no data remains" in error_message:
-                            error_response = {
-                                "Error": "After removing missing values, no data remains.",
-                                "Single attribute risk scoring Visualization": "",
-                                "Graph interpretation": "No visualization available due to insufficient data.",
-                                "ErrorType": "Data Error"
-                            }
-                        elif "More than 50% of data was removed" in error_message:
-                            error_response = {
-                                "Error": "More than 50% of data was removed due to missing values.",
-                                "Single attribute risk scoring Visualization": "",
-                                "Graph interpretation": "No visualization available due to poor data quality.",
-                                "ErrorType": "Data Quality Error"
-                            }
-                        elif "has only one unique value" in error_message:
-                            error_response = {
-                                "Error": "One or more quasi-identifiers have only one unique value.",
-                                "Single attribute risk scoring Visualization": "",
-                                "Graph interpretation": "No visualization available due to insufficient column variation.",
-                                "ErrorType": "Data Error"
-                            }
-                        elif "already a perfect identifier" in error_message:
-                            error_response = {
-                                "Error": "One or more quasi-identifiers are already perfect identifiers.",
-                                "Single attribute risk scoring Visualization": "",
-                                "Graph interpretation": "No visualization available due to perfect identification.",
-                                "ErrorType": "Data Error"
-                            }
-                        elif "causing division by zero" in error_message:
-                            error_response = {
-                                "Error": "Unexpected data structure causing division by zero.",
-                                "Single attribute risk scoring Visualization": "",
-                                "Graph interpretation": "No visualization available due to data structure issues.",
-                                "ErrorType": "Processing Error"
-                            }
-                        elif "task timed out" in error_message:
-                            error_response = {
-                                "Error": "Single Attribute Risk task timed out. The dataset may be too large or complex.",
-                                "ErrorType": "Timeout Error"
-                            }
-                        else:
-                            error_response = {
-                                "Error": f"Processing error: {error_message}",
-                                "Single attribute risk scoring Visualization": "",
-                                "Graph interpretation": "No visualization available due to processing error.",
-                                "ErrorType": "Processing Error"
-                            }
-
-                        final_dict["Single attribute risk scoring"] = error_response
-                        print(f"Error in Single attribute risk scoring: {error_message}")
-
         # multiple attribute risk score using markov model (ASYNC)
         if request.form.get("multiple attribute risk score") == "yes":
             id_feature = request.form.get("id feature to measure multiple attribute risk score")
@@ -1153,263 +943,27 @@ def privacyPreservation():
                     "Graph interpretation": "No visualization available - no quasi-identifiers selected.",
                     "ErrorType": "Selection Error"
                 }
+            # Validate that ID feature is selected
+            elif not id_feature or id_feature.strip() == '':
+                final_dict["Multiple attribute risk scoring"] = {
+                    "Error": "No ID feature selected for multiple attribute risk scoring.",
+                    "Multiple attribute risk scoring Visualization": "",
+                    "Graph interpretation": "No visualization available - no ID feature selected.",
+                    "ErrorType": "Selection Error"
+                }
             else:
-                # Validate that ID feature is selected
-                if not id_feature or id_feature.strip() == '':
-                    final_dict["Multiple attribute risk scoring"] = {
-                        "Error": "No ID feature selected for multiple attribute risk scoring.",
-                        "Multiple attribute risk scoring Visualization": "",
-                        "Graph interpretation": "No visualization available - no ID feature selected.",
-                        "ErrorType": "Selection Error"
-                    }
-                else:
-                    # Generate cache key for multiple attribute risk scoring
-                    cache_key = generate_metric_cache_key(
-                        file_name,
-                        "multiple",
-                        id_feature=id_feature,
-                        qis=eval_features
-                    )
-
-                    print(f"Privacy - Multiple Attribute Risk Score Generated cache key: {cache_key}")
-
-                    # Check if this calculation has been cached
-                    if cache_key in current_app.TEMP_RESULTS_CACHE:
-                        print(f"Privacy - Multiple Attribute Risk Score Cache HIT for key: {cache_key}")
-                        cached_entry = current_app.TEMP_RESULTS_CACHE[cache_key]
-                        if is_metric_cache_valid(cached_entry):
-                            print("Privacy - Multiple Attribute Risk Score Cache is VALID, using cached result")
-                            final_dict["Multiple attribute risk scoring"] = cached_entry['data']
-                            # Reset expiration time when using cached result
-                            current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                                'data': cached_entry['data'],
-                                'timestamp': time.time(),
-                                'expires_at': time.time() + (30 * 60)
-                            }
-                            print(f"Using cached Multiple attribute risk scoring for key: {cache_key} (expiration reset)")
-                        else:
-                            print("Privacy - Multiple Attribute Risk Score Cache is EXPIRED, starting new task")
-                            current_app.TEMP_RESULTS_CACHE.pop(cache_key, None)
-                            try:
-                                # Convert DataFrame to JSON for async processing
-                                df_json = file.to_json()
-                                # Start async task
-                                task = calculate_multiple_attribute_risk_score.delay(df_json, id_feature, eval_features)
-                                final_dict["Multiple attribute risk scoring"] = {
-                                    "task_id": task.id,
-                                    "status": "processing",
-                                    "message": "Multiple attribute risk scoring is being processed asynchronously. Please check back later.",
-                                    "is_async": True,
-                                    "cache_key": cache_key
-                                }
-                                current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                                    'data': final_dict["Multiple attribute risk scoring"],
-                                    'timestamp': time.time(),
-                                    'expires_at': time.time() + (30 * 60),
-                                    'task_id': task.id
-                                }
-                                print(f"Started new Celery task for Multiple attribute risk scoring: {task.id}")
-                            except Exception as e:
-                                error_message = str(e)
-                                if "Dataset is empty" in error_message:
-                                    error_response = {
-                                        "Error": "Dataset is empty. Please upload a dataset with data.",
-                                        "Description": "The uploaded dataset contains no data rows.",
-                                        "Multiple attribute risk scoring Visualization": "",
-                                        "Graph interpretation": "No visualization available due to empty dataset.",
-                                        "ErrorType": "Data Error"
-                                    }
-                                elif "No valid quasi-identifiers" in error_message:
-                                    error_response = {
-                                        "Error": "No valid quasi-identifiers provided for multiple attribute risk scoring.",
-                                        "Multiple attribute risk scoring Visualization": "",
-                                        "Graph interpretation": "No visualization available due to invalid quasi-identifiers.",
-                                        "ErrorType": "Selection Error"
-                                    }
-                                elif "not found in dataset" in error_message:
-                                    error_response = {
-                                        "Error": f"Selected columns not found in dataset: {error_message}",
-                                        "Multiple attribute risk scoring Visualization": "",
-                                        "Graph interpretation": "No visualization available due to missing columns.",
-                                        "ErrorType": "Data Error"
-                                    }
-                                elif "must contain unique values" in error_message:
-                                    error_response = {
-                                        "Error": "One or more quasi-identifiers have only one unique value.",
-                                        "Multiple attribute risk scoring Visualization": "",
-                                        "Graph interpretation": "No visualization available due to non-unique ID values.",
-                                        "ErrorType": "Data Error"
-                                    }
-                                elif "appear to be numerical" in error_message:
-                                    error_response = {
-                                        "Error": "Selected quasi-identifiers appear to be numerical with too many unique values.",
-                                        "Multiple attribute risk scoring Visualization": "",
-                                        "Graph interpretation": "No visualization available due to unsuitable column types.",
-                                        "ErrorType": "Data Error"
-                                    }
-                                elif "no data remains" in error_message:
-                                    error_response = {
-                                        "Error": "After removing missing values, no data remains.",
-                                        "Multiple attribute risk scoring Visualization": "",
-                                        "Graph interpretation": "No visualization available due to insufficient data.",
-                                        "ErrorType": "Data Error"
-                                    }
-                                elif "More than 50% of data was removed" in error_message:
-                                    error_response = {
-                                        "Error": "More than 50% of data was removed due to missing values.",
-                                        "Multiple attribute risk scoring Visualization": "",
-                                        "Graph interpretation": "No visualization available due to poor data quality.",
-                                        "ErrorType": "Data Quality Error"
-                                    }
-                                elif "has only one unique value" in error_message:
-                                    error_response = {
-                                        "Error": "One or more quasi-identifiers have only one unique value.",
-                                        "Multiple attribute risk scoring Visualization": "",
-                                        "Graph interpretation": "No visualization available due to insufficient column variation.",
-                                        "ErrorType": "Data Error"
-                                    }
-                                elif "already a perfect identifier" in error_message:
-                                    error_response = {
-                                        "Error": "One or more quasi-identifiers are already perfect identifiers.",
-                                        "Multiple attribute risk scoring Visualization": "",
-                                        "Graph interpretation": "No visualization available due to perfect identification.",
-                                        "ErrorType": "Data Error"
-                                    }
-                                elif "causing division by zero" in error_message:
-                                    error_response = {
-                                        "Error": "Unexpected data structure causing division by zero.",
-                                        "Multiple attribute risk scoring Visualization": "",
-                                        "Graph interpretation": "No visualization available due to data structure issues.",
-                                        "ErrorType": "Processing Error"
-                                    }
-                                elif "task timed out" in error_message:
-                                    error_response = {
-                                        "Error": "Multiple Attribute Risk task timed out. The dataset may be too large or complex.",
-                                        "Multiple attribute risk scoring Visualization": "",
-                                        "Graph interpretation": "No visualization available due to timeout.",
-                                        "ErrorType": "Timeout Error"
-                                    }
-                                else:
-                                    error_response = {
-                                        "Error": f"Processing error: {error_message}",
-                                        "Multiple attribute risk scoring Visualization": "",
-                                        "Graph interpretation": "No visualization available due to processing error.",
-                                        "ErrorType": "Processing Error"
-                                    }
-
-                                final_dict["Multiple attribute risk scoring"] = error_response
-                                print(f"Error in Multiple attribute risk scoring: {error_message}")
-                    else:
-                        print(f"Privacy - Multiple Attribute Risk Score Cache MISS for key: {cache_key}")
-                        try:
-                            # Convert DataFrame to JSON for async processing
-                            df_json = file.to_json()
-                            # Start async task
-                            task = calculate_multiple_attribute_risk_score.delay(df_json, id_feature, eval_features)
-                            final_dict["Multiple attribute risk scoring"] = {
-                                "task_id": task.id,
-                                "status": "processing",
-                                "message": "Multiple attribute risk scoring is being processed asynchronously. Please check back later.",
-                                "is_async": True,
-                                "cache_key": cache_key
-                            }
-                            current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                                'data': final_dict["Multiple attribute risk scoring"],
-                                'timestamp': time.time(),
-                                'expires_at': time.time() + (30 * 60),
-                                'task_id': task.id
-                            }
-                            print(f"Started new Celery task for Multiple attribute risk scoring: {task.id}")
-                        except Exception as e:
-                            error_message = str(e)
-                            if "Dataset is empty" in error_message:
-                                error_response = {
-                                    "Error": "Dataset is empty. Please upload a dataset with data.",
-                                    "Description": "The uploaded dataset contains no data rows.",
-                                    "Multiple attribute risk scoring Visualization": "",
-                                    "Graph interpretation": "No visualization available due to empty dataset.",
-                                    "ErrorType": "Data Error"
-                                }
-                            elif "No valid quasi-identifiers" in error_message:
-                                error_response = {
-                                    "Error": "No valid quasi-identifiers provided for multiple attribute risk scoring.",
-                                    "Multiple attribute risk scoring Visualization": "",
-                                    "Graph interpretation": "No visualization available due to invalid quasi-identifiers.",
-                                    "ErrorType": "Selection Error"
-                                }
-                            elif "not found in dataset" in error_message:
-                                error_response = {
-                                    "Error": f"Selected columns not found in dataset: {error_message}",
-                                    "Multiple attribute risk scoring Visualization": "",
-                                    "Graph interpretation": "No visualization available due to missing columns.",
-                                    "ErrorType": "Data Error"
-                                }
-                            elif "must contain unique values" in error_message:
-                                error_response = {
-                                    "Error": "One or more quasi-identifiers have only one unique value.",
-                                    "Multiple attribute risk scoring Visualization": "",
-                                    "Graph interpretation": "No visualization available due to non-unique ID values.",
-                                    "ErrorType": "Data Error"
-                                }
-                            elif "appear to be numerical" in error_message:
-                                error_response = {
-                                    "Error": "Selected quasi-identifiers appear to be numerical with too many unique values.",
-                                    "Multiple attribute risk scoring Visualization": "",
-                                    "Graph interpretation": "No visualization available due to unsuitable column types.",
-                                    "ErrorType": "Data Error"
-                                }
-                            elif "no data remains" in error_message:
-                                error_response = {
-                                    "Error": "After removing missing values, no data remains.",
-                                    "Multiple attribute risk scoring Visualization": "",
-                                    "Graph interpretation": "No visualization available due to insufficient data.",
-                                    "ErrorType": "Data Error"
-                                }
-                            elif "More than 50% of data was removed" in error_message:
-                                error_response = {
-                                    "Error": "More than 50% of data was removed due to missing values.",
-                                    "Multiple attribute risk scoring Visualization": "",
-                                    "Graph interpretation": "No visualization available due to poor data quality.",
-                                    "ErrorType": "Data Quality Error"
-                                }
-                            elif "has only one unique value" in error_message:
-                                error_response = {
-                                    "Error": "One or more quasi-identifiers have only one unique value.",
-                                    "Multiple attribute risk scoring Visualization": "",
-                                    "Graph interpretation": "No visualization available due to insufficient column variation.",
-                                    "ErrorType": "Data Error"
-                                }
-                            elif "already a perfect identifier" in error_message:
-                                error_response = {
-                                    "Error": "One or more quasi-identifiers are already perfect identifiers.",
-                                    "Multiple attribute risk scoring Visualization": "",
-                                    "Graph interpretation": "No visualization available due to perfect identification.",
-                                    "ErrorType": "Data Error"
-                                }
-                            elif "causing division by zero" in error_message:
-                                error_response = {
-                                    "Error": "Unexpected data structure causing division by zero.",
-                                    "Multiple attribute risk scoring Visualization": "",
-                                    "Graph interpretation": "No visualization available due to data structure issues.",
-                                    "ErrorType": "Processing Error"
-                                }
-                            elif "task timed out" in error_message:
-                                error_response = {
-                                    "Error": "Multiple Attribute Risk task timed out. The dataset may be too large or complex.",
-                                    "Multiple attribute risk scoring Visualization": "",
-                                    "Graph interpretation": "No visualization available due to timeout.",
-                                    "ErrorType": "Timeout Error"
-                                }
-                            else:
-                                error_response = {
-                                    "Error": f"Processing error: {error_message}",
-                                    "Multiple attribute risk scoring Visualization": "",
-                                    "Graph interpretation": "No visualization available due to processing error.",
-                                    "ErrorType": "Processing Error"
-                                }
+                final_dict["Multiple attribute risk scoring"] = start_risk_score_task(
+                    "Multiple attribute risk scoring", calculate_multiple_attribute_risk_score,
+                    file_info, id_feature, eval_features,
+                    # the Markov chain follows the quasi-identifiers in the order given
+                    qis_ordered=True,
+                )
 
-                            final_dict["Multiple attribute risk scoring"] = error_response
-                            print(f"Error in Multiple attribute risk scoring: {error_message}")
+        # k-Anonymity, l-Diversity, t-Closeness and Entropy Risk are all derived from
+        # the equivalence classes of the quasi-identifiers, so every metric that is not
+        # cached is computed in one combined job that reads and groups the data once
+        pending_metrics = {}
+        pending_cache_keys = {}
 
         # k-Anonymity
         if request.form.get("k-anonymity") == "yes":
@@ -1423,118 +977,15 @@ def privacyPreservation():
                     "Graph interpretation": "No visualization available - no quasi-identifiers selected."
                 }
             else:
-                # Generate cache key for k-anonymity
-                cache_key = generate_metric_cache_key(
-                    file_name,
-                    "kanon",
-                    qis=k_qis
+                cache_key = metric_cache_key(
+                    "k-Anonymity", file_info, unordered=("qis",), qis=k_qis
                 )
 
-                print(f"Privacy - k-Anonymity Generated cache key: {cache_key}")
-
-                # Check if this calculation has been cached
-                if cache_key in current_app.TEMP_RESULTS_CACHE:
-                    print(f"Privacy - k-Anonymity Cache HIT for key: {cache_key}")
-                    cached_entry = current_app.TEMP_RESULTS_CACHE[cache_key]
-                    if is_metric_cache_valid(cached_entry):
-                        print("Privacy - k-Anonymity Cache is VALID, using cached result")
-                        final_dict["k-Anonymity"] = cached_entry['data']
-                        # Reset expiration time when using cached result
-                        current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                            'data': cached_entry['data'],
-                            'timestamp': time.time(),
-                            'expires_at': time.time() + (30 * 60)
-                        }
-                        print(f"Using cached k-Anonymity for key: {cache_key} (expiration reset)")
-                    else:
-                        print("Privacy - k-Anonymity Cache is EXPIRED, recalculating")
-                        current_app.TEMP_RESULTS_CACHE.pop(cache_key, None)
-                        try:
-                            result = compute_k_anonymity(k_qis, file)
-                            final_dict["k-Anonymity"] = result
-                            current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                                'data': result,
-                                'timestamp': time.time(),
-                                'expires_at': time.time() + (30 * 60)
-                            }
-                            print(f"Cached k-Anonymity for key: {cache_key}")
-                        except Exception as e:
-                            error_message = str(e)
-                            if "Input DataFrame is empty" in error_message:
-                                error_response = {
-                                    "Error": "The uploaded dataset contains no data rows.",
-                                    "k-Anonymity Visualization": "",
-                                    "Graph interpretation": "No visualization available due to empty dataset."
-                                }
-                            elif "not found in the dataset" in error_message:
-                                error_response = {
-                                    "Error": f"Selected columns not found in dataset: {error_message}",
-                                    "k-Anonymity Visualization": "",
-                                    "Graph interpretation": "No visualization available due to missing columns."
-                                }
-                            elif "No data left after dropping rows with missing quasi-identifiers" in error_message:
-                                error_response = {
-                                    "Error": "After removing missing values, no data remains.",
-                                    "k-Anonymity Visualization": "",
-                                    "Graph interpretation": "No visualization available due to insufficient data."
-                                }
-                            elif "K anonymity task timed out" in error_message:
-                                error_response = {
-                                    "Error": "K-Anonymity task timed out. The dataset may be too large or complex."
-                                }
-                            else:
-                                error_response = {
-                                    "Error": f"Processing error: {error_message}",
-                                    "k-Anonymity Visualization": "",
-                                    "Graph interpretation": "No visualization available due to processing error."
-                                }
-
-                            final_dict["k-Anonymity"] = error_response
-                            print(f"Error in k-Anonymity: {error_message}")
-                else:
-                    print(f"Privacy - k-Anonymity Cache MISS for key: {cache_key}")
-                    try:
-                        result = compute_k_anonymity(k_qis, file)
-                        final_dict["k-Anonymity"] = result
-                        current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                            'data': result,
-                            'timestamp': time.time(),
-                            'expires_at': time.time() + (30 * 60)
-                        }
-                        print(f"Cached k-Anonymity for key: {cache_key}")
-                    except Exception as e:
-                        error_message = str(e)
-                        if "Input DataFrame is empty" in error_message:
-                            error_response = {
-                                "Error": "The uploaded dataset contains no data rows.",
-                                "k-Anonymity Visualization": "",
-                                "Graph interpretation": "No visualization available due to empty dataset."
-                            }
-                        elif "not found in the dataset" in error_message:
-                            error_response = {
-                                "Error": f"Selected columns not found in dataset: {error_message}",
-                                "k-Anonymity Visualization": "",
-                                "Graph interpretation": "No visualization available due to missing columns."
-                            }
-                        elif "No data left after dropping rows with missing quasi-identifiers" in error_message:
-                            error_response = {
-                                "Error": "After removing missing values, no data remains.",
-                                "k-Anonymity Visualization": "",
-                                "Graph interpretation": "No visualization available due to insufficient data."
-                            }
-                        elif "K anonymity task timed out" in error_message:
-                            error_response = {
-                                "Error": "K-Anonymity task timed out. The dataset may be too large or complex."
-                            }
-                        else:
-                            error_response = {
-                                "Error": f"Processing error: {error_message}",
-                                "k-Anonymity Visualization": "",
-                                "Graph interpretation": "No visualization available due to processing error."
-                            }
-
-                        final_dict["k-Anonymity"] = error_response
-                        print(f"Error in k-Anonymity: {error_message}")
+                # None keeps the metric's position in the result until it is computed
+                final_dict["k-Anonymity"] = get_cached_result(cache_key)
+                if final_dict["k-Anonymity"] is None:
+                    pending_metrics["k-Anonymity"] = {"quasi_identifiers": k_qis}
+                    pending_cache_keys["k-Anonymity"] = cache_key
 
         # l-Diversity
         if request.form.get("l-diversity") == "yes":
@@ -1555,124 +1006,20 @@ def privacyPreservation():
                     "Graph interpretation": "No visualization available - no sensitive attribute selected."
                 }
             else:
-                # Generate cache key for l-diversity
-                cache_key = generate_metric_cache_key(
-                    file_name,
-                    "ldiv",
-                    qis=l_qis,
-                    sensitive=l_sensitive
+                cache_key = metric_cache_key(
+                    "l-Diversity", file_info, unordered=("qis",), qis=l_qis, sensitive=l_sensitive
                 )
 
-                print(f"Privacy - l-Diversity Generated cache key: {cache_key}")
-
-                # Check if this calculation has been cached
-                if cache_key in current_app.TEMP_RESULTS_CACHE:
-                    print(f"Privacy - l-Diversity Cache HIT for key: {cache_key}")
-                    cached_entry = current_app.TEMP_RESULTS_CACHE[cache_key]
-                    if is_metric_cache_valid(cached_entry):
-                        print("Privacy - l-Diversity Cache is VALID, using cached result")
-                        final_dict["l-Diversity"] = cached_entry['data']
-                        # Reset expiration time when using cached result
-                        current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                            'data': cached_entry['data'],
-                            'timestamp': time.time(),
-                            'expires_at': time.time() + (30 * 60)
-                        }
-                        print(f"Using cached l-Diversity for key: {cache_key} (expiration reset)")
-                    else:
-                        print("Privacy - l-Diversity Cache is EXPIRED, recalculating")
-                        current_app.TEMP_RESULTS_CACHE.pop(cache_key, None)
-                        try:
-                            result = compute_l_diversity(l_qis, l_sensitive, file)
-                            final_dict["l-Diversity"] = result
-                            current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                                'data': result,
-                                'timestamp': time.time(),
-                                'expires_at': time.time() + (30 * 60)
-                            }
-                            print(f"Cached l-Diversity for key: {cache_key}")
-                        except Exception as e:
-                            error_message = str(e)
-                            if "Input DataFrame is empty" in error_message:
-                                error_response = {
-                                    "Error": "The uploaded dataset contains no data rows.",
-                                    "l-Diversity Visualization": "",
-                                    "Graph interpretation": "No visualization available due to empty dataset."
-                                }
-                            elif "not found in the dataset" in error_message:
-                                error_response = {
-                                    "Error": f"Selected columns not found in dataset: {error_message}",
-                                    "l-Diversity Visualization": "",
-                                    "Graph interpretation": "No visualization available due to missing columns."
-                                }
-                            elif "No data left after dropping rows with missing quasi-identifiers or sensitive values" in error_message:
-                                error_response = {
-                                    "Error": "After removing missing values, no data remains.",
-                                    "l-Diversity Visualization": "",
-                                    "Graph interpretation": "No visualization available due to insufficient data."
-                                }
-                            elif "L Diversity task timed out" in error_message:
-                                error_response = {
-                                    "Error": "L-Diversity task timed out. The dataset may be too large or complex."
-                                }
-                            else:
-                                error_response = {
-                                    "Error": f"Processing error: {error_message}",
-                                    "l-Diversity Visualization": "",
-                                    "Graph interpretation": "No visualization available due to processing error."
-                                }
-
-                            final_dict["l-Diversity"] = error_response
-                            print(f"Error in l-Diversity: {error_message}")
-                else:
-                    print(f"Privacy - l-Diversity Cache MISS for key: {cache_key}")
-                    try:
-                        result = compute_l_diversity(l_qis, l_sensitive, file)
-                        final_dict["l-Diversity"] = result
-                        current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                            'data': result,
-                            'timestamp': time.time(),
-                            'expires_at': time.time() + (30 * 60)
-                        }
-                        print(f"Cached l-Diversity for key: {cache_key}")
-                    except Exception as e:
-                        error_message = str(e)
-                        if "Input DataFrame is empty" in error_message:
-                            error_response = {
-                                "Error": "The uploaded dataset contains no data rows.",
-                                "l-Diversity Visualization": "",
-                                "Graph interpretation": "No visualization available due to empty dataset."
-                            }
-                        elif "not found in the dataset" in error_message:
-                            error_response = {
-                                "Error": f"Selected columns not found in dataset: {error_message}",
-                                "l-Diversity Visualization": "",
-                                "Graph interpretation": "No visualization available due to missing columns."
-                            }
-                        elif "No data left after dropping rows with missing quasi-identifiers or sensitive values" in error_message:
-                            error_response = {
-                                "Error": "After removing missing values, no data remains.",
-                                "l-Diversity Visualization": "",
-                                "Graph interpretation": "No visualization available due to insufficient data."
-                            }
-                        elif "L Diversity task timed out" in error_message:
-                            error_response = {
-                                "Error": "L-Diversity task timed out. The dataset may be too large or complex."
-                            }
-                        else:
-                            error_response = {
-                                "Error": f"Processing error: {error_message}",
-                                "l-Diversity Visualization": "",
-                                "Graph interpretation": "No visualization available due to processing error."
-                            }
-
-                        final_dict["l-Diversity"] = error_response
-                        print(f"Error in l-Diversity: {error_message}")
+                final_dict["l-Diversity"] = get_cached_result(cache_key)
+                if final_dict["l-Diversity"] is None:
+                    pending_metrics["l-Diversity"] = {"quasi_identifiers": l_qis, "sensitive_column": l_sensitive}
+                    pending_cache_keys["l-Diversity"] = cache_key
 
         # t-Closeness
         if request.form.get("t-closeness") == "yes":
             t_qis = request.form.getlist("quasi identifiers for t-closeness")
             t_sensitive = request.form.get("sensitive attribute for t-closeness")
+            t_distance = request.form.get("distance metric for t-closeness", "TV")
 
             # Validate that user has selected quasi-identifiers
             if not t_qis or (len(t_qis) == 1 and t_qis[0] == ''):
@@ -1688,119 +1035,18 @@ def privacyPreservation():
                     "Graph interpretation": "No visualization available - no sensitive attribute selected."
                 }
             else:
-                # Generate cache key for t-closeness
-                cache_key = generate_metric_cache_key(
-                    file_name,
-                    "tclose",
-                    qis=t_qis,
-                    sensitive=t_sensitive
+                cache_key = metric_cache_key(
+                    "t-Closeness", file_info, unordered=("qis",), qis=t_qis, sensitive=t_sensitive, distance=t_distance
                 )
 
-                print(f"Privacy - t-Closeness Generated cache key: {cache_key}")
-
-                # Check if this calculation has been cached
-                if cache_key in current_app.TEMP_RESULTS_CACHE:
-                    print(f"Privacy - t-Closeness Cache HIT for key: {cache_key}")
-                    cached_entry = current_app.TEMP_RESULTS_CACHE[cache_key]
-                    if is_metric_cache_valid(cached_entry):
-                        print("Privacy - t-Closeness Cache is VALID, using cached result")
-                        final_dict["t-Closeness"] = cached_entry['data']
-                        # Reset expiration time when using cached result
-                        current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                            'data': cached_entry['data'],
-                            'timestamp': time.time(),
-                            'expires_at': time.time() + (30 * 60)
-                        }
-                        print(f"Using cached t-Closeness for key: {cache_key} (expiration reset)")
-                    else:
-                        print("Privacy - t-Closeness Cache is EXPIRED, recalculating")
-                        current_app.TEMP_RESULTS_CACHE.pop(cache_key, None)
-                        try:
-                            result = compute_t_closeness(t_qis, t_sensitive, file)
-                            final_dict["t-Closeness"] = result
-                            current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                                'data': result,
-                                'timestamp': time.time(),
-                                'expires_at': time.time() + (30 * 60)
-                            }
-                            print(f"Cached t-Closeness for key: {cache_key}")
-                        except Exception as e:
-                            error_message = str(e)
-                            if "Input DataFrame is empty" in error_message:
-                                error_response = {
-                                    "Error": "The uploaded dataset contains no data rows.",
-                                    "t-Closeness Visualization": "",
-                                    "Graph interpretation": "No visualization available due to empty dataset."
-                                }
-                            elif "not found in the dataset" in error_message:
-                                error_response = {
-                                    "Error": f"Selected columns not found in dataset: {error_message}",
-                                    "t-Closeness Visualization": "",
-                                    "Graph interpretation": "No visualization available due to missing columns."
-                                }
-                            elif "No data left after dropping rows with missing values" in error_message:
-                                error_response = {
-                                    "Error": "After removing missing values, no data remains.",
-                                    "t-Closeness Visualization": "",
-                                    "Graph interpretation": "No visualization available due to insufficient data."
-                                }
-                            elif "T Closeness task timed out" in error_message:
-                                error_response = {
-                                    "Error": "T-Closeness task timed out. The dataset may be too large or complex."
-                                }
-                            else:
-                                error_response = {
-                                    "Error": f"Processing error: {error_message}",
-                                    "t-Closeness Visualization": "",
-                                    "Graph interpretation": "No visualization available due to processing error."
-                                }
-
-                            final_dict["t-Closeness"] = error_response
-                            print(f"Error in t-Closeness: {error_message}")
-                else:
-                    print(f"Privacy - t-Closeness Cache MISS for key: {cache_key}")
-                    try:
-                        result = compute_t_closeness(t_qis, t_sensitive, file)
-                        final_dict["t-Closeness"] = result
-                        current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                            'data': result,
-                            'timestamp': time.time(),
-                            'expires_at': time.time() + (30 * 60)
-                        }
-                        print(f"Cached t-Closeness for key: {cache_key}")
-                    except Exception as e:
-                        error_message = str(e)
-                        if "Input DataFrame is empty" in error_message:
-                            error_response = {
-                                "Error": "The uploaded dataset contains no data rows.",
-                                "t-Closeness Visualization": "",
-                                "Graph interpretation": "No visualization available due to empty dataset."
-                            }
-                        elif "not found in the dataset" in error_message:
-                            error_response = {
-                                "Error": f"Selected columns not found in dataset: {error_message}",
-                                "t-Closeness Visualization": "",
-                                "Graph interpretation": "No visualization available due to missing columns."
-                            }
-                        elif "No data left after dropping rows with missing values" in error_message:
-                            error_response = {
-                                "Error": "After removing missing values, no data remains.",
-                                "t-Closeness Visualization": "",
-                                "Graph interpretation": "No visualization available due to insufficient data."
-                            }
-                        elif "T Closeness task timed out" in error_message:
-                            error_response = {
-                                "Error": "T-Closeness task timed out. The dataset may be too large or complex."
-                            }
-                        else:
-                            error_response = {
-                                "Error": f"Processing error: {error_message}",
-                                "t-Closeness Visualization": "",
-                                "Graph interpretation": "No visualization available due to processing error."
-                            }
-
-                        final_dict["t-Closeness"] = error_response
-                        print(f"Error in t-Closeness: {error_message}")
+                final_dict["t-Closeness"] = get_cached_result(cache_key)
+                if final_dict["t-Closeness"] is None:
+                    pending_metrics["t-Closeness"] = {
+                        "quasi_identifiers": t_qis,
+                        "sensitive_column": t_sensitive,
+                        "distance": t_distance,
+                    }
+                    pending_cache_keys["t-Closeness"] = cache_key
 
         # Entropy Risk
         if request.form.get("entropy risk") == "yes":
@@ -1814,118 +1060,28 @@ def privacyPreservation():
                     "Graph interpretation": "No visualization available - no quasi-identifiers selected."
                 }
             else:
-                # Generate cache key for entropy risk
-                cache_key = generate_metric_cache_key(
-                    file_name,
-                    "entropy",
-                    qis=entropy_qis
+                cache_key = metric_cache_key(
+                    "Entropy Risk", file_info, unordered=("qis",), qis=entropy_qis
                 )
 
-                print(f"Privacy - Entropy Risk Generated cache key: {cache_key}")
-
-                # Check if this calculation has been cached
-                if cache_key in current_app.TEMP_RESULTS_CACHE:
-                    print(f"Privacy - Entropy Risk Cache HIT for key: {cache_key}")
-                    cached_entry = current_app.TEMP_RESULTS_CACHE[cache_key]
-                    if is_metric_cache_valid(cached_entry):
-                        print("Privacy - Entropy Risk Cache is VALID, using cached result")
-                        final_dict["Entropy Risk"] = cached_entry['data']
-                        # Reset expiration time when using cached result
-                        current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                            'data': cached_entry['data'],
-                            'timestamp': time.time(),
-                            'expires_at': time.time() + (30 * 60)
-                        }
-                        print(f"Using cached Entropy Risk for key: {cache_key} (expiration reset)")
-                    else:
-                        print("Privacy - Entropy Risk Cache is EXPIRED, recalculating")
-                        current_app.TEMP_RESULTS_CACHE.pop(cache_key, None)
-                        try:
-                            result = compute_entropy_risk(entropy_qis, file)
-                            final_dict["Entropy Risk"] = result
-                            current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                                'data': result,
-                                'timestamp': time.time(),
-                                'expires_at': time.time() + (30 * 60)
-                            }
-                            print(f"Cached Entropy Risk for key: {cache_key}")
-                        except Exception as e:
-                            error_message = str(e)
-                            if "Input DataFrame is empty" in error_message:
-                                error_response = {
-                                    "Error": "The uploaded dataset contains no data rows.",
-                                    "Entropy Risk Visualization": "",
-                                    "Graph interpretation": "No visualization available due to empty dataset."
-                                }
-                            elif "not found in the dataset" in error_message:
-                                error_response = {
-                                    "Error": f"Selected columns not found in dataset: {error_message}",
-                                    "Entropy Risk Visualization": "",
-                                    "Graph interpretation": "No visualization available due to missing columns."
-                                }
-                            elif "No data left after dropping rows with missing values" in error_message:
-                                error_response = {
-                                    "Error": "After removing missing values, no data remains.",
-                                    "Entropy Risk Visualization": "",
-                                    "Graph interpretation": "No visualization available due to insufficient data."
-                                }
-                            elif "Entropy Risk task timed out" in error_message:
-                                error_response = {
-                                    "Error": "Entropy Risk task timed out. The dataset may be too large or complex."
-                                }
-                            else:
-                                error_response = {
-                                    "Error": f"Processing error: {error_message}",
-                                    "Entropy Risk Visualization": "",
-                                    "Graph interpretation": "No visualization available due to processing error."
-                                }
-
-                            final_dict["Entropy Risk"] = error_response
-                            print(f"Error in Entropy Risk: {error_message}")
-                else:
-                    print(f"Privacy - Entropy Risk Cache MISS for key: {cache_key}")
-                    try:
-                        result = compute_entropy_risk(entropy_qis, file)
-                        final_dict["Entropy Risk"] = result
-                        current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                            'data': result,
-                            'timestamp': time.time(),
-                            'expires_at': time.time() + (30 * 60)
-                        }
-                        print(f"Cached Entropy Risk for key: {cache_key}")
-                    except Exception as e:
-                        error_message = str(e)
-                        if "Input DataFrame is empty" in error_message:
-                            error_response = {
-                                "Error": "The uploaded dataset contains no data rows.",
-                                "Entropy Risk Visualization": "",
-                                "Graph interpretation": "No visualization available due to empty dataset."
-                            }
-                        elif "not found in the dataset" in error_message:
-                            error_response = {
-                                "Error": f"Selected columns not found in dataset: {error_message}",
-                                "Entropy Risk Visualization": "",
-                                "Graph interpretation": "No visualization available due to missing columns."
-                            }
-                        elif "No data left after dropping rows with missing values" in error_message:
-                            error_response = {
-                                "Error": "After removing missing values, no data remains.",
-                                "Entropy Risk Visualization": "",
-                                "Graph interpretation": "No visualization available due to insufficient data."
-                            }
-                        elif "Entropy Risk task timed out" in error_message:
-                            error_response = {
-                                "Error": "Entropy Risk task timed out. The dataset may be too large or complex."
-                            }
-                        else:
-                            error_response = {
-                                "Error": f"Processing error: {error_message}",
-                                "Entropy Risk Visualization": "",
-                                "Graph interpretation": "No visualization available due to processing error."
-                            }
+                final_dict["Entropy Risk"] = get_cached_result(cache_key)
+                if final_dict["Entropy Risk"] is None:
+                    pending_metrics["Entropy Risk"] = {"quasi_identifiers": entropy_qis}
+                    pending_cache_keys["Entropy Risk"] = cache_key
 
-                        final_dict["Entropy Risk"] = error_response
-                        print(f"Error in Entropy Risk: {error_message}")
+        if pending_metrics:
+            try:
+                # one task computes every pending metric, each is polled and cached under its own name
+                task = compute_equivalence_class_metrics.delay(pending_metrics, file_info)
+                for metric, cache_key in pending_cache_keys.items():
+                    final_dict[metric] = async_task_placeholder(task.id, metric)
+                    register_task(task.id, metric, cache_key, final_dict[metric])
+                print(f"Started new Celery task for {', '.join(pending_metrics)}: {task.id}")
+            except Exception as e:
+                error_message = str(e)
+                for metric in pending_metrics:
+                    final_dict[metric] = equivalence_class_error_response(metric, error_message)
+                    print(f"Error in {metric}: {error_message}")
 
         end_time = time.time()
         execution_time = end_time - start_time
@@ -2013,39 +1169,26 @@ def handle_summary_statistics():
 @main.route('/summary_statistics', methods=['GET'])
 def get_summary_statistics():
     try:
-        df, uploaded_file_path, uploaded_file_name = read_file()
-        # Extract summary statistics
-        summary_statistics = df.describe().applymap(
-            lambda x: f"{x:.2e}" if abs(x) < 0.001 else round(x, 2)
-        ).to_dict()
-
-        # Calculate probability distributions
-        histograms = summary_histograms(df)
-
-        # Separate numerical and categorical columns
-        numerical_columns = [
-            col
-            for col, dtype in df.dtypes.items()
-            if pd.api.types.is_numeric_dtype(dtype)
-        ]
-        categorical_columns = [
-            col
-            for col, dtype in df.dtypes.items()
-            if pd.api.types.is_object_dtype(dtype)
-        ]
+        profile, file_info = read_profile()
+        summary_statistics = profile["summary_statistics"]
+        if summary_statistics is None:
+            # describe() failed at profiling time; re-raise its error from the data
+            df, uploaded_file_path, uploaded_file_name = read_file()
+            summary_statistics = format_summary_statistics(df)
+
+        # Probability distributions are rendered on first request and kept in the profile
+        histograms = profile.get("histograms")
+        if histograms is None:
+            df, uploaded_file_path, uploaded_file_name = read_file()
+            histograms = summary_histograms(df)
+            profile["histograms"] = histograms
+            update_profile(file_info, profile)
+
+        numerical_columns, categorical_columns = profile_feature_lists(profile)
         all_features = numerical_columns + categorical_columns
 
-        for v in summary_statistics.values():
-            for old_key in v:
-                if old_key in ["25%", "50%", "75%"]:
-                    new_key = old_key.replace("%", "th percentile")
-                    v[new_key] = v.pop(old_key)
-
-        # Count the number of records
-        records_count = len(df)
-
-        # count the number of features
-        feature_count = len(df.columns)
+        records_count = profile["records_count"]
+        feature_count = profile["features_count"]
 
         response_data = {
             'success': True,
@@ -2075,12 +1218,19 @@ def check_task_status(task_id, metric_name):
             if task_result.successful():
                 result = task_result.get()
 
+                # a task computing several metrics (e.g. correlations) is polled once per metric
+                if isinstance(result, dict) and metric_name in result:
+                    result = result[metric_name]
+                elif isinstance(result, dict) and "Message" in result:
+                    # calc_correlations reports failures as {"Message": ...}
+                    result = {"Error": result["Message"]}
+                cache_task_result(task_id, metric_name, result)
+
                 # Store the result in cache for the frontend to retrieve
                 cache_key = f"{task_id}_{metric_name}"
-                current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                    'data': result,
-                    'timestamp': time.time()
-                }
+                current_app.TEMP_RESULTS_CACHE.set(
+                    cache_key, {'data': result, 'timestamp': time.time()}, user=get_current_user_id()
+                )
 
                 # Return a clean response with just what the frontend needs
                 return jsonify({
@@ -2089,6 +1239,10 @@ def check_task_status(task_id, metric_name):
                 })
             else:
                 error = str(task_result.info) if task_result.info else "Task failed"
+                if metric_name in EQUIVALENCE_CLASS_ERRORS:
+                    # the equivalence-class job raises for all its metrics at once
+                    error = equivalence_class_error_response(metric_name, error)["Error"]
+                cache_task_result(task_id, metric_name, {"Error": error})
                 return jsonify({
                     'status': 'failed',
                     'error': error
@@ -2118,31 +1272,16 @@ def check_task_status(task_id, metric_name):
 @main.route('/feature_set', methods=['POST'])
 def extract_features():
     try:
-        df, uploaded_file_path, uploaded_file_name = read_file()
-
-        file_path = session.get("uploaded_file_path")
-        file_name = session.get("uploaded_file_name")
-        file_type = session.get("uploaded_file_type")
-        file_info = (file_path, file_name, file_type)
-        df = read_file_parser(file_info)
-
-        # Separate numerical and categorical columns
-        numerical_columns = [col for col, dtype in df.dtypes.items() if pd.api.types.is_numeric_dtype(dtype)]
-        categorical_columns = [col for col, dtype in df.dtypes.items() if pd.api.types.is_object_dtype(dtype)]
+        profile, _ = read_profile()
+        numerical_columns, categorical_columns = profile_feature_lists(profile)
         all_features = numerical_columns + categorical_columns
 
         # Filter features for Class Imbalance (30 or fewer unique values)
-        class_imbalance_features = []
-        for col in all_features:
-            unique_count = df[col].nunique()
-            if unique_count <= 30:
-                class_imbalance_features.append(col)
-
-        # Count the number of records
-        records_count = len(df)
+        nunique = {column["name"]: column["nunique"] for column in profile["columns"]}
+        class_imbalance_features = [col for col in all_features if nunique[col] <= 30]
 
-        # count the number of features
-        feature_count = len(df.columns)
+        records_count = profile["records_count"]
+        feature_count = profile["features_count"]
 
         response_data = {
             'success': True,
@@ -2179,62 +1318,56 @@ def read_file():
         session.pop('uploaded_file_path', None)
         session.pop('uploaded_file_name', None)
         session.pop('uploaded_file_type', None)
+        session.pop('uploaded_file_hash', None)
         return redirect(url_for('upload_file'))
 
     # default result
     readFile = None
     try:
-        # csv
-        if uploaded_file_type == ('.csv'):
-            readFile = pd.read_csv(uploaded_file_path, index_col=False)
-        # npz
-        elif uploaded_file_type == ('.npz'):
-            npz_data = np.load(uploaded_file_path, allow_pickle=True)
-
-            data_dict = {}
-
-            for key in npz_data.files:
-                array = npz_data[key]
-
-                # Check dimensionality
-                if array.ndim == 1:
-                    data_dict[key] = array
-                else:
-                    # Flatten if it's a 2D array with only 1 column
-                    if array.ndim == 2 and array.shape[1] == 1:
-                        data_dict[key] = array.flatten()
-                    else:
-                        # Otherwise, store the whole array as a column of objects (fallback)
-                        data_dict[key] = [row for row in array]
-
-            # Now create the DataFrame safely
-            readFile = pd.DataFrame(data_dict)
-        # excel
-        elif uploaded_file_type == ('.xls, .xlsb, .xlsx, .xlsm'):
-            readFile = pd.read_excel(uploaded_file_path)
+        # parse through the file parser so routes share the columnar snapshot with metric tasks
+        file_info = (uploaded_file_path, uploaded_file_name, uploaded_file_type)
+        readFile = read_file_parser(file_info)
+        if isinstance(readFile, str):
+            raise ValueError(readFile)
     except Exception as e:
         print(f"Error reading file {uploaded_file_path}: {e}")
         # Clear session on error
         session.pop('uploaded_file_path', None)
         session.pop('uploaded_file_name', None)
         session.pop('uploaded_file_type', None)
+        session.pop('uploaded_file_hash', None)
         return redirect(url_for('upload_file'))
 
     return readFile, uploaded_file_path, uploaded_file_name
 
 
-def manage_cache_size(max_cache_size=100):
+def read_profile():
     """
-    Manage the cache size by removing oldest entries if cache exceeds max size.
-    This prevents memory issues from cache growth.
+    Returns the dataset profile of the uploaded file and its file_info,
+    clearing the session like read_file() if the file is gone.
     """
-    if len(current_app.TEMP_RESULTS_CACHE) > max_cache_size:
-        # Remove oldest entries (first 20% of cache)
-        items_to_remove = int(max_cache_size * 0.2)
-        keys_to_remove = list(current_app.TEMP_RESULTS_CACHE.keys())[:items_to_remove]
-        for key in keys_to_remove:
-            current_app.TEMP_RESULTS_CACHE.pop(key, None)
-        print(f"Cache cleanup: Removed {len(keys_to_remove)} old entries")
+    file_info = (
+        session.get('uploaded_file_path'),
+        session.get('uploaded_file_name'),
+        session.get('uploaded_file_type'),
+    )
+    if file_info[0] and not os.path.exists(file_info[0]):
+        print(f"File not found: {file_info[0]}")
+        session.pop('uploaded_file_path', None)
+        session.pop('uploaded_file_name', None)
+        session.pop('uploaded_file_type', None)
+        session.pop('uploaded_file_hash', None)
+    profile = profile_file(file_info)
+    if not isinstance(profile, dict):
+        raise ValueError(profile or f"Unsupported file type: {file_info[2]}")
+    return profile, file_info
+
+
+def profile_feature_lists(profile):
+    """Returns the (numerical, categorical) column names of a dataset profile."""
+    numerical_columns = [column["name"] for column in profile["columns"] if column["kind"] == "numerical"]
+    categorical_columns = [column["name"] for column in profile["columns"] if column["kind"] == "categorical"]
+    return numerical_columns, categorical_columns
 
 
 def store_result(metric, final_dict):
@@ -2242,11 +1375,10 @@ def store_result(metric, final_dict):
     # save results
     results_id = uuid.uuid4().hex
 
-    # ISSUE: Cache size is RAM dependent, if the cache is too large, it may cause memory issues.
-    # POTENTIAL SOLUTION: Use a database (doc.db?) to store results or iteratively parse the results.
-    current_app.TEMP_RESULTS_CACHE[results_id] = {
-        'data': formatted_final_dict,
-    }
+    # held until the redirected request reads it (or the cache TTL), charged to the user's budget
+    current_app.TEMP_RESULTS_CACHE.set(
+        results_id, {'data': formatted_final_dict}, user=get_current_user_id()
+    )
     return redirect(url_for(metric,
                             results_id=results_id,
                             return_type=request.args.get('returnType')))
@@ -2376,8 +1508,9 @@ def my_cache():
     try:
         user_id = get_current_user_id()
         cache = current_app.TEMP_RESULTS_CACHE
-        # Get user-specific cache keys
-        user_cache_keys = [key for key in cache.keys() if key.startswith(f"user:{user_id}")]
+        # Get user-specific cache keys (aliases of shared results are listed by the key they point to)
+        user_prefix = user_alias_key("", user_id)
+        user_cache_keys = [key[len(user_prefix):] for key in cache.keys() if key.startswith(user_prefix)]
         # Calculate cache statistics
         total_user_entries = len(user_cache_keys)
         global_cache_size = len(cache)
@@ -2387,6 +1520,9 @@ def my_cache():
             'total_user_entries': total_user_entries,
             'global_cache_size': global_cache_size,
             'user_cache_percentage': user_cache_percentage,
+            'user_cache_bytes': cache.user_bytes(user_id),
+            'cache_stats': cache.stats(),
+            'store_stats': current_app.RESULT_STORE.stats() if current_app.RESULT_STORE else None,
             'user_cache_keys': user_cache_keys
         }
         return render_template('my_cache.html', cache_info=cache_info)
@@ -2411,144 +1547,52 @@ def clear_cache():
         }), 500
 
 
-def process_differential_privacy(file_name, feature_to_add_noise, epsilon, file, final_dict, current_app):
-    """Helper function to process differential privacy with caching and error handling"""
-
-    # Generate cache key for differential privacy
-    cache_key = generate_metric_cache_key(
-        file_name,
-        "dp",
-        features=feature_to_add_noise,
-        epsilon=epsilon
-    )
-
-    print(f"Privacy - DP Generated cache key: {cache_key}")
-
-    # Check if this calculation has been cached
-    if cache_key in current_app.TEMP_RESULTS_CACHE:
-        print(f"Privacy - DP Cache HIT for key: {cache_key}")
-        cached_entry = current_app.TEMP_RESULTS_CACHE[cache_key]
-        if is_metric_cache_valid(cached_entry):
-            print("Privacy - DP Cache is VALID, using cached result")
-            final_dict['DP Statistics'] = cached_entry['data']
-            # Reset expiration time when using cached result
-            current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                'data': cached_entry['data'],
-                'timestamp': time.time(),
-                'expires_at': time.time() + (30 * 60)
+def process_differential_privacy(feature_to_add_noise, epsilon, file_info, final_dict):
+    """
+    Helper function to process differential privacy with error handling.
+    Not cached: every run draws new noise and writes its own noisy file.
+    """
+    try:
+        noisy_stat = return_noisy_stats(feature_to_add_noise, float(epsilon), read_file_parser(file_info))
+        final_dict['DP Statistics'] = noisy_stat
+    except Exception as e:
+        error_message = str(e)
+
+        if "Epsilon must be greater than 0" in error_message:
+            error_response = {
+                "Error": "Invalid epsilon value. Epsilon must be greater than 0.",
+                "DP Statistics Visualization": "",
+                "Graph interpretation": "No visualization available due to invalid parameters.",
+                "Mean of feature (before noise)": "N/A",
+                "Variance of feature (before noise)": "N/A",
+                "Mean of feature (after noise)": "N/A",
+                "Variance of feature (after noise)": "N/A",
+                "Noisy file saved": "Failed - Invalid parameters"
+            }
+        elif "Dataset is empty" in error_message:
+            error_response = {
+                "Error": "Dataset is empty after removing null values or contains no valid data.",
+                "DP Statistics Visualization": "",
+                "Graph interpretation": "No visualization available - insufficient data.",
+                "Mean of feature (before noise)": "N/A",
+                "Variance of feature (before noise)": "N/A",
+                "Mean of feature (after noise)": "N/A",
+                "Variance of feature (after noise)": "N/A",
+                "Noisy file saved": "Failed - No data to process"
             }
-            print(f"Using cached DP Statistics for key: {cache_key} (expiration reset)")
         else:
-            print("Privacy - DP Cache is EXPIRED, recalculating")
-            current_app.TEMP_RESULTS_CACHE.pop(cache_key, None)
-            try:
-                noisy_stat = return_noisy_stats(feature_to_add_noise, float(epsilon), file)
-                final_dict['DP Statistics'] = noisy_stat
-                current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                    'data': noisy_stat,
-                    'timestamp': time.time(),
-                    'expires_at': time.time() + (30 * 60)
-                }
-                print(f"Cached DP Statistics for key: {cache_key}")
-            except Exception as e:
-                error_message = str(e)
-
-                if "Epsilon must be greater than 0" in error_message:
-                    error_response = {
-                        "Error": "Invalid epsilon value. Epsilon must be greater than 0.",
-                        "DP Statistics Visualization": "",
-                        "Graph interpretation": "No visualization available due to invalid parameters.",
-                        "Mean of feature (before noise)": "N/A",
-                        "Variance of feature (before noise)": "N/A",
-                        "Mean of feature (after noise)": "N/A",
-                        "Variance of feature (after noise)": "N/A",
-                        "Noisy file saved": "Failed - Invalid parameters"
-                    }
-                elif "Dataset is empty" in error_message:
-                    error_response = {
-                        "Error": "Dataset is empty after removing null values or contains no valid data.",
-                        "DP Statistics Visualization": "",
-                        "Graph interpretation": "No visualization available - insufficient data.",
-                        "Mean of feature (before noise)": "N/A",
-                        "Variance of feature (before noise)": "N/A",
-                        "Mean of feature (after noise)": "N/A",
-                        "Variance of feature (after noise)": "N/A",
-                        "Noisy file saved": "Failed - No data to process"
-                    }
-                else:
-                    error_response = {
-                        "Error": f"Processing error: {error_message}",
-                        "DP Statistics Visualization": "",
-                        "Graph interpretation": "No visualization available due to processing error.",
-                        "Mean of feature (before noise)": "N/A",
-                        "Variance of feature (before noise)": "N/A",
-                        "Mean of feature (after noise)": "N/A",
-                        "Variance of feature (after noise)": "N/A",
-                        "Noisy file saved": "Failed - Processing error"
-                    }
-
-                final_dict['DP Statistics'] = error_response
-                current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                    'data': error_response,
-                    'timestamp': time.time(),
-                    'expires_at': time.time() + (30 * 60)
-                }
-                print(f"Cached DP Statistics Error for key: {cache_key}")
-    else:
-        print(f"Privacy - DP Cache MISS for key: {cache_key}")
-        try:
-            noisy_stat = return_noisy_stats(feature_to_add_noise, float(epsilon), file)
-            final_dict['DP Statistics'] = noisy_stat
-            current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                'data': noisy_stat,
-                'timestamp': time.time(),
-                'expires_at': time.time() + (30 * 60)
+            error_response = {
+                "Error": f"Processing error: {error_message}",
+                "DP Statistics Visualization": "",
+                "Graph interpretation": "No visualization available due to processing error.",
+                "Mean of feature (before noise)": "N/A",
+                "Variance of feature (before noise)": "N/A",
+                "Mean of feature (after noise)": "N/A",
+                "Variance of feature (after noise)": "N/A",
+                "Noisy file saved": "Failed - Processing error"
             }
-            print(f"Cached DP Statistics for key: {cache_key}")
-        except Exception as e:
-            error_message = str(e)
-
-            if "Epsilon must be greater than 0" in error_message:
-                error_response = {
-                    "Error": "Invalid epsilon value. Epsilon must be greater than 0.",
-                    "DP Statistics Visualization": "",
-                    "Graph interpretation": "No visualization available due to invalid parameters.",
-                    "Mean of feature (before noise)": "N/A",
-                    "Variance of feature (before noise)": "N/A",
-                    "Mean of feature (after noise)": "N/A",
-                    "Variance of feature (after noise)": "N/A",
-                    "Noisy file saved": "Failed - Invalid parameters"
-                }
-            elif "Dataset is empty" in error_message:
-                error_response = {
-                    "Error": "Dataset is empty after removing null values or contains no valid data.",
-                    "DP Statistics Visualization": "",
-                    "Graph interpretation": "No visualization available - insufficient data.",
-                    "Mean of feature (before noise)": "N/A",
-                    "Variance of feature (before noise)": "N/A",
-                    "Mean of feature (after noise)": "N/A",
-                    "Variance of feature (after noise)": "N/A",
-                    "Noisy file saved": "Failed - No data to process"
-                }
-            else:
-                error_response = {
-                    "Error": f"Processing error: {error_message}",
-                    "DP Statistics Visualization": "",
-                    "Graph interpretation": "No visualization available due to processing error.",
-                    "Mean of feature (before noise)": "N/A",
-                    "Variance of feature (before noise)": "N/A",
-                    "Mean of feature (after noise)": "N/A",
-                    "Variance of feature (after noise)": "N/A",
-                    "Noisy file saved": "Failed - Processing error"
-                }
 
-            final_dict['DP Statistics'] = error_response
-            current_app.TEMP_RESULTS_CACHE[cache_key] = {
-                'data': error_response,
-                'timestamp': time.time(),
-                'expires_at': time.time() + (30 * 60)
-            }
-            print(f"Cached DP Statistics Error for key: {cache_key}")
+        final_dict['DP Statistics'] = error_response
 
 
 if __name__ == '__main__':
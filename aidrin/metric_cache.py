@@ -0,0 +1,321 @@
+import copy
+import functools
+import inspect
+import json
+import os
+import time
+import uuid
+
+from celery.result import AsyncResult
+from flask import current_app, has_request_context, session
+
+from aidrin.file_handling.snapshot import content_hash
+
+# Notes:
+# Metric results are cached in current_app.TEMP_RESULTS_CACHE under keys built
+# from the dataset's content hash, the metric name and its normalized
+# parameters. These keys hold no user, so every user analysing the same data
+# shares one result (and one running task). Each user gets an alias entry
+# "user:<id>|<key>" for the results they used, which only serves to list and
+# clear "their" cache in /my_cache. Datasets without a content hash are
+# identified by file name, so their keys stay scoped to the user.
+# Synchronous metrics use the @memoize_metric decorator; metrics run as Celery
+# tasks look up their key before dispatching the task and have their result
+# cached by /check_and_update_task once the task completes (see
+# register_task / cache_task_result).
+# Results of content-addressed datasets are also written to the persistent
+# result store (current_app.RESULT_STORE), which is consulted on a miss so
+# results survive restarts. Placeholders of running tasks and error results
+# are only kept in memory.
+
+METRIC_CACHE_TTL = 30 * 60  # seconds
+# metrics whose results are drawn from random noise (and that write a noisy
+# copy of the data as a side effect) are never cached, shared or persisted
+UNCACHED_METRICS = ("DP Statistics",)
+# longest Celery task time limit (the risk scoring tasks in privacy_measure)
+TASK_TIME_LIMIT = 20 * 60  # seconds
+# Celery keeps a task result for result_expires seconds after the task ends
+TASK_RESULT_EXPIRES = 10 * 60  # seconds, unless set in the Celery config
+
+
+def get_current_user_id():
+    """Get current user ID from session or generate one."""
+    if 'user_id' not in session:
+        session['user_id'] = str(uuid.uuid4())
+    return session['user_id']
+
+
+def _normalize(value, unordered):
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (list, tuple, set)):
+        items = [_normalize(item, False) for item in value]
+        if unordered or isinstance(value, set):
+            items.sort(key=str)
+        return items
+    if isinstance(value, dict):
+        return {str(k): _normalize(v, False) for k, v in value.items()}
+    return value
+
+
+def normalize_params(params, unordered=()):
+    """
+
+    Serializes metric parameters into a canonical string: strings are
+    stripped, keys are sorted, and the lists named in unordered (e.g. a set
+    of quasi-identifiers) are sorted so their order does not matter.
+
+    Returns
+    ----------
+    str
+    """
+    return json.dumps(
+        {name: _normalize(value, name in unordered) for name, value in params.items()},
+        sort_keys=True,
+        default=str,
+    )
+
+
+def dataset_key(file_info):
+    # the same bytes parsed as another file type are a different dataset
+    file_path, file_name, file_type = file_info
+    if file_path and os.path.exists(file_path):
+        return f"data:{content_hash(file_path)}:{file_type}"
+    return f"file:{file_name}"
+
+
+def metric_cache_key(metric, file_info, unordered=(), **params):
+    """
+
+    Builds the cache key of a metric result.
+
+    Parameters
+    ----------
+    metric: str
+        metric name.
+    file_info: tuple
+        (file_path, file_name, file_type) of the dataset.
+    unordered: iterable of str
+        names of list parameters whose order does not change the result.
+    **params:
+        metric parameters.
+    Returns
+    ----------
+    str
+    "data:<content hash>:<file type>|<metric>:<parameters>", prefixed with
+    "user:<id>|" if the dataset has no content hash.
+    """
+    parts = [dataset_key(file_info), f"{metric}:{normalize_params(params, unordered)}"]
+    if not parts[0].startswith("data:"):
+        # a file name does not identify the data, so the key is not shared
+        parts.insert(0, f"user:{get_current_user_id()}")
+    return "|".join(parts)
+
+
+def user_alias_key(key, user_id=None):
+    """
+
+    Returns the current (or given) user's alias of a shared cache key.
+    """
+    return f"user:{user_id or get_current_user_id()}|{key}"
+
+
+def _alias(key, ttl):
+    # record that the current user used a shared result
+    if key.startswith("data:") and has_request_context():
+        current_app.TEMP_RESULTS_CACHE[user_alias_key(key)] = {
+            'data': key,
+            'timestamp': time.time(),
+            'expires_at': time.time() + ttl,
+        }
+
+
+def split_metric_cache_key(key):
+    """
+
+    Splits a metric cache key into the parts the persistent result store is
+    keyed by.
+
+    Returns
+    ----------
+    tuple or None
+    (dataset, metric, params), None for keys of datasets without a content
+    hash and for other cache entries.
+    """
+    parts = key.split("|", 1)
+    if len(parts) != 2 or not parts[0].startswith("data:") or ":" not in parts[1]:
+        return None
+    metric, params = parts[1].split(":", 1)
+    return parts[0], metric, params
+
+
+def _metric_name(key):
+    # "[user:<id>|]<dataset>|<metric>:<params>"
+    parts = key.split("|", 2 if key.startswith("user:") else 1)
+    return parts[-1].split(":", 1)[0] if len(parts) > 1 else None
+
+
+def _result_store(key):
+    store = getattr(current_app, "RESULT_STORE", None)
+    if store is None:
+        return None, None
+    return store, split_metric_cache_key(key)
+
+
+def get_cached_result(key):
+    """
+
+    Returns a copy of a cached metric result, or None if it must be computed.
+    A result used in the second half of its lifetime is given its TTL again;
+    placeholders of running tasks are not, so they never outlive the task.
+    Results missing from memory are looked up in the persistent result store.
+    """
+    cache = current_app.TEMP_RESULTS_CACHE
+    try:
+        if key in cache:
+            entry = cache[key]
+            if _is_placeholder(entry['data']) and _task_result_expired(entry):
+                print(f"Cache entry for key {key} is a task whose result expired, recomputing")
+                cache.pop(key, None)
+                return None
+            print(f"Cache HIT for key: {key}")
+            remaining = entry.get('expires_at', 0) - time.time()
+            ttl = entry.get('expires_at', 0) - entry.get('timestamp', 0)
+            if not _is_placeholder(entry['data']) and remaining < ttl / 2:
+                cache_result(key, entry['data'], ttl=ttl, persist=False)
+            else:
+                _alias(key, remaining)
+            return copy.deepcopy(entry['data'])
+    except KeyError:
+        # expired between the two lookups
+        pass
+
+    store, store_key = _result_store(key)
+    if store_key is not None:
+        data = store.get(*store_key)
+        if data is not None:
+            print(f"Result store HIT for key: {key}")
+            cache_result(key, data, persist=False)
+            return copy.deepcopy(data)
+    print(f"Cache MISS for key: {key}")
+    return None
+
+
+def cache_result(key, data, ttl=METRIC_CACHE_TTL, persist=True):
+    """
+
+    Caches a metric result in memory and, if persist is set and the result
+    is not an error, in the persistent result store. Results of
+    UNCACHED_METRICS are not cached.
+    """
+    if _metric_name(key) in UNCACHED_METRICS:
+        return
+    # shared keys name no user, so the result is charged to the user whose
+    # request cached it; the per-user budget bounds what each user adds
+    current_app.TEMP_RESULTS_CACHE.set(key, {
+        'data': data,
+        'timestamp': time.time(),
+        'expires_at': time.time() + ttl,
+    }, user=get_current_user_id() if has_request_context() else None)
+    _alias(key, ttl)
+    if not persist or (isinstance(data, dict) and "Error" in data):
+        return
+    store, store_key = _result_store(key)
+    if store_key is not None:
+        store.put(*store_key, data)
+
+
+def _result_expires():
+    return current_app.config.get("CELERY", {}).get("result_expires", TASK_RESULT_EXPIRES)
+
+
+def _is_placeholder(data):
+    # see async_task_placeholder in main
+    return isinstance(data, dict) and data.get("is_async") is True
+
+
+def _task_result_expired(entry):
+    """
+
+    Checks whether a placeholder's task finished so long ago that Celery
+    dropped its result, e.g. because nobody polled it. Its task id is then
+    unknown to the result backend (PENDING) and polling it never completes.
+    """
+    if time.time() - entry.get('timestamp', time.time()) < _result_expires():
+        return False
+    try:
+        return AsyncResult(entry['data']['task_id']).state == "PENDING"
+    except Exception:
+        # result backend unreachable; keep the placeholder
+        return False
+
+
+def register_task(task_id, metric_name, key, placeholder):
+    """
+
+    Records the cache key a Celery task's result belongs to, and caches its
+    placeholder so a repeated request polls the running task instead of
+    starting another one. Both are kept until the longest running task has
+    hit its time limit and Celery has dropped its result.
+    """
+    ttl = TASK_TIME_LIMIT + _result_expires()
+    cache_result(f"task:{task_id}_{metric_name}", key, ttl=ttl, persist=False)
+    cache_result(key, placeholder, ttl=ttl, persist=False)
+
+
+def cache_task_result(task_id, metric_name, result):
+    """
+
+    Caches the result of a completed Celery task under the metric key it
+    was registered with. Error results are not cached, since they include
+    transient failures such as time limits.
+    """
+    task_key = f"task:{task_id}_{metric_name}"
+    cache = current_app.TEMP_RESULTS_CACHE
+    if task_key not in cache:
+        return
+    key = cache.pop(task_key)['data']
+    if isinstance(result, dict) and "Error" in result:
+        cache.pop(key, None)
+        return
+    cache_result(key, result)
+
+
+def memoize_metric(metric, unordered=()):
+    """
+
+    Caches a metric function's results by dataset content and parameters.
+    The function must take a file_info argument; its other arguments
+    (except a bound task's self) are the cache parameters. Calls made
+    outside a request (e.g. on a Celery worker) are not cached.
+
+    Parameters
+    ----------
+    metric: str
+        metric name used in the cache key.
+    unordered: iterable of str
+        names of list parameters whose order does not change the result.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not has_request_context():
+                return fn(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = {
+                name: value for name, value in bound.arguments.items()
+                if name not in ("self", "file_info")
+            }
+            key = metric_cache_key(metric, bound.arguments["file_info"], unordered, **params)
+            result = get_cached_result(key)
+            if result is None:
+                result = fn(*args, **kwargs)
+                cache_result(key, result)
+                # callers may add to the result (e.g. a description)
+                result = copy.deepcopy(result)
+            return result
+        return wrapper
+    return decorator
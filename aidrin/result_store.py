@@ -0,0 +1,199 @@
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+
+# Notes:
+# ResultStore keeps metric results on disk (app.RESULT_STORE) so they survive
+# restarts and deploys. Rows are keyed by (dataset, metric, params, version),
+# where dataset is the content hash and file type of the upload, params the
+# normalized metric parameters and version the AIDRIN version that computed
+# the result, so an upgrade never serves results of older metric code.
+# Values are pickled and zlib-compressed, like in the Redis tier of the
+# results cache. Once the stored results exceed the byte budget, the least
+# recently used rows are deleted.
+# Connections are opened lazily, one per thread of each process, since a
+# sqlite3 connection must not be shared with forked (e.g. Celery) workers.
+
+RESULT_STORE_MAX_BYTES = 1024 * 1024 * 1024
+RESULT_STORE_COMPRESSION_LEVEL = 6
+RESULT_STORE_TIMEOUT = 5  # seconds to wait for another process holding the database lock
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    dataset TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    params TEXT NOT NULL,
+    version TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (dataset, metric, params, version)
+);
+CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access);
+"""
+
+
+class ResultStore:
+    def __init__(self, path, version, max_bytes=RESULT_STORE_MAX_BYTES):
+        self.path = path
+        self.version = version
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # process that created the schema, so each process sets it up once
+        self._setup_pid = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _connection(self):
+        # a forked process inherits the parent's thread-local state, hence the pid check
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.path, timeout=RESULT_STORE_TIMEOUT)
+        self._local.conn, self._local.pid = conn, os.getpid()
+        with self._lock:
+            if self._setup_pid != os.getpid():
+                with conn:
+                    # WAL lets the web and worker processes read while one of them writes
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.executescript(_SCHEMA)
+                    # results of other versions can never be served again
+                    conn.execute("DELETE FROM results WHERE version != ?", (self.version,))
+                self._setup_pid = os.getpid()
+        return conn
+
+    def get(self, dataset, metric, params):
+        """
+
+        Loads a stored result.
+
+        Parameters
+        ----------
+        dataset: str
+            dataset key ("data:<content hash>:<file type>").
+        metric: str
+            metric name.
+        params: str
+            normalized metric parameters.
+        Returns
+        ----------
+        object or None
+        Stored result, None if there is none.
+        """
+        key = (dataset, metric, params, self.version)
+        try:
+            conn = self._connection()
+            with conn:
+                row = conn.execute(
+                    "SELECT value FROM results WHERE dataset = ? AND metric = ? AND params = ? AND version = ?", key
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE results SET last_access = ? "
+                        "WHERE dataset = ? AND metric = ? AND params = ? AND version = ?",
+                        (time.time(), *key),
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"Result store: lookup failed ({e})")
+            return None
+        if row is None:
+            self.misses += 1
+            return None
+        try:
+            value = pickle.loads(zlib.decompress(row[0]))
+        except Exception as e:
+            logger.warning(f"Result store: dropping unreadable result for {metric}: {e}")
+            self.delete(dataset, metric, params)
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, dataset, metric, params, value):
+        """
+
+        Stores a result, evicting least recently used results to stay within
+        the byte budget. See get for the parameters.
+
+        Returns
+        ----------
+        bool
+        True if the result was stored.
+        """
+        payload = zlib.compress(
+            pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+            RESULT_STORE_COMPRESSION_LEVEL,
+        )
+        if len(payload) > self.max_bytes:
+            logger.warning(f"Result store: {metric} result ({len(payload)} bytes) exceeds the store budget, not stored")
+            return False
+        now = time.time()
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (dataset, metric, params, self.version, sqlite3.Binary(payload), len(payload), now, now),
+                )
+                self._evict(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Result store: storing {metric} failed ({e})")
+            return False
+        return True
+
+    def delete(self, dataset, metric, params):
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "DELETE FROM results WHERE dataset = ? AND metric = ? AND params = ? AND version = ?",
+                    (dataset, metric, params, self.version),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Result store: delete failed ({e})")
+
+    def total_bytes(self):
+        return self._connection().execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def stats(self):
+        """
+
+        Returns the store counters.
+
+        Returns
+        ----------
+        dict
+        entries, bytes, budget and hit/miss/eviction counts.
+        """
+        entries, size = self._connection().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _evict(self, conn):
+        # least recently used first; runs inside put's transaction
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for rowid, size in conn.execute("SELECT rowid, size FROM results ORDER BY last_access"):
+            if total <= self.max_bytes:
+                break
+            victims.append((rowid,))
+            total -= size
+        conn.executemany("DELETE FROM results WHERE rowid = ?", victims)
+        self.evictions += len(victims)
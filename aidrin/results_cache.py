@@ -0,0 +1,458 @@
+import json
+import logging
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+import redis
+
+logger = logging.getLogger(__name__)
+
+# Notes:
+# ResultsCache holds metric results between requests (app.TEMP_RESULTS_CACHE).
+# It is used like a dict whose values are entries of the form
+# {'data': ..., 'timestamp': ..., 'expires_at': ...}. Entries expire at their
+# 'expires_at' (or after the default TTL), expired entries are dropped on
+# access and by a periodic sweep, and the least recently used entries are
+# evicted once the cache, or the user charged for an entry, exceeds its byte
+# budget. Metric results are charged to the user whose request stored them,
+# other per-user entries to the user in their "user:<id>|" key prefix.
+# Sizes are estimates of the payload (base64 images dominate).
+# SharedResultsCache adds a Redis tier behind the local one, so results are
+# shared by all worker processes and survive worker restarts; it falls back
+# to the local tier alone while Redis is unreachable. Entries evicted from a
+# local tier for its byte budgets are deleted from Redis too, so Redis holds
+# at most what the local tiers of the worker processes hold. Entries are stored in
+# Redis as compressed JSON, never pickled, since anyone able to write to the
+# broker could otherwise run code in the web workers; entries that are not
+# JSON data (numpy scalars and arrays are converted) stay in the local tier.
+# The defaults below can be overridden through the app config
+# (e.g. FLASK_RESULTS_CACHE_MAX_BYTES=536870912 in the environment).
+
+RESULTS_CACHE_MAX_BYTES = 256 * 1024 * 1024
+RESULTS_CACHE_USER_MAX_BYTES = 64 * 1024 * 1024
+RESULTS_CACHE_TTL = 30 * 60  # seconds
+RESULTS_CACHE_PURGE_INTERVAL = 60  # seconds between sweeps for expired entries
+RESULTS_CACHE_REDIS_PREFIX = "aidrin:results:"
+RESULTS_CACHE_COMPRESSION_LEVEL = 3
+RESULTS_CACHE_REDIS_RETRY = 30  # seconds before an unreachable Redis is tried again
+
+# per-object overhead added to the estimate of containers and scalars
+_OBJECT_OVERHEAD = 64
+
+
+def approximate_size(value):
+    """
+
+    Estimates the memory held by a cached value, counting strings and bytes
+    by length and walking dicts, lists and tuples.
+
+    Returns
+    ----------
+    int
+    Estimated size in bytes.
+    """
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value) + _OBJECT_OVERHEAD
+    if isinstance(value, dict):
+        return _OBJECT_OVERHEAD + sum(approximate_size(k) + approximate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return _OBJECT_OVERHEAD + sum(approximate_size(v) for v in value)
+    try:
+        return sys.getsizeof(value)
+    except TypeError:
+        return _OBJECT_OVERHEAD
+
+
+def _json_default(value):
+    # numpy values in metric results, as converted for the browser
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def key_user(key):
+    # per-user entries (e.g. aliases of shared metric results) start with "user:<id>|"
+    if isinstance(key, str) and key.startswith("user:"):
+        return key.split("|", 1)[0][len("user:"):]
+    return None
+
+
+class ResultsCache:
+    def __init__(
+        self,
+        max_bytes=RESULTS_CACHE_MAX_BYTES,
+        user_max_bytes=RESULTS_CACHE_USER_MAX_BYTES,
+        ttl=RESULTS_CACHE_TTL,
+        purge_interval=RESULTS_CACHE_PURGE_INTERVAL,
+    ):
+        self.max_bytes = max_bytes
+        self.user_max_bytes = user_max_bytes
+        self.ttl = ttl
+        self.purge_interval = purge_interval
+        # key -> (value, size, user, expires_at), least recently used first
+        self._entries = OrderedDict()
+        self._user_bytes = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._last_purge = time.time()
+        self._lock = threading.RLock()
+
+    # dict interface
+
+    def __contains__(self, key):
+        with self._lock:
+            found = self._live(key)
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return found
+
+    def __getitem__(self, key):
+        with self._lock:
+            if not self._live(key):
+                raise KeyError(key)
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __delitem__(self, key):
+        with self._lock:
+            if key not in self._entries:
+                raise KeyError(key)
+            self._remove(key)
+
+    def __len__(self):
+        with self._lock:
+            self.purge_expired()
+            return len(self._entries)
+
+    def keys(self):
+        with self._lock:
+            self.purge_expired()
+            return list(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self:
+                return self[key]
+            return default
+
+    def pop(self, key, *default):
+        with self._lock:
+            if self._live(key):
+                return self._remove(key)
+            if default:
+                return default[0]
+            raise KeyError(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._user_bytes.clear()
+            self.total_bytes = 0
+
+    # cache operations
+
+    def set(self, key, value, user=None, ttl=None):
+        """
+
+        Stores an entry, evicting least recently used entries as needed.
+
+        Parameters
+        ----------
+        key: str
+            cache key.
+        value: object
+            entry to store; an 'expires_at' in a dict entry sets its expiry.
+        user: str or None
+            user charged for the entry, taken from a "user:<id>|" key prefix if None.
+        ttl: float or None
+            seconds until the entry expires, the cache default if None.
+        Returns
+        ----------
+        bool
+        True if the entry was stored, False if it exceeds the byte budget.
+        """
+        size = approximate_size(value)
+        if user is None:
+            user = key_user(key)
+        expires_at = self._expires_at(value, ttl)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes or (user is not None and size > self.user_max_bytes):
+                # would evict everything else and still not fit
+                logger.warning(f"Results cache: entry {key} ({size} bytes) exceeds the cache budget, not cached")
+                return False
+            self._entries[key] = (value, size, user, expires_at)
+            self.total_bytes += size
+            evicted = []
+            if user is not None:
+                self._user_bytes[user] = self._user_bytes.get(user, 0) + size
+                evicted += self._evict(lambda: self._user_bytes.get(user, 0) > self.user_max_bytes, user)
+            evicted += self._evict(lambda: self.total_bytes > self.max_bytes)
+            if time.time() - self._last_purge > self.purge_interval:
+                self.purge_expired()
+        self._evicted(evicted)
+        return True
+
+    def purge_expired(self):
+        """
+
+        Drops every expired entry.
+
+        Returns
+        ----------
+        int
+        Number of entries dropped.
+        """
+        with self._lock:
+            now = time.time()
+            self._last_purge = now
+            expired = [key for key, (_, _, _, expires_at) in self._entries.items() if expires_at <= now]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+            return len(expired)
+
+    def user_bytes(self, user):
+        with self._lock:
+            return self._user_bytes.get(user, 0)
+
+    def stats(self):
+        """
+
+        Returns the cache counters.
+
+        Returns
+        ----------
+        dict
+        entries, bytes, budget and hit/miss/eviction/expiration counts.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    # internals
+
+    def _expires_at(self, value, ttl):
+        if isinstance(value, dict) and "expires_at" in value:
+            return value["expires_at"]
+        return time.time() + (self.ttl if ttl is None else ttl)
+
+    def _live(self, key):
+        # lazy expiry: an expired entry is dropped when it is looked up
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        if entry[3] <= time.time():
+            self._remove(key)
+            self.expirations += 1
+            return False
+        return True
+
+    def _remove(self, key):
+        value, size, user, _ = self._entries.pop(key)
+        self.total_bytes -= size
+        if user is not None:
+            self._user_bytes[user] -= size
+            if not self._user_bytes[user]:
+                del self._user_bytes[user]
+        return value
+
+    def _evict(self, over_budget, user=None):
+        # least recently used first, only the given user's entries if a user is given
+        evicted = []
+        for key in list(self._entries):
+            if not over_budget():
+                break
+            if user is None or self._entries[key][2] == user:
+                self._remove(key)
+                evicted.append(key)
+        self.evictions += len(evicted)
+        return evicted
+
+    def _evicted(self, keys):
+        # called by set, outside the lock, with the keys evicted for the budgets
+        pass
+
+
+class SharedResultsCache(ResultsCache):
+    def __init__(
+        self,
+        client,
+        prefix=RESULTS_CACHE_REDIS_PREFIX,
+        retry_interval=RESULTS_CACHE_REDIS_RETRY,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.client = client
+        self.prefix = prefix
+        self.retry_interval = retry_interval
+        self.shared_hits = 0
+        # Redis is skipped until this time after a connection failure
+        self._shared_down_until = 0
+        # entries that are not JSON data and so are only held locally
+        self._local_only = set()
+
+    def _shared(self, operation, *args, **kwargs):
+        """
+
+        Runs a Redis operation, returning None (and skipping Redis for
+        retry_interval seconds) if Redis is unreachable.
+        """
+        if time.time() < self._shared_down_until:
+            return None
+        try:
+            return operation(*args, **kwargs)
+        except redis.RedisError as e:
+            logger.warning(f"Results cache: Redis unavailable ({e}), using the local cache for {self.retry_interval}s")
+            self._shared_down_until = time.time() + self.retry_interval
+            return None
+
+    def _redis_key(self, key):
+        return f"{self.prefix}{key}"
+
+    def _fetch(self, key):
+        # copies an entry from Redis into the local tier
+        payload = self._shared(self.client.get, self._redis_key(key))
+        if payload is None:
+            return False
+        try:
+            shared = json.loads(zlib.decompress(payload))
+            user, value, expires_at = shared["user"], shared["value"], shared["expires_at"]
+        except Exception as e:
+            logger.warning(f"Results cache: dropping unreadable shared entry {key}: {e}")
+            self._shared(self.client.delete, self._redis_key(key))
+            return False
+        remaining = expires_at - time.time()
+        if remaining <= 0:
+            return False
+        super().set(key, value, user=user, ttl=remaining)
+        with self._lock:
+            return self._live(key)
+
+    def __contains__(self, key):
+        with self._lock:
+            local = self._live(key)
+        if local and key not in self._local_only and self._shared(self.client.exists, self._redis_key(key)) == 0:
+            # removed through another process (e.g. a cleared user cache)
+            with self._lock:
+                if key in self._entries:
+                    self._remove(key)
+            local = False
+        found = local or self._fetch(key)
+        with self._lock:
+            if found:
+                self.hits += 1
+                if not local:
+                    self.shared_hits += 1
+            else:
+                self.misses += 1
+        return found
+
+    def __getitem__(self, key):
+        with self._lock:
+            if self._live(key):
+                return super().__getitem__(key)
+        if not self._fetch(key):
+            raise KeyError(key)
+        return super().__getitem__(key)
+
+    def __delitem__(self, key):
+        self.pop(key)
+
+    def __len__(self):
+        return len(self.keys())
+
+    def pop(self, key, *default):
+        with self._lock:
+            local = self._live(key)
+        if not local:
+            local = self._fetch(key)
+        self._shared(self.client.delete, self._redis_key(key))
+        return super().pop(key, *default)
+
+    def keys(self):
+        shared = self._shared(
+            lambda: [k.decode()[len(self.prefix):] for k in self.client.scan_iter(match=f"{self.prefix}*", count=1000)]
+        )
+        # Redis holds every live entry while it is reachable
+        if shared is None:
+            return super().keys()
+        return shared
+
+    def clear(self):
+        super().clear()
+        self._local_only.clear()
+        shared = self._shared(lambda: list(self.client.scan_iter(match=f"{self.prefix}*", count=1000)))
+        if shared:
+            self._shared(self.client.delete, *shared)
+
+    def set(self, key, value, user=None, ttl=None):
+        """
+
+        Stores an entry in the local tier and, as compressed JSON, in Redis
+        with the same expiry. Entries the local tier rejects as over the byte
+        budget, and entries that are not JSON data, are not written to Redis.
+        See ResultsCache.set.
+        """
+        if not super().set(key, value, user=user, ttl=ttl):
+            # drop a copy stored before, so other processes do not serve it
+            self._shared(self.client.delete, self._redis_key(key))
+            return False
+        if user is None:
+            user = key_user(key)
+        expires_at = self._expires_at(value, ttl)
+        ttl_ms = int((expires_at - time.time()) * 1000)
+        if ttl_ms <= 0:
+            return True
+        try:
+            shared = json.dumps({"user": user, "value": value, "expires_at": expires_at}, default=_json_default)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Results cache: entry {key} is not JSON data ({e}), not shared")
+            self._shared(self.client.delete, self._redis_key(key))
+            with self._lock:
+                if key in self._entries:
+                    self._local_only.add(key)
+            return True
+        payload = zlib.compress(shared.encode("utf-8"), RESULTS_CACHE_COMPRESSION_LEVEL)
+        self._shared(self.client.set, self._redis_key(key), payload, px=ttl_ms)
+        return True
+
+    def _remove(self, key):
+        self._local_only.discard(key)
+        return super()._remove(key)
+
+    def _evicted(self, keys):
+        # otherwise the next lookup would fetch an evicted entry back from Redis
+        if keys:
+            self._shared(self.client.delete, *(self._redis_key(key) for key in keys))
+
+    def stats(self):
+        stats = super().stats()
+        stats["shared_hits"] = self.shared_hits
+        stats["shared_tier"] = "unavailable" if time.time() < self._shared_down_until else "redis"
+        return stats
@@ -354,6 +354,7 @@ function submitForm() {
         "Statistical Rate",
         "Correlations Analysis Categorical",
         "Correlations Analysis Numerical",
+        "Conditional Demographic Disparity",
         "Feature Relevance",
         "Class Imbalance",
         "DP Statistics",
@@ -1367,7 +1368,7 @@ function pollAsyncTask(
 
         // Get DOM elements for progress bar and status
         const asyncTaskElement = document.querySelector(
-          `[data-task-id="${taskId}"]`
+          `[data-task-id="${taskId}"][data-metric-name="${metricName}"]`
         );
         const statusSpan = asyncTaskElement
           ? asyncTaskElement.querySelector(`#task-status-${taskId}`)
@@ -1538,7 +1539,7 @@ function pollAsyncTask(
           );
 
           const asyncTaskElement = document.querySelector(
-            `[data-task-id="${taskId}"]`
+            `[data-task-id="${taskId}"][data-metric-name="${metricName}"]`
           );
           const progressBar = asyncTaskElement
             ? asyncTaskElement.querySelector(".progress-bar")
@@ -1579,7 +1580,9 @@ function updateAsyncTaskWithResults(taskId, metricName, results) {
   );
 
   // Find the async task placeholder
-  const asyncElement = document.querySelector(`[data-task-id="${taskId}"]`);
+  const asyncElement = document.querySelector(
+    `[data-task-id="${taskId}"][data-metric-name="${metricName}"]`
+  );
   updateTaskStatus(taskId, metricName, "completed", "Calculation completed!");
   if (!asyncElement || !results) {
     console.log("No async element or results found:", {
@@ -1590,6 +1593,11 @@ function updateAsyncTaskWithResults(taskId, metricName, results) {
     return;
   }
 
+  // Keep the finished result in the response data used for the JSON download
+  if (!results.error && typeof resp_data === "object" && resp_data !== null) {
+    resp_data[metricName] = results;
+  }
+
   // Build the completed visualization HTML
   let completedHtml = "";
 
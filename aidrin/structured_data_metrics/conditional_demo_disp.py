@@ -2,21 +2,34 @@ import pandas as pd
 from celery import Task, shared_task
 from celery.exceptions import SoftTimeLimitExceeded
 
+from aidrin.file_handling.file_parser import read_file
+
 
 @shared_task(bind=True, ignore_result=False)
-def conditional_demographic_disparity(self: Task, target, sensitive, accepted_value):
+def conditional_demographic_disparity(self: Task, file_info, target_col, sensitive_col, accepted_value):
     """
     Calculate the demographic disparity metric for multiple target and sensitive groups.
 
     Parameters:
-    target (list or array): The target feature.
-    sensitive (list or array): The sensitive attribute.
+    file_info (tuple): (file_path, file_name, file_type) of the dataset; only the
+        target and sensitive columns are loaded, on the worker.
+    target_col (str): The target feature.
+    sensitive_col (str): The sensitive attribute.
     accepted_value: The value in the target feature representing an accepted outcome.
 
     Returns:
     pd.DataFrame: A DataFrame containing the demographic disparity results for each sensitive group.
     """
     try:
+        data = read_file(tuple(file_info), columns=[target_col, sensitive_col])
+        if not isinstance(data, pd.DataFrame):
+            return {"Error": f"Unable to read dataset: {data}"}
+        missing = [col for col in (target_col, sensitive_col) if col not in data.columns]
+        if missing:
+            return {"Error": f"Column(s) not found in dataset: {', '.join(missing)}"}
+        target = data[target_col].to_list()
+        sensitive = data[sensitive_col].to_list()
+
         # Validate input data
         if not target or not sensitive:
             return {"Error": "Target and sensitive columns cannot be empty"}
@@ -88,6 +101,19 @@ def conditional_demographic_disparity(self: Task, target, sensitive, accepted_va
         # Convert results to a DataFrame
         # results_df = pd.DataFrame(results)
 
-        return {"Disparities": results}
+        return {
+            "Disparities": results,
+            "Description": (
+                'The conditional demographic disparity metric evaluates the distribution '
+                'of outcomes categorized as positive and negative across various sensitive groups. '
+                'The user specifies which outcome category is considered "positive" for the analysis, '
+                'with all other outcome categories classified as "negative". The metric calculates the '
+                'proportion of outcomes classified as "positive" and "negative" within each sensitive group.'
+                ' A resulting disparity value of True indicates that within a specific sensitive group, '
+                'the proportion of outcomes classified as "negative" exceeds the proportion classified as'
+                ' "positive". This metric provides insights into potential disparities in outcome distribution '
+                'across sensitive groups based on the user-defined positive outcome criterion.'
+            ),
+        }
     except SoftTimeLimitExceeded:
         raise Exception("Duplicity task timed out.")
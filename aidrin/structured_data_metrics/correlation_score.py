@@ -18,11 +18,11 @@ NOMINAL_NOMINAL_ASSOC = "theil"
 
 @shared_task(bind=True, ignore_result=False)
 def calc_correlations(self: Task, columns: List[str], file_info):
-    df = read_file(file_info)
+    df = read_file(file_info, columns=columns)
     try:
         # Separate categorical and numerical columns
-        categorical_columns = df[columns].select_dtypes(include="object").columns
-        numerical_columns = df[columns].select_dtypes(exclude="object").columns
+        categorical_columns = df[columns].select_dtypes(include=["object", "category"]).columns
+        numerical_columns = df[columns].select_dtypes(exclude=["object", "category"]).columns
 
         result_dict = {
             "Correlations Analysis Categorical": {},
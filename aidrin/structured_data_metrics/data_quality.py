@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+from celery import Task, shared_task
+from celery.exceptions import SoftTimeLimitExceeded
+
+from aidrin.file_handling.file_parser import read_file
+from aidrin.metric_cache import memoize_metric
+from aidrin.structured_data_metrics.completeness import completeness_result
+from aidrin.structured_data_metrics.duplicity import duplicity_result
+from aidrin.structured_data_metrics.outliers import outliers_result
+
+# rows scanned per block, so the boolean null mask and the row hashes never
+# have to be materialized for the whole dataset at once
+PROFILE_CHUNK_ROWS = 100_000
+
+DATA_QUALITY_METRICS = ("Completeness", "Outliers", "Duplicity")
+
+
+def _scan(file, metrics, chunk_rows=PROFILE_CHUNK_ROWS):
+    """
+    Scans the DataFrame once, in blocks of rows, collecting what the
+    requested metrics need: missing values per column and rows with at
+    least one missing value (completeness), the numerical rows without
+    missing values (outliers) and the number of duplicate rows (duplicity).
+    Row hashes only select candidate duplicates: values such as 1 and "1"
+    hash alike and hashes can collide, so the candidates are compared.
+    The IQR quartiles cannot be computed from a stream, so the outlier
+    proportions are computed afterwards from the collected numerical rows.
+    """
+    null_counts = pd.Series(0, index=file.columns, dtype="int64")
+    rows_with_nulls = 0
+    numerical_blocks = []
+    row_hashes = []
+    numerical_columns = file.select_dtypes(include=[np.number]).columns
+    for start in range(0, len(file), chunk_rows):
+        chunk = file.iloc[start:start + chunk_rows]
+        if "Completeness" in metrics:
+            null_mask = chunk.isnull()
+            null_counts += null_mask.sum()
+            rows_with_nulls += int(null_mask.any(axis=1).sum())
+        if "Outliers" in metrics:
+            numerical_blocks.append(chunk[numerical_columns].dropna())
+        if "Duplicity" in metrics:
+            # equal rows hash equally in every block, so duplicates are found across blocks
+            row_hashes.append(pd.util.hash_pandas_object(chunk, index=False).to_numpy())
+
+    scan = {"null_counts": null_counts, "rows_with_nulls": rows_with_nulls}
+    if "Outliers" in metrics:
+        scan["numerical_columns_dropna"] = (
+            pd.concat(numerical_blocks) if numerical_blocks else file[numerical_columns].dropna()
+        )
+    if "Duplicity" in metrics:
+        hashes = pd.Series(np.concatenate(row_hashes) if row_hashes else np.empty(0, dtype="uint64"))
+        # a row equal to an earlier row shares its hash, so both are candidates
+        candidates = np.flatnonzero(hashes.duplicated(keep=False).to_numpy())
+        scan["duplicate_rows"] = int(file.iloc[candidates].duplicated().sum())
+    return scan
+
+
+@shared_task(bind=True, ignore_result=False)
+@memoize_metric("Data Quality Profile", unordered=("metrics",))
+def data_quality_profile(self: Task, file_info, metrics):
+    """
+    Computes several data quality metrics from a single read of the dataset
+    and a single chunked scan of it.
+    `metrics` is any subset of "Completeness", "Outliers" and "Duplicity";
+    each result is the same dictionary the standalone task returns.
+    """
+    try:
+        unsupported = [metric for metric in metrics if metric not in DATA_QUALITY_METRICS]
+        if unsupported:
+            raise ValueError(f"Unsupported data quality metrics: {', '.join(unsupported)}")
+
+        file = read_file(file_info)
+        if isinstance(file, str):
+            raise ValueError(file)
+
+        scan = _scan(file, metrics)
+        results = {}
+        if "Completeness" in metrics:
+            num_rows = len(file)
+            completeness_scores = (1 - scan["null_counts"] / num_rows).to_dict()
+            overall_completeness = 1 - scan["rows_with_nulls"] / num_rows if num_rows else float("nan")
+            results["Completeness"] = completeness_result(completeness_scores, overall_completeness)
+        if "Outliers" in metrics:
+            results["Outliers"] = outliers_result(file, scan["numerical_columns_dropna"])
+        if "Duplicity" in metrics:
+            results["Duplicity"] = duplicity_result(file, scan["duplicate_rows"])
+        return results
+    except SoftTimeLimitExceeded:
+        raise Exception("Data Quality task timed out.")
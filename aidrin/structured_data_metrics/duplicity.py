@@ -2,20 +2,33 @@ from celery import Task, shared_task
 from celery.exceptions import SoftTimeLimitExceeded
 
 from aidrin.file_handling.file_parser import read_file
+from aidrin.metric_cache import memoize_metric
 
 
 @shared_task(bind=True, ignore_result=False)
+@memoize_metric("Duplicity")
 def duplicity(self: Task, file_info):
     try:
         file = read_file(file_info)
-        dup_dict = {}
-        # Calculate the proportion of duplicate values
-        duplicate_proportions = file.duplicated().sum() / len(file)
-
-        dup_dict["Duplicity scores"] = {
-            "Overall duplicity of the dataset": duplicate_proportions
-        }
-
-        return dup_dict
+        return duplicity_result(file)
     except SoftTimeLimitExceeded:
         raise Exception("Duplicity task timed out.")
+
+
+def duplicity_result(file, duplicate_rows=None):
+    """
+    Computes the proportion of duplicate rows in a DataFrame.
+    duplicate_rows, the number of rows repeating an earlier row, is
+    counted from file if not given.
+    """
+    dup_dict = {}
+    if duplicate_rows is None:
+        duplicate_rows = file.duplicated().sum()
+    # Calculate the proportion of duplicate values
+    duplicate_proportions = duplicate_rows / len(file)
+
+    dup_dict["Duplicity scores"] = {
+        "Overall duplicity of the dataset": duplicate_proportions
+    }
+
+    return dup_dict
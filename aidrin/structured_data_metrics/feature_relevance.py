@@ -1,14 +1,26 @@
 import base64
 import io
+import glob
+import logging
+import os
+import time
+import uuid
 
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from celery import Task, shared_task
+from celery import Task, chain, shared_task
 from celery.exceptions import SoftTimeLimitExceeded
 from sklearn.preprocessing import LabelEncoder
 
 from aidrin.file_handling.file_parser import read_file
+from aidrin.file_handling.snapshot import SNAPSHOT_EXTENSION, load_snapshot, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+INTERMEDIATE_SUFFIX = f"_feature_relevance{SNAPSHOT_EXTENSION}"
+# intermediates older than this belong to chains that died without cleaning up
+INTERMEDIATE_MAX_AGE = 60 * 60  # seconds
 
 # def calc_shapley(df, cat_cols, num_cols, target_col):
 #     """
@@ -148,19 +160,67 @@ from aidrin.file_handling.file_parser import read_file
 #     return final_dict
 
 
+def _write_intermediate(df, file_info):
+    """
+    Writes a chain intermediate as Feather next to the uploaded file, where
+    the workers that read the upload can also read it, after removing stale
+    intermediates of chains that died. Returns its path, or None if the
+    frame cannot be stored in Arrow.
+    """
+    upload_dir = os.path.dirname(os.path.abspath(file_info[0]))
+    _remove_stale_intermediates(upload_dir)
+    path = os.path.join(upload_dir, f"{uuid.uuid4().hex}{INTERMEDIATE_SUFFIX}")
+    return path if write_snapshot(df, path, logger) else None
+
+
+def _remove_intermediate(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not remove feature relevance intermediate {path}: {e}")
+
+
+def _remove_stale_intermediates(upload_dir, max_age=INTERMEDIATE_MAX_AGE):
+    # e.g. left behind by a worker killed at its hard time limit
+    now = time.time()
+    for path in glob.glob(os.path.join(glob.escape(upload_dir), f"*{INTERMEDIATE_SUFFIX}")):
+        try:
+            stale = now - os.path.getmtime(path) > max_age
+        except OSError:
+            continue
+        if stale:
+            _remove_intermediate(path)
+
+
+def _read_intermediate(path):
+    """Loads and deletes a chain intermediate written by _write_intermediate."""
+    try:
+        df = load_snapshot(path)
+    finally:
+        _remove_intermediate(path)
+    if df is None:
+        raise FileNotFoundError(f"Feature relevance intermediate '{path}' not found.")
+    return df
+
+
 @shared_task(bind=True, ignore_result=False)
 def data_cleaning(self: Task, cat_cols, num_cols, target_col, file_info):
     try:
         try:
-            df = read_file(file_info)
-        except Exception as e:
-            print(f"Error reading file: {e}")
+            df = read_file(file_info, columns=[target_col] + cat_cols + num_cols)
+        except Exception:
+            logger.exception("Feature relevance: error reading file")
             return {
                 "Error": "Failed to read the file. Please check the file path and type."
             }
         # Filter DataFrame to include only the specified columns
         # Make a copy to avoid SettingWithCopyWarning
         df_filtered = df[[target_col] + cat_cols + num_cols].copy()
+        # categorical columns from read_file are filled and encoded as plain strings
+        categorical = df_filtered.select_dtypes(include="category").columns
+        df_filtered[categorical] = df_filtered[categorical].astype(object)
         # Fill missing values
         df_filtered.loc[:, cat_cols] = df_filtered[cat_cols].fillna(
             "Missing"
@@ -176,18 +236,33 @@ def data_cleaning(self: Task, cat_cols, num_cols, target_col, file_info):
         if df_filtered[target_col].dtype == "object":
             le_target = LabelEncoder()
             df_filtered[target_col] = le_target.fit_transform(df_filtered[target_col])
+        # the one-hot encoded frame can be very wide, so pass it to the next
+        # step as a Feather file rather than as JSON through the broker
+        path = _write_intermediate(df_filtered, file_info)
+        if path is not None:
+            return path
         # need to make json serializable to be passed by celery
         return df_filtered.to_dict(orient="list")
     except SoftTimeLimitExceeded:
         raise Exception("Data Cleaning task timed out.")
     except Exception as e:
-        print(f"Error occurred during data cleaning: {e}")
+        logger.exception("Feature relevance: error during data cleaning")
+        return {"Error": f"Data cleaning failed: {e}"}
 
 
 @shared_task(bind=True, ignore_result=False)
-def pearson_correlation(self: Task, df_json, target_col) -> dict:
+def pearson_correlation(self: Task, cleaned, target_col) -> dict:
     try:
-        df = pd.DataFrame.from_dict(df_json)
+        # pass data_cleaning failures on to the end of the chain
+        if cleaned is None:
+            return {"Error": "Data cleaning failed. Please check the selected features."}
+        if isinstance(cleaned, str):
+            # path of the Feather intermediate written by data_cleaning
+            df = _read_intermediate(cleaned)
+        elif isinstance(cleaned.get("Error"), str):
+            return cleaned
+        else:
+            df = pd.DataFrame.from_dict(cleaned)
         cols = df.columns.difference([target_col])
         correlations = {}
         for col in cols:
@@ -202,8 +277,8 @@ def pearson_correlation(self: Task, df_json, target_col) -> dict:
                     corr = cov / (std_dev_col * std_dev_target)
                     correlations[col] = corr
                 except TypeError:
-                    print(
-                        f"Warning: Skipping correlation calculation for column '{col}' due to non-numeric values."
+                    logger.warning(
+                        f"Skipping correlation calculation for column '{col}' due to non-numeric values."
                     )
         return correlations
     except SoftTimeLimitExceeded:
@@ -243,11 +318,61 @@ def plot_features(self: Task, correlations, target_col):
         return image_base64
     except SoftTimeLimitExceeded:
         raise Exception("Plot Features task timed out.")
-    except Exception as e:
-        print(f"Error occurred during plotting: {e}")
+    except Exception:
+        logger.exception("Feature relevance: error during plotting")
         return None
 
 
+@shared_task(bind=True, ignore_result=False)
+def feature_relevance_summary(self: Task, correlations, target_col):
+    """
+    Last step of the feature relevance chain: plots the correlations and
+    assembles the result shown for the metric.
+    """
+    if isinstance(correlations.get("Error"), str):
+        return correlations
+    if not correlations:
+        return {"Error": "No correlations could be calculated for the selected features and target."}
+
+    f_dict = {}
+    f_dict['Pearson Correlation to Target'] = correlations
+    f_dict['Feature Relevance Visualization'] = plot_features(correlations, target_col)
+    f_dict['Description'] = (
+        "With minimum data cleaning (drop missing values, onehot encode "
+        "categorical features, labelencode target feature), the Pearson "
+        "correlation coefficient is calculated for each feature against the "
+        "target variable. A value of 1 indicates a perfect positive "
+        "correlation, while a value of -1 indicates a perfect negative "
+        "correlation."
+    )
+    return f_dict
+
+
+@shared_task(ignore_result=True)
+def discard_intermediate(request, exc, traceback):
+    """
+    Errback of the feature relevance chain: removes the intermediate that
+    was passed to the failed task, if any.
+    """
+    for arg in request.args or ():
+        if isinstance(arg, str) and arg.endswith(INTERMEDIATE_SUFFIX):
+            _remove_intermediate(arg)
+
+
+def feature_relevance_workflow(cat_cols, num_cols, target_col, file_info):
+    """
+    Celery chain computing feature relevance on the workers:
+    data_cleaning -> pearson_correlation -> feature_relevance_summary.
+    Call apply_async() on it; the id of the returned result is the id of
+    the last task, whose result is the metric.
+    """
+    return chain(
+        data_cleaning.s(cat_cols, num_cols, target_col, file_info),
+        pearson_correlation.s(target_col),
+        feature_relevance_summary.s(target_col),
+    ).on_error(discard_intermediate.s())
+
+
 # import io
 # import base64
 # from scipy.stats import chi2_contingency
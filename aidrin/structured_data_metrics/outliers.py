@@ -7,71 +7,84 @@ from celery import Task, shared_task
 from celery.exceptions import SoftTimeLimitExceeded
 
 from aidrin.file_handling.file_parser import read_file
+from aidrin.metric_cache import memoize_metric
 
 
 @shared_task(bind=True, ignore_result=False)
+@memoize_metric("Outliers")
 def outliers(self: Task, file_info):
     try:
         file = read_file(file_info)
-        try:
-            out_dict = {}
+        return outliers_result(file)
+    except SoftTimeLimitExceeded:
+        raise Exception("Outliers task timed out.")
+
+
+def outliers_result(file, numerical_columns_dropna=None):
+    """
+    Computes IQR outlier proportions for the numerical columns of a
+    DataFrame and builds the outlier chart. numerical_columns_dropna, the
+    numerical columns of file without rows holding missing values, is
+    computed from file if not given.
+    """
+    try:
+        out_dict = {}
+        if numerical_columns_dropna is None:
             # Select numerical columns for outlier detection
             numerical_columns = file.select_dtypes(include=[np.number])
             # drop nan
             numerical_columns_dropna = numerical_columns.dropna()
 
-            print(numerical_columns_dropna)
-            # IQR method
-            q1 = numerical_columns_dropna.quantile(0.25)
-            q3 = numerical_columns_dropna.quantile(0.75)
-            IQR = q3 - q1
-            outliers = numerical_columns_dropna[
-                (
-                    (numerical_columns_dropna < (q1 - 1.5 * IQR))
-                    | (numerical_columns_dropna > (q3 + 1.5 * IQR))
-                )
-            ]
-
-            # Calculate the proportion outliers in each column
-            proportions = outliers.notna().mean()
-
-            # Convert the proportions Series to a dictionary
-            proportions_dict = proportions.to_dict()
-
-            # Calculate the average of dictionary values
-            average_value = sum(proportions_dict.values()) / len(proportions_dict)
-            proportions_dict["Overall outlier score"] = average_value
-            # add the average to dictionary
-            out_dict["Outlier scores"] = proportions_dict
-
-            # Create a bar chart for outlier scores
-            plt.figure(figsize=(8, 8))
-            plt.bar(proportions_dict.keys(), proportions_dict.values(), color="red")
-            plt.title("Proportion of Outliers for Numerical Columns", fontsize=14)
-            plt.xlabel("Columns", fontsize=14)
-            plt.ylabel("Proportion of Outliers", fontsize=14)
-            # plt.ylim(0, 1)  # Setting y-axis limit between 0 and 1
-
-            # Rotate x-axis tick labels
-            plt.xticks(rotation=45, ha="right", fontsize=12)
-
-            # Increase bottom margin
-            plt.subplots_adjust(bottom=0.5)
-            plt.tight_layout()
-
-            # Save the chart to BytesIO and encode as base64
-            img_buf = io.BytesIO()
-            plt.savefig(img_buf, format="png")
-            img_buf.seek(0)
-            img_base64 = base64.b64encode(img_buf.read()).decode("utf-8")
-
-            # Add the base64-encoded image to the dictionary under a separate key
-            out_dict["Outliers Visualization"] = img_base64
-
-            plt.close()  # Close the plot to free up resources
-
-            return out_dict
-        except Exception:
-            return {"Error": "Check features should be numerical"}
-    except SoftTimeLimitExceeded:
-        raise Exception("Outliers task timed out.")
+        print(numerical_columns_dropna)
+        # IQR method
+        q1 = numerical_columns_dropna.quantile(0.25)
+        q3 = numerical_columns_dropna.quantile(0.75)
+        IQR = q3 - q1
+        outliers = numerical_columns_dropna[
+            (
+                (numerical_columns_dropna < (q1 - 1.5 * IQR))
+                | (numerical_columns_dropna > (q3 + 1.5 * IQR))
+            )
+        ]
+
+        # Calculate the proportion outliers in each column
+        proportions = outliers.notna().mean()
+
+        # Convert the proportions Series to a dictionary
+        proportions_dict = proportions.to_dict()
+
+        # Calculate the average of dictionary values
+        average_value = sum(proportions_dict.values()) / len(proportions_dict)
+        proportions_dict["Overall outlier score"] = average_value
+        # add the average to dictionary
+        out_dict["Outlier scores"] = proportions_dict
+
+        # Create a bar chart for outlier scores
+        plt.figure(figsize=(8, 8))
+        plt.bar(proportions_dict.keys(), proportions_dict.values(), color="red")
+        plt.title("Proportion of Outliers for Numerical Columns", fontsize=14)
+        plt.xlabel("Columns", fontsize=14)
+        plt.ylabel("Proportion of Outliers", fontsize=14)
+        # plt.ylim(0, 1)  # Setting y-axis limit between 0 and 1
+
+        # Rotate x-axis tick labels
+        plt.xticks(rotation=45, ha="right", fontsize=12)
+
+        # Increase bottom margin
+        plt.subplots_adjust(bottom=0.5)
+        plt.tight_layout()
+
+        # Save the chart to BytesIO and encode as base64
+        img_buf = io.BytesIO()
+        plt.savefig(img_buf, format="png")
+        img_buf.seek(0)
+        img_base64 = base64.b64encode(img_buf.read()).decode("utf-8")
+
+        # Add the base64-encoded image to the dictionary under a separate key
+        out_dict["Outliers Visualization"] = img_base64
+
+        plt.close()  # Close the plot to free up resources
+
+        return out_dict
+    except Exception:
+        return {"Error": "Check features should be numerical"}
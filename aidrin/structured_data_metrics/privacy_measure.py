@@ -6,12 +6,46 @@ from typing import List
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from celery import shared_task
+from celery import Task, shared_task
 from celery.exceptions import SoftTimeLimitExceeded
+from scipy import sparse
 from aidrin.file_handling.file_parser import read_file
 
 logger = logging.getLogger(__name__)
 
+# larger class x sensitive value matrices are built sparse
+DENSE_CROSSTAB_MAX_CELLS = 10_000_000
+
+
+def _factorize(values):
+    """Encode a column as integer codes, equal values sharing a code."""
+    codes, _ = pd.factorize(values)
+    return codes
+
+
+def _group_sizes(*code_arrays):
+    """
+    Count, for every row, how many rows share its combination of codes.
+
+    Equivalent to counting matches with a boolean mask per row, but done
+    with one factorize and bincount instead of O(n^2) comparisons.
+    """
+    codes = code_arrays[0]
+    for other in code_arrays[1:]:
+        # combine pairwise into a dense key, then re-factorize to keep it small
+        codes = _factorize(codes.astype(np.int64) * (int(other.max()) + 1) + other)
+    return np.bincount(codes)[codes]
+
+
+def _round_scores(values, decimals=2):
+    """
+    Round risk scores with Python's round(), like the per-row scoring did.
+
+    np.round rounds the scaled value, which differs from round() on some
+    half-way values (round(0.7050000000000001, 2) is 0.71, np.round gives 0.7).
+    """
+    return np.array([round(value, decimals) for value in values.tolist()])
+
 
 def generate_single_attribute_MM_risk_scores(df, id_col, eval_cols, task=None):
     result_dict = {}
@@ -62,7 +96,8 @@ def generate_single_attribute_MM_risk_scores(df, id_col, eval_cols, task=None):
         # Check data types - ensure quasi-identifiers are categorical or string
         non_categorical_cols = []
         for col in eval_cols:
-            if df[col].dtype in ['int64', 'float64'] and df[col].nunique() > 100:
+            # any integer width counts, since read_file downcasts integer columns
+            if (pd.api.types.is_integer_dtype(df[col]) or pd.api.types.is_float_dtype(df[col])) and df[col].nunique() > 100:
                 non_categorical_cols.append(col)
 
         if non_categorical_cols:
@@ -78,8 +113,8 @@ def generate_single_attribute_MM_risk_scores(df, id_col, eval_cols, task=None):
         if rows_after_dropna == 0:
             raise ValueError("After removing missing values, no data remains. Please check your data quality or select different columns.")
 
-        # Convert the selected DataFrame to a NumPy array
-        my_array = selected_df.to_numpy()
+        n_rows = len(selected_df)
+        id_codes = _factorize(selected_df[id_col])
 
         # Stage 2: Calculate risk scores for each column (15-70%)
         if task:
@@ -100,31 +135,25 @@ def generate_single_attribute_MM_risk_scores(df, id_col, eval_cols, task=None):
                     meta={'current': int(progress), 'total': 100, 'status': f'Calculating risk scores for {col}... ({col_idx + 1}/{total_columns})'}
                 )
 
-            risk_scores = np.zeros(len(my_array))
+            value_codes = _factorize(selected_df[col])
 
             # Check if column has sufficient variation
-            unique_values = np.unique(my_array[:, col_idx + 1])
-            if len(unique_values) == 1:
+            if value_codes.max() == 0:
                 raise ValueError(f"Column '{col}' has only one unique value, making risk assessment meaningless.")
 
-            for j in range(len(my_array)):
-                attr1_tot = np.count_nonzero(my_array[:, col_idx + 1] == my_array[j, col_idx + 1])
-
-                mask_attr1_user = (my_array[:, 0] == my_array[j, 0]) & (my_array[:, col_idx + 1] == my_array[j, col_idx + 1])
-                count_attr1_user = np.count_nonzero(mask_attr1_user)
-
-                # Prevent division by zero
-                if attr1_tot == 0:
-                    raise ValueError(f"Column '{col}' has unexpected data structure causing division by zero.")
+            # rows sharing this row's value, and rows sharing both its id and value
+            attr1_tot = _group_sizes(value_codes)
+            count_attr1_user = _group_sizes(id_codes, value_codes)
 
-                start_prob_attr1 = attr1_tot / len(my_array)
-                obs_prob_attr1 = 1 - (count_attr1_user / attr1_tot)
+            # Prevent division by zero
+            if np.any(attr1_tot == 0):
+                raise ValueError(f"Column '{col}' has unexpected data structure causing division by zero.")
 
-                priv_prob_MM = start_prob_attr1 * obs_prob_attr1
-                worst_case_MM_risk_score = round(1 - priv_prob_MM, 2)
-                risk_scores[j] = worst_case_MM_risk_score
+            start_prob_attr1 = attr1_tot / n_rows
+            obs_prob_attr1 = 1 - (count_attr1_user / attr1_tot)
 
-            sing_res[col] = risk_scores
+            priv_prob_MM = start_prob_attr1 * obs_prob_attr1
+            sing_res[col] = _round_scores(1 - priv_prob_MM)
 
         # Stage 3: Calculate descriptive statistics (70-85%)
         if task:
@@ -264,8 +293,9 @@ def generate_multiple_attribute_MM_risk_scores(df, id_col, eval_cols, task=None)
         if df[id_col].nunique() != len(df):
             raise ValueError(f"ID column '{id_col}' must contain unique values for each row.")
 
-        # convert dataframe to numpy array
-        my_array = selected_df.to_numpy()
+        n_rows = len(selected_df)
+        id_codes = _factorize(selected_df[id_col])
+        value_codes = [_factorize(selected_df[col]) for col in eval_cols]
 
         # Stage 2: Calculate risk scores for all rows (15-70%)
         if task:
@@ -274,73 +304,45 @@ def generate_multiple_attribute_MM_risk_scores(df, id_col, eval_cols, task=None)
                 meta={'current': 15, 'total': 100, 'status': 'Starting risk score calculations...'}
             )
 
-        # array to store risk scores of each data point
-        risk_scores = np.zeros(len(my_array))
-
-        # risk scoring
-        for j in range(len(my_array)):
-            if len(my_array[0]) > 2:
-                priv_prob_MM = 1
-
-                for i in range(2, len(my_array[0])):
-                    attr1_tot = np.count_nonzero(
-                        my_array[:, i - 1] == my_array[j][i - 1]
+        # per-row counts of rows sharing the value, and sharing both id and value, for every column
+        attr_tot = [_group_sizes(codes) for codes in value_codes]
+        attr_user = [_group_sizes(id_codes, codes) for codes in value_codes]
+        for col, tot in zip(eval_cols, attr_tot):
+            if np.any(tot == 0):
+                raise ValueError(f"Column '{col}' has unexpected data structure causing division by zero.")
+
+        # joint privacy probability of each data point, multiplied along the chain of quasi-identifiers
+        priv_prob_MM = np.ones(n_rows)
+        if len(eval_cols) > 1:
+            total_steps = len(eval_cols) - 1
+            for step in range(total_steps):
+                if task:
+                    progress = 15 + (step / total_steps) * 55
+                    task.update_state(
+                        state='PROGRESS',
+                        meta={'current': int(progress), 'total': 100,
+                              'status': f'Calculating risk scores... ({step + 1}/{total_steps})'}
                     )
 
-                    if attr1_tot == 0:
-                        raise ValueError(
-                            f"Column '{eval_cols[i-2] if i-2 < len(eval_cols) else 'unknown'}'"
-                            "has unexpected data structure causing division by zero."
-                        )
-
-                    mask_attr1_user = (my_array[:, 0] == my_array[j][0]) & (my_array[:, i-1] == my_array[j][i-1])
-                    count_attr1_user = np.count_nonzero(mask_attr1_user)
-
-                    start_prob_attr1 = attr1_tot / len(my_array)  # 1
-
-                    obs_prob_attr1 = 1 - (count_attr1_user / attr1_tot)  # 2
-
-                    mask_attr1_attr2 = (my_array[:, i-1] == my_array[j][i-1])
-                    count_attr1_attr2 = np.count_nonzero(mask_attr1_attr2)
-
-                    mask2_attr1_attr2 = (my_array[:, i-1] == my_array[j][i-1]) & (my_array[:, i] == my_array[j][i])
-                    count2_attr1_attr2 = np.count_nonzero(mask2_attr1_attr2)
-
-                    trans_prob_attr1_attr2 = count2_attr1_attr2 / count_attr1_attr2  # 3
-
-                    attr2_tot = np.count_nonzero(my_array[:, i] == my_array[j][i])
+                start_prob_attr1 = attr_tot[step] / n_rows  # 1
 
-                    if attr2_tot == 0:
-                        raise ValueError(
-                            f"Column '{eval_cols[i-1] if i-1 < len(eval_cols) else 'unknown'}'"
-                            "has unexpected data structure causing division by zero."
-                        )
+                obs_prob_attr1 = 1 - (attr_user[step] / attr_tot[step])  # 2
 
-                    mask_attr2_user = (my_array[:, 0] == my_array[j][0]) & (my_array[:, i] == my_array[j][i])
-                    count_attr2_user = np.count_nonzero(mask_attr2_user)
+                count2_attr1_attr2 = _group_sizes(value_codes[step], value_codes[step + 1])
+                trans_prob_attr1_attr2 = count2_attr1_attr2 / attr_tot[step]  # 3
 
-                    obs_prob_attr2 = 1 - (count_attr2_user / attr2_tot)  # 4
+                obs_prob_attr2 = 1 - (attr_user[step + 1] / attr_tot[step + 1])  # 4
 
-                    priv_prob_MM = priv_prob_MM * start_prob_attr1 * obs_prob_attr1 * trans_prob_attr1_attr2 * obs_prob_attr2
-                    worst_case_MM_risk_score = round(1 - priv_prob_MM, 2)  # 5
-                risk_scores[j] = worst_case_MM_risk_score
-            elif len(my_array[0]) == 2:
-                priv_prob_MM = 1
-                attr1_tot = np.count_nonzero(my_array[:, 1] == my_array[j][1])
-
-                if attr1_tot == 0:
-                    raise ValueError(f"Column '{eval_cols[0] if eval_cols else 'unknown'}' has unexpected data structure causing division by zero.")
-
-                mask_attr1_user = (my_array[:, 0] == my_array[j][0]) & (my_array[:, 1] == my_array[j][1])
-                count_attr1_user = np.count_nonzero(mask_attr1_user)
+                priv_prob_MM = priv_prob_MM * start_prob_attr1 * obs_prob_attr1 * trans_prob_attr1_attr2 * obs_prob_attr2
+        else:
+            start_prob_attr1 = attr_tot[0] / n_rows  # 1
 
-                start_prob_attr1 = attr1_tot / len(my_array)  # 1
+            obs_prob_attr1 = 1 - (attr_user[0] / attr_tot[0])  # 2
 
-                obs_prob_attr1 = 1 - (count_attr1_user / attr1_tot)  # 2
+            priv_prob_MM = priv_prob_MM * start_prob_attr1 * obs_prob_attr1
 
-                priv_prob_MM = priv_prob_MM * start_prob_attr1 * obs_prob_attr1
-                worst_case_MM_risk_score = round(1 - priv_prob_MM, 2)  # 5
-                risk_scores[j] = worst_case_MM_risk_score
+        # array to store risk scores of each data point
+        risk_scores = _round_scores(1 - priv_prob_MM)  # 5
 
         # Stage 3: Calculate dataset privacy level (70-80%)
         if task:
@@ -438,32 +440,113 @@ def generate_multiple_attribute_MM_risk_scores(df, id_col, eval_cols, task=None)
     return result_dict
 
 
-def compute_k_anonymity(quasi_identifiers: List[str], file_info):
-    # Handle both DataFrame and tuple inputs
-    if isinstance(file_info, tuple):
-        data = read_file(file_info)
+def _prepare_privacy_data(file_info, columns):
+    """Load the needed columns (or take a DataFrame as is) and treat '?' as missing."""
+    # file_info arrives as a list when passed to a Celery task
+    if isinstance(file_info, (tuple, list)):
+        data = read_file(tuple(file_info), columns=columns)
     else:
         data = file_info
-    result_dict = {}
-    try:
-        if data.empty:
-            raise ValueError("Input DataFrame is empty.")
+    if isinstance(data, pd.DataFrame):
+        data = data.replace("?", pd.NA)
+    return data
+
+
+def _validate_privacy_columns(data, quasi_identifiers, sensitive_column=None):
+    if data.empty:
+        raise ValueError("Input DataFrame is empty.")
+
+    for qi in quasi_identifiers:
+        if qi not in data.columns:
+            raise ValueError(f"Quasi-identifier '{qi}' not found in the dataset.")
+
+    if sensitive_column is not None and sensitive_column not in data.columns:
+        raise ValueError(
+            f"Sensitive column '{sensitive_column}' not found in the dataset."
+        )
+
+
+def _combine_codes(codes, other):
+    """
+    Combine two per-row code arrays into one, in lexicographic order.
+
+    Rows missing (-1) in either input stay -1 in the result.
+    """
+    key = codes.astype(np.int64) * (int(other.max()) + 1) + other
+    valid = (codes >= 0) & (other >= 0)
+    combined = np.full(len(key), -1, dtype=np.int64)
+    combined[valid], _ = pd.factorize(key[valid], sort=True)
+    return combined
+
+
+def _quasi_identifier_codes(data, quasi_identifiers, code_cache):
+    """
+    Equivalence-class code of every row for a set of quasi-identifiers.
 
+    Codes follow the sorted order of the quasi-identifier values, as the
+    groups of ``groupby(quasi_identifiers)`` do, and are -1 for rows with a
+    missing quasi-identifier. Results are memoized in ``code_cache`` so
+    metrics sharing the same quasi-identifiers factorize them only once.
+    """
+    cache_key = tuple(quasi_identifiers)
+    if cache_key not in code_cache:
+        codes = None
         for qi in quasi_identifiers:
-            if qi not in data.columns:
-                raise ValueError(f"Quasi-identifier '{qi}' not found in the dataset.")
+            qi_codes, _ = pd.factorize(data[qi], sort=True)
+            codes = qi_codes if codes is None else _combine_codes(codes, qi_codes)
+        code_cache[cache_key] = codes
+    return code_cache[cache_key]
+
+
+def _equivalence_classes(codes, keep):
+    """Renumber the kept rows' class codes densely; returns (row classes, class sizes)."""
+    _, row_classes = np.unique(codes[keep], return_inverse=True)
+    return row_classes, np.bincount(row_classes)
+
+
+def _histogram_image(hist_data, color, xlabel, title, figsize=(8, 5), xticks=False):
+    """Bar chart of equivalence-class counts, as a base64 encoded PNG."""
+    plt.figure(figsize=figsize)
+    plt.bar(hist_data.index, hist_data.values, color=color)
+    plt.xlabel(xlabel)
+    plt.ylabel("Number of Equivalence Classes")
+    plt.title(title)
+    if xticks:
+        plt.xticks(sorted(hist_data.index))
+    plt.grid(axis="y", alpha=0.75)
+
+    img_stream = io.BytesIO()
+    plt.tight_layout()
+    plt.savefig(img_stream, format="png", bbox_inches='tight', dpi=300)
+    plt.close()
+    img_stream.seek(0)
+    base64_image = base64.b64encode(img_stream.read()).decode("utf-8")
+    img_stream.close()
+    return base64_image
+
+
+def _error_result(metric_label, message, error_type):
+    return {
+        "Error": message,
+        f"{metric_label} Visualization": "",
+        "Graph interpretation": f"No visualization available due to {error_type.lower()}.",
+        "ErrorType": error_type,
+    }
+
 
-        data.replace("?", pd.NA, inplace=True)
-        clean_data = data.dropna(subset=quasi_identifiers)
-        if clean_data.empty:
+def _k_anonymity(data, quasi_identifiers, code_cache):
+    try:
+        _validate_privacy_columns(data, quasi_identifiers)
+
+        codes = _quasi_identifier_codes(data, quasi_identifiers, code_cache)
+        keep = codes >= 0
+        if not keep.any():
             raise ValueError(
                 "No data left after dropping rows with missing quasi-identifiers."
             )
 
-        equivalence_classes = (
-            clean_data.groupby(quasi_identifiers).size().reset_index(name="count")
-        )
-        counts = equivalence_classes["count"]
+        _, sizes = _equivalence_classes(codes, keep)
+        counts = pd.Series(sizes)
 
         # Compute k-anonymity
         k_anonymity = int(counts.min())
@@ -477,27 +560,19 @@ def compute_k_anonymity(quasi_identifiers: List[str], file_info):
         }
 
         # Histogram of equivalence class sizes
-        hist_data = counts.value_counts().sort_index().to_dict()
-        plt.figure(figsize=(8, 5))
-        plt.bar(hist_data.keys(), hist_data.values(), color="skyblue")
-        plt.xlabel("Equivalence Class Size (k)")
-        plt.ylabel("Number of Equivalence Classes")
-        plt.title("Distribution of Equivalence Class Sizes")
-        plt.grid(axis="y", alpha=0.75)
-        # Save histogram to base64
-        img_stream = io.BytesIO()
-        plt.tight_layout()
-        plt.savefig(img_stream, format="png", bbox_inches='tight', dpi=300)
-        plt.close()
-        img_stream.seek(0)
-        base64_image = base64.b64encode(img_stream.read()).decode("utf-8")
-        img_stream.close()
+        hist_data = counts.value_counts().sort_index()
+        base64_image = _histogram_image(
+            hist_data,
+            "skyblue",
+            "Equivalence Class Size (k)",
+            "Distribution of Equivalence Class Sizes",
+        )
 
         # Final result
         result_dict = {
             "k-Value": k_anonymity,
             "descriptive_statistics": desc_stats,
-            "histogram_data": hist_data,
+            "histogram_data": hist_data.to_dict(),
             "k-Anonymity Visualization": base64_image,
             "Description": (
                 "k-anonymity measures the minimum group size sharing the same quasi-identifier values. "
@@ -511,61 +586,32 @@ def compute_k_anonymity(quasi_identifiers: List[str], file_info):
     except SoftTimeLimitExceeded:
         raise Exception("K anonymity task timed out.")
     except ValueError as ve:
-        result_dict["Error"] = str(ve)
-        result_dict["k-Anonymity Visualization"] = ""
-        result_dict["Graph interpretation"] = "No visualization available due to validation error."
-        result_dict["ErrorType"] = "Validation Error"
-        return result_dict
+        return _error_result("k-Anonymity", str(ve), "Validation Error")
     except Exception as e:
-        result_dict["Error"] = f"Processing error: {str(e)}"
-        result_dict["k-Anonymity Visualization"] = ""
-        result_dict["Graph interpretation"] = "No visualization available due to processing error."
-        result_dict["ErrorType"] = "Processing Error"
-        return result_dict
+        return _error_result("k-Anonymity", f"Processing error: {str(e)}", "Processing Error")
 
     return result_dict
 
 
-def compute_l_diversity(
-    quasi_identifiers: list,
-    sensitive_column: str,
-    file_info,
-):
-    # Handle both DataFrame and tuple inputs
-    if isinstance(file_info, tuple):
-        data = read_file(file_info)
-    else:
-        data = file_info
-    result_dict = {}
+def _l_diversity(data, quasi_identifiers, sensitive_column, code_cache):
     try:
-        # Validate input DataFrame
-        if data.empty:
-            raise ValueError("Input DataFrame is empty.")
-
-        # Validate quasi-identifiers
-        for qi in quasi_identifiers:
-            if qi not in data.columns:
-                raise ValueError(f"Quasi-identifier '{qi}' not found in the dataset.")
-
-        # Validate sensitive column presence
-        if sensitive_column not in data.columns:
-            raise ValueError(
-                f"Sensitive column '{sensitive_column}' not found in the dataset."
-            )
-
-        data = data.replace("?", pd.NA)
+        _validate_privacy_columns(data, quasi_identifiers, sensitive_column)
 
         # Drop rows with missing quasi-identifiers or sensitive values
-        clean_data = data.dropna(subset=quasi_identifiers + [sensitive_column])
-        if clean_data.empty:
+        codes = _quasi_identifier_codes(data, quasi_identifiers, code_cache)
+        sensitive_codes, _ = pd.factorize(data[sensitive_column])
+        keep = (codes >= 0) & (sensitive_codes >= 0)
+        if not keep.any():
             raise ValueError(
                 "No data left after dropping rows with missing quasi-identifiers or sensitive values."
             )
 
         # Compute l-diversities: count of unique sensitive values per equivalence class
-        l_diversities = clean_data.groupby(quasi_identifiers)[
-            sensitive_column
-        ].nunique()
+        row_classes, sizes = _equivalence_classes(codes, keep)
+        sensitive_codes = sensitive_codes[keep]
+        n_values = int(sensitive_codes.max()) + 1
+        pairs = np.unique(row_classes.astype(np.int64) * n_values + sensitive_codes)
+        l_diversities = pd.Series(np.bincount(pairs // n_values, minlength=len(sizes)))
 
         # Minimum l-diversity (lowest number of distinct sensitive values)
         min_l_diversity = int(l_diversities.min())
@@ -582,22 +628,14 @@ def compute_l_diversity(
         # or use: (l_diversities / 2).round() * 2 for bin size of 2
         binned_l_diversities = l_diversities.round()
         hist_data = binned_l_diversities.value_counts().sort_index()
-        plt.figure(figsize=(8, 8))
-        plt.bar(hist_data.index, hist_data.values, color="skyblue")
-        plt.xlabel("Number of Distinct Sensitive Values (l)")
-        plt.ylabel("Number of Equivalence Classes")
-        plt.title("Distribution of l-Diversity Across Equivalence Classes")
-        plt.xticks(sorted(hist_data.index))
-        plt.grid(axis="y", alpha=0.75)
-
-        # Save plot to base64 string
-        img_stream = io.BytesIO()
-        plt.tight_layout()
-        plt.savefig(img_stream, format="png", bbox_inches='tight', dpi=300)
-        plt.close()
-        img_stream.seek(0)
-        base64_image = base64.b64encode(img_stream.read()).decode("utf-8")
-        img_stream.close()
+        base64_image = _histogram_image(
+            hist_data,
+            "skyblue",
+            "Number of Distinct Sensitive Values (l)",
+            "Distribution of l-Diversity Across Equivalence Classes",
+            figsize=(8, 8),
+            xticks=True,
+        )
 
         # Compose result dictionary
         result_dict = {
@@ -616,65 +654,37 @@ def compute_l_diversity(
     except SoftTimeLimitExceeded:
         raise Exception("L Diversity task timed out.")
     except ValueError as ve:
-        result_dict["Error"] = str(ve)
-        result_dict["l-Diversity Visualization"] = ""
-        result_dict["Graph interpretation"] = "No visualization available due to validation error."
-        result_dict["ErrorType"] = "Validation Error"
-        return result_dict
+        return _error_result("l-Diversity", str(ve), "Validation Error")
     except Exception as e:
-        result_dict["Error"] = f"Processing error: {str(e)}"
-        result_dict["l-Diversity Visualization"] = ""
-        result_dict["Graph interpretation"] = "No visualization available due to processing error."
-        result_dict["ErrorType"] = "Processing Error"
-        return result_dict
+        return _error_result("l-Diversity", f"Processing error: {str(e)}", "Processing Error")
 
     return result_dict
 
 
-def compute_t_closeness(
-    quasi_identifiers: List[str],
-    sensitive_column: str,
-    file_info,
-):
-    # Handle both DataFrame and tuple inputs
-    if isinstance(file_info, tuple):
-        data = read_file(file_info)
-    else:
-        data = file_info
-    result_dict = {}
+def _t_closeness(data, quasi_identifiers, sensitive_column, code_cache, distance="TV"):
     try:
-        # TVD computation
-        def tvd(p, q):
-            all_keys = set(p.index).union(set(q.index))
-            p_full = p.reindex(all_keys, fill_value=0)
-            q_full = q.reindex(all_keys, fill_value=0)
-            return 0.5 * np.abs(p_full - q_full).sum()
-
-        if data.empty:
-            raise ValueError("Input DataFrame is empty.")
-
-        for qi in quasi_identifiers:
-            if qi not in data.columns:
-                raise ValueError(f"Quasi-identifier '{qi}' not found in the dataset.")
-
-        if sensitive_column not in data.columns:
+        if distance not in T_CLOSENESS_DISTANCES:
             raise ValueError(
-                f"Sensitive column '{sensitive_column}' not found in the dataset."
+                f"Unsupported t-closeness distance '{distance}'. Use one of: {', '.join(T_CLOSENESS_DISTANCES)}."
             )
 
-        data = data.replace("?", pd.NA)
-        clean_data = data.dropna(subset=quasi_identifiers + [sensitive_column])
-        if clean_data.empty:
+        _validate_privacy_columns(data, quasi_identifiers, sensitive_column)
+
+        codes = _quasi_identifier_codes(data, quasi_identifiers, code_cache)
+        keep = (codes >= 0) & data[sensitive_column].notna().to_numpy()
+        if not keep.any():
             raise ValueError("No data left after dropping rows with missing values.")
 
+        row_classes, sizes = _equivalence_classes(codes, keep)
+        # sorted codes, so EMD ranks ordinal values in their natural order
+        value_codes, values = pd.factorize(data[sensitive_column][keep], sort=True)
+
         # Global distribution of sensitive column
-        global_dist = clean_data[sensitive_column].value_counts(normalize=True)
+        global_dist = np.bincount(value_codes, minlength=len(values)) / len(value_codes)
 
-        # Compute t-closeness per equivalence class
-        t_values = {}
-        for keys, group in clean_data.groupby(quasi_identifiers):
-            group_dist = group[sensitive_column].value_counts(normalize=True)
-            t_values[keys] = tvd(group_dist, global_dist)
+        # Compute t-closeness per equivalence class from one class x value matrix
+        counts = _class_value_counts(row_classes, value_codes, len(sizes), len(values))
+        t_values = T_CLOSENESS_DISTANCES[distance](counts, sizes, global_dist)
 
         t_series = pd.Series(t_values)
         max_t = round(t_series.max(), 4)
@@ -689,20 +699,12 @@ def compute_t_closeness(
 
         # Histogram plot
         hist_data = t_series.round(2).value_counts().sort_index()
-        plt.figure(figsize=(8, 5))
-        plt.bar(hist_data.index, hist_data.values, color="salmon")
-        plt.xlabel("t-Closeness Value (TVD)")
-        plt.ylabel("Number of Equivalence Classes")
-        plt.title("Distribution of T-Closeness Across Equivalence Classes")
-        plt.grid(axis="y", alpha=0.75)
-
-        img_stream = io.BytesIO()
-        plt.tight_layout()
-        plt.savefig(img_stream, format="png", bbox_inches='tight', dpi=300)
-        plt.close()
-        img_stream.seek(0)
-        base64_image = base64.b64encode(img_stream.read()).decode("utf-8")
-        img_stream.close()
+        base64_image = _histogram_image(
+            hist_data,
+            "salmon",
+            f"t-Closeness Value ({'TVD' if distance == 'TV' else distance})",
+            "Distribution of T-Closeness Across Equivalence Classes",
+        )
 
         result_dict = {
             "t-Value": max_t,
@@ -720,73 +722,125 @@ def compute_t_closeness(
     except SoftTimeLimitExceeded:
         raise Exception("T Closeness task timed out.")
     except ValueError as ve:
-        result_dict["Error"] = str(ve)
-        result_dict["t-Closeness Visualization"] = ""
-        result_dict["Graph interpretation"] = "No visualization available due to validation error."
-        result_dict["ErrorType"] = "Validation Error"
-        return result_dict
+        return _error_result("t-Closeness", str(ve), "Validation Error")
     except Exception as e:
-        result_dict["Error"] = f"Processing error: {str(e)}"
-        result_dict["t-Closeness Visualization"] = ""
-        result_dict["Graph interpretation"] = "No visualization available due to processing error."
-        result_dict["ErrorType"] = "Processing Error"
-        return result_dict
+        return _error_result("t-Closeness", f"Processing error: {str(e)}", "Processing Error")
 
     return result_dict
 
 
-def compute_entropy_risk(quasi_identifiers, file_info):
-    # Handle both DataFrame and tuple inputs
-    if isinstance(file_info, tuple):
-        data = read_file(file_info)
-    else:
-        data = file_info
-    result_dict = {}
+def _class_value_counts(row_classes, value_codes, n_classes, n_values):
+    """
+    Equivalence class x sensitive value frequency matrix.
+
+    A dense array when it is small enough, otherwise a CSR matrix holding
+    only the (class, value) pairs that occur.
+    """
+    if n_classes * n_values <= DENSE_CROSSTAB_MAX_CELLS:
+        flat = row_classes.astype(np.int64) * n_values + value_codes
+        return np.bincount(flat, minlength=n_classes * n_values).reshape(n_classes, n_values)
+    counts = sparse.coo_matrix(
+        (np.ones(len(row_classes), dtype=np.int64), (row_classes, value_codes)),
+        shape=(n_classes, n_values),
+    ).tocsr()
+    counts.sum_duplicates()
+    return counts
+
+
+def _total_variation_distances(counts, sizes, global_dist):
+    """TVD between every class's sensitive-value distribution and the global one."""
+    if not sparse.issparse(counts):
+        return 0.5 * np.abs(counts / sizes[:, None] - global_dist).sum(axis=1)
+
+    # values absent from a class contribute their global probability, so
+    # sum |p - q| = 1 + sum over the class's values of (|p - q| - q)
+    rows = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))
+    q = global_dist[counts.indices]
+    p = counts.data / sizes[rows]
+    present = np.bincount(rows, weights=np.abs(p - q) - q, minlength=counts.shape[0])
+    return 0.5 * (1 + present)
+
+
+def _earth_movers_distances(counts, sizes, global_dist):
+    """
+    Ordered-distance EMD between every class's sensitive-value distribution
+    and the global one, with values ranked by their sorted order:
+    EMD = sum_i |P_i - Q_i| / (m - 1), P and Q being cumulative distributions.
+    """
+    n_classes, n_values = counts.shape
+    if n_values == 1:
+        return np.zeros(n_classes)
+    global_cdf = np.cumsum(global_dist)[:-1]
+
+    if not sparse.issparse(counts):
+        class_cdf = np.cumsum(counts / sizes[:, None], axis=1)[:, :-1]
+        return np.abs(class_cdf - global_cdf).sum(axis=1) / (n_values - 1)
+
+    # A class CDF is constant between two of its values, so sum |a - Q_i| over
+    # each such run [start, end) is taken from prefix sums of the sorted global CDF
+    prefix = np.concatenate(([0.0], np.cumsum(global_cdf)))
+
+    def run_sums(level, start, end):
+        split = np.clip(np.searchsorted(global_cdf, level, side="right"), start, end)
+        return (
+            level * (split - start) - (prefix[split] - prefix[start])
+            + (prefix[end] - prefix[split]) - level * (end - split)
+        )
 
-    try:
-        if data.empty:
-            raise ValueError("Input DataFrame is empty.")
+    rows = np.repeat(np.arange(n_classes), np.diff(counts.indptr))
+    p = counts.data / sizes[rows]
+    # running sum within each row: global cumsum minus the total of earlier rows
+    cumulative = np.cumsum(p)
+    row_offsets = np.concatenate(([0.0], cumulative[counts.indptr[1:-1] - 1]))
+    level = cumulative - row_offsets[rows]
 
-        for qi in quasi_identifiers:
-            if qi not in data.columns:
-                raise ValueError(f"Quasi-identifier '{qi}' not found in the dataset.")
+    starts = counts.indices
+    ends = np.full(len(starts), n_values - 1)
+    last_in_row = counts.indptr[1:] - 1
+    not_last = np.ones(len(starts), dtype=bool)
+    not_last[last_in_row] = False
+    ends[not_last] = starts[1:][not_last[:-1]]
 
-        data = data.replace("?", pd.NA)
-        clean_data = data.dropna(subset=quasi_identifiers)
+    totals = np.bincount(rows, weights=run_sums(level, starts, ends), minlength=n_classes)
+    # before a class's first value its CDF is 0
+    first = counts.indices[counts.indptr[:-1]]
+    totals += run_sums(np.zeros(n_classes), np.zeros(n_classes, dtype=np.int64), first)
+    return totals / (n_values - 1)
 
-        if clean_data.empty:
-            raise ValueError("No data left after dropping rows with missing values.")
 
-        total_records = len(clean_data)
-        grouped = clean_data.groupby(quasi_identifiers)
+# distances between a class's sensitive-value distribution and the global one
+T_CLOSENESS_DISTANCES = {
+    "TV": _total_variation_distances,
+    "EMD": _earth_movers_distances,
+}
+
+
+def _entropy_risk(data, quasi_identifiers, code_cache):
+    try:
+        _validate_privacy_columns(data, quasi_identifiers)
+
+        codes = _quasi_identifier_codes(data, quasi_identifiers, code_cache)
+        keep = codes >= 0
+        if not keep.any():
+            raise ValueError("No data left after dropping rows with missing values.")
 
-        entropy_values = {}
-        for keys, group in grouped:
-            size = len(group)
-            p_i = 1 / size
-            entropy = -size * p_i * np.log2(p_i)
-            entropy_values[keys] = entropy
+        total_records = int(keep.sum())
+        _, sizes = _equivalence_classes(codes, keep)
 
-        entropy_series = pd.Series(entropy_values)
-        avg_entropy = entropy_series.sum() / total_records if total_records > 0 else 0.0
+        # every record in a class of size n is re-identified with p = 1/n
+        p_i = 1 / sizes
+        entropy_series = pd.Series(-sizes * p_i * np.log2(p_i))
+        avg_entropy = entropy_series.sum() / total_records
         rounded_entropy = round(avg_entropy, 4)
 
         # Histogram plot of entropy values
         hist_data = entropy_series.round(2).value_counts().sort_index()
-        plt.figure(figsize=(8, 5))
-        plt.bar(hist_data.index, hist_data.values, color="royalblue")
-        plt.xlabel("Entropy Value")
-        plt.ylabel("Number of Equivalence Classes")
-        plt.title("Distribution of Entropy Across Equivalence Classes")
-        plt.grid(axis="y", alpha=0.75)
-
-        img_stream = io.BytesIO()
-        plt.tight_layout()
-        plt.savefig(img_stream, format="png", bbox_inches='tight', dpi=300)
-        plt.close()
-        img_stream.seek(0)
-        base64_image = base64.b64encode(img_stream.read()).decode("utf-8")
-        img_stream.close()
+        base64_image = _histogram_image(
+            hist_data,
+            "royalblue",
+            "Entropy Value",
+            "Distribution of Entropy Across Equivalence Classes",
+        )
 
         desc_stats = {
             "min": round(entropy_series.min(), 4),
@@ -812,28 +866,100 @@ def compute_entropy_risk(quasi_identifiers, file_info):
     except SoftTimeLimitExceeded:
         raise Exception("Entropy Risk task timed out.")
     except ValueError as ve:
-        result_dict["Error"] = str(ve)
-        result_dict["Entropy Risk Visualization"] = ""
-        result_dict["Graph interpretation"] = "No visualization available due to validation error."
-        result_dict["ErrorType"] = "Validation Error"
-        return result_dict
+        return _error_result("Entropy Risk", str(ve), "Validation Error")
     except Exception as e:
-        result_dict["Error"] = f"Processing error: {str(e)}"
-        result_dict["Entropy Risk Visualization"] = ""
-        result_dict["Graph interpretation"] = "No visualization available due to processing error."
-        result_dict["ErrorType"] = "Processing Error"
-        return result_dict
+        return _error_result("Entropy Risk", f"Processing error: {str(e)}", "Processing Error")
 
     return result_dict
 
 
+def compute_k_anonymity(quasi_identifiers: List[str], file_info):
+    # Handle both DataFrame and tuple inputs
+    data = _prepare_privacy_data(file_info, quasi_identifiers)
+    return _k_anonymity(data, quasi_identifiers, {})
+
+
+def compute_l_diversity(
+    quasi_identifiers: list,
+    sensitive_column: str,
+    file_info,
+):
+    # Handle both DataFrame and tuple inputs
+    data = _prepare_privacy_data(file_info, quasi_identifiers + [sensitive_column])
+    return _l_diversity(data, quasi_identifiers, sensitive_column, {})
+
+
+def compute_t_closeness(
+    quasi_identifiers: List[str],
+    sensitive_column: str,
+    file_info,
+    distance: str = "TV",
+):
+    # Handle both DataFrame and tuple inputs
+    data = _prepare_privacy_data(file_info, quasi_identifiers + [sensitive_column])
+    return _t_closeness(data, quasi_identifiers, sensitive_column, {}, distance=distance)
+
+
+def compute_entropy_risk(quasi_identifiers, file_info):
+    # Handle both DataFrame and tuple inputs
+    data = _prepare_privacy_data(file_info, quasi_identifiers)
+    return _entropy_risk(data, quasi_identifiers, {})
+
+
+# metrics derived from the equivalence classes of the quasi-identifiers
+EQUIVALENCE_CLASS_METRICS = {
+    "k-Anonymity": _k_anonymity,
+    "l-Diversity": _l_diversity,
+    "t-Closeness": _t_closeness,
+    "Entropy Risk": _entropy_risk,
+}
+
+
+@shared_task(bind=True, ignore_result=False)
+def compute_equivalence_class_metrics(self: Task, metric_requests, file_info):
+    """
+
+    Computes several equivalence-class privacy metrics in one job. The
+    dataset is read once, projected to the union of the requested columns,
+    and each distinct set of quasi-identifiers is factorized once and
+    shared by every metric that uses it.
+
+    Parameters
+    ----------
+    metric_requests: dict
+        metric name (a key of EQUIVALENCE_CLASS_METRICS) -> keyword
+        arguments, "quasi_identifiers" and, for l-diversity and
+        t-closeness, "sensitive_column".
+    file_info: tuple
+        (file_path, file_name, file_type) of the dataset.
+    Returns
+    ----------
+    dict
+    metric name -> result dictionary, as returned by the compute_* functions.
+    """
+    columns = []
+    for params in metric_requests.values():
+        for col in params["quasi_identifiers"] + [params.get("sensitive_column")]:
+            if col is not None and col not in columns:
+                columns.append(col)
+
+    data = _prepare_privacy_data(file_info, columns)
+    code_cache = {}
+    return {
+        metric: EQUIVALENCE_CLASS_METRICS[metric](data, code_cache=code_cache, **params)
+        for metric, params in metric_requests.items()
+    }
+
+
 # Celery tasks for async processing
 try:
 
     @shared_task(bind=True, time_limit=1200, soft_time_limit=900)
-    def calculate_single_attribute_risk_score(self, df_data, id_col, eval_cols):
+    def calculate_single_attribute_risk_score(self, file_info, id_col, eval_cols):
         """
         Celery task for calculating single attribute MM risk scores.
+        Takes the (file_path, file_name, file_type) reference of the dataset
+        rather than the data itself, so the broker message stays small.
         """
         try:
             # Update task state
@@ -842,8 +968,10 @@ try:
                 meta={'current': 0, 'total': 100, 'status': 'Starting single attribute risk calculation...'}
             )
 
-            # Convert DataFrame from JSON back to pandas DataFrame
-            df = pd.read_json(df_data)
+            # Load only the ID and quasi-identifier columns from the uploaded file
+            df = read_file(tuple(file_info), columns=[id_col] + list(eval_cols))
+            if isinstance(df, str):
+                raise ValueError(df)
 
             # Update progress
             self.update_state(
@@ -875,9 +1003,11 @@ try:
             return error_result
 
     @shared_task(bind=True, time_limit=1200, soft_time_limit=900)
-    def calculate_multiple_attribute_risk_score(self, df_data, id_col, eval_cols):
+    def calculate_multiple_attribute_risk_score(self, file_info, id_col, eval_cols):
         """
         Celery task for calculating multiple attribute MM risk scores.
+        Takes the (file_path, file_name, file_type) reference of the dataset
+        rather than the data itself, so the broker message stays small.
         """
         try:
             # Update task state
@@ -886,8 +1016,10 @@ try:
                 meta={'current': 0, 'total': 100, 'status': 'Starting multiple attribute risk calculation...'}
             )
 
-            # Convert DataFrame from JSON back to pandas DataFrame
-            df = pd.read_json(df_data)
+            # Load only the ID and quasi-identifier columns from the uploaded file
+            df = read_file(tuple(file_info), columns=[id_col] + list(eval_cols))
+            if isinstance(df, str):
+                raise ValueError(df)
 
             # Update progress
             self.update_state(
@@ -6,11 +6,13 @@ from celery import Task, shared_task
 from celery.exceptions import SoftTimeLimitExceeded
 
 from aidrin.file_handling.file_parser import read_file
+from aidrin.metric_cache import memoize_metric
 
 
 @shared_task(bind=True, ignore_result=False)
+@memoize_metric("Representation Rate")
 def calculate_representation_rate(self: Task, columns, file_info):
-    dataframe = read_file(file_info)
+    dataframe = read_file(file_info, columns=columns)
     representation_rate_info = {}
     processed_keys = set()  # Using a set to track processed pairs
     x_tick_keys = []
@@ -47,8 +49,9 @@ def calculate_representation_rate(self: Task, columns, file_info):
 
 
 @shared_task(bind=True, ignore_result=False)
+@memoize_metric("Representation Rate Visualization")
 def create_representation_rate_vis(self: Task, columns, file_info):
-    dataframe = read_file(file_info)
+    dataframe = read_file(file_info, columns=columns)
     try:
         for column in columns:
             # Drop rows with NaN values
@@ -7,14 +7,18 @@ from celery import Task, shared_task
 from celery.exceptions import SoftTimeLimitExceeded
 
 from aidrin.file_handling.file_parser import read_file
+from aidrin.metric_cache import memoize_metric
 
 
 @shared_task(bind=True, ignore_result=False)
+@memoize_metric("Statistical Rate")
 def calculate_statistical_rates(
     self: Task, y_true_column, sensitive_attribute_column, file_info
 ):
     try:
-        dataframe = read_file(file_info)
+        dataframe = read_file(
+            file_info, columns=[y_true_column, sensitive_attribute_column]
+        )
         # Drop rows with NaN values in the specified columns
         dataframe_cleaned = dataframe.dropna(
             subset=[y_true_column, sensitive_attribute_column]
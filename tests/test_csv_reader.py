@@ -0,0 +1,29 @@
+import logging
+
+import pandas as pd
+from flask import Flask
+
+from aidrin.file_handling.readers.csv_reader import CSV_SAMPLE_ROWS, csvReader
+
+
+def parallel_app():
+    # parse every file in parallel, in small byte ranges
+    app = Flask(__name__)
+    app.config.update(CSV_PARSE_WORKERS=2, CSV_PARALLEL_MIN_BYTES=0, CSV_RANGE_BYTES=64 * 1024)
+    return app
+
+
+def test_parallel_read_matches_serial_read_with_late_strings(tmp_path):
+    file_path = str(tmp_path / "late_strings.csv")
+    rows = 3 * CSV_SAMPLE_ROWS
+    df = pd.DataFrame({"id": range(rows), "code": [str(i % 97) for i in range(rows)], "value": 0.5})
+    # a string far past the sample, in a column the sample sees as integers
+    df.loc[rows - 10, "code"] = "N/A-code"
+    df.to_csv(file_path, index=False)
+
+    with parallel_app().app_context():
+        parallel = csvReader(file_path, logging.getLogger(__name__)).read()
+
+    serial = pd.read_csv(file_path, index_col=False)
+    pd.testing.assert_frame_equal(parallel, serial)
+    assert set(map(type, parallel["code"])) == {str}
@@ -0,0 +1,56 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aidrin.file_handling.file_parser import read_file
+from aidrin.structured_data_metrics.data_quality import DATA_QUALITY_METRICS, _scan, data_quality_profile
+from aidrin.structured_data_metrics.duplicity import duplicity_result
+from aidrin.structured_data_metrics.outliers import outliers_result
+
+ADULT_CSV = os.path.join(
+    os.path.dirname(__file__), "..", "aidrin", "static", "datasets", "test_data", "csv", "adult.csv"
+)
+
+
+@pytest.fixture(scope="module")
+def adult(tmp_path_factory):
+    # snapshots are written next to the file, so read a copy
+    file_path = shutil.copy(ADULT_CSV, tmp_path_factory.mktemp("adult"))
+    df = read_file((file_path, "adult.csv", ".csv"))
+    # duplicate rows that land in different blocks of the scan
+    return pd.concat([df, df.iloc[[5, 20_000, 31_000]]], ignore_index=True)
+
+
+def test_scan_matches_full_frame_computations(adult):
+    scan = _scan(adult, DATA_QUALITY_METRICS, chunk_rows=1000)
+
+    pd.testing.assert_series_equal(scan["null_counts"], adult.isnull().sum(), check_names=False)
+    assert scan["rows_with_nulls"] == adult.isnull().any(axis=1).sum()
+    assert scan["duplicate_rows"] == adult.duplicated().sum()
+    pd.testing.assert_frame_equal(
+        scan["numerical_columns_dropna"], adult.select_dtypes(include=[np.number]).dropna()
+    )
+
+
+def test_profile_matches_standalone_results(adult, tmp_path):
+    file_path = str(tmp_path / "adult.csv")
+    adult.to_csv(file_path, index=False)
+    file_info = (file_path, "adult.csv", ".csv")
+
+    profile = data_quality_profile.run(file_info, ["Outliers", "Duplicity"])
+    df = read_file(file_info)
+
+    assert profile["Duplicity"] == duplicity_result(df)
+    assert profile["Outliers"]["Outlier scores"] == outliers_result(df)["Outlier scores"]
+
+
+def test_scan_compares_rows_with_equal_hashes():
+    # 1 and "1" hash alike in an object column but are different values
+    df = pd.DataFrame({"code": pd.Series([1, "1", 2, 2, "x"], dtype=object), "value": [0.5] * 5})
+
+    scan = _scan(df, ["Duplicity"], chunk_rows=2)
+
+    assert scan["duplicate_rows"] == df.duplicated().sum() == 1
@@ -0,0 +1,57 @@
+import glob
+import os
+import shutil
+import time
+from types import SimpleNamespace
+
+import pandas as pd
+
+from aidrin.structured_data_metrics.feature_relevance import (
+    INTERMEDIATE_MAX_AGE,
+    INTERMEDIATE_SUFFIX,
+    _write_intermediate,
+    data_cleaning,
+    discard_intermediate,
+)
+
+ADULT_CSV = os.path.join(
+    os.path.dirname(__file__), "..", "aidrin", "static", "datasets", "test_data", "csv", "adult.csv"
+)
+
+
+def intermediates(directory):
+    return sorted(glob.glob(os.path.join(directory, f"*{INTERMEDIATE_SUFFIX}")))
+
+
+def test_failed_chain_discards_its_intermediate(tmp_path):
+    file_info = (str(tmp_path / "adult.csv"), "adult.csv", ".csv")
+    path = _write_intermediate(pd.DataFrame({"income": [0, 1], "age": [30.0, 40.0]}), file_info)
+    assert intermediates(tmp_path) == [path]
+
+    # errback request of a failed pearson_correlation(cleaned, target_col)
+    discard_intermediate.run(SimpleNamespace(args=[path, "income"]), KeyError("income"), None)
+
+    assert intermediates(tmp_path) == []
+
+
+def test_stale_intermediates_are_removed(tmp_path):
+    stale, recent = (str(tmp_path / f"{name}{INTERMEDIATE_SUFFIX}") for name in ("stale", "recent"))
+    for path in (stale, recent):
+        open(path, "wb").close()
+    old = time.time() - INTERMEDIATE_MAX_AGE - 60
+    os.utime(stale, (old, old))
+
+    file_info = (str(tmp_path / "adult.csv"), "adult.csv", ".csv")
+    path = _write_intermediate(pd.DataFrame({"income": [0, 1]}), file_info)
+
+    assert intermediates(tmp_path) == sorted([recent, path])
+
+
+def test_data_cleaning_returns_errors(tmp_path):
+    file_path = shutil.copy(ADULT_CSV, tmp_path)
+    file_info = (file_path, "adult.csv", ".csv")
+
+    result = data_cleaning.run(["race"], ["no such column"], "income", file_info)
+
+    assert result["Error"].startswith("Data cleaning failed")
+    assert intermediates(tmp_path) == []
@@ -0,0 +1,48 @@
+import glob
+import os
+import shutil
+
+import h5py
+import numpy as np
+import pandas as pd
+import pytest
+
+from aidrin.file_handling.file_parser import READER_MAP, read_file
+
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), "..", "aidrin", "static", "datasets", "test_data")
+SAMPLES = sorted(glob.glob(os.path.join(SAMPLE_DIR, "*", "*")))
+
+
+def reader_key(file_name):
+    # READER_MAP keys list the extensions a reader handles, e.g. ".npz, .npy"
+    extension = os.path.splitext(file_name)[1]
+    return next(key for key in READER_MAP if extension in key.split(", "))
+
+
+@pytest.mark.parametrize("sample", SAMPLES, ids=os.path.basename)
+def test_read_file_parses_every_sample(sample, tmp_path):
+    # snapshots are written next to the file, so read a copy
+    file_path = shutil.copy(sample, tmp_path)
+    file_info = (file_path, os.path.basename(file_path), reader_key(file_path))
+
+    df = read_file(file_info)
+    assert isinstance(df, pd.DataFrame), df
+    assert not df.empty
+
+    # a snapshot, if the data can be stored in Arrow, is read back unchanged
+    if glob.glob(os.path.join(tmp_path, "*.feather")):
+        pd.testing.assert_frame_equal(read_file(file_info), df)
+
+
+def test_snapshot_keeps_integer_column_labels(tmp_path):
+    file_path = str(tmp_path / "matrix.h5")
+    with h5py.File(file_path, "w") as f:
+        f.create_dataset("matrix", data=np.arange(12, dtype="int64").reshape(4, 3))
+    file_info = (file_path, "matrix.h5", ".h5")
+
+    df = read_file(file_info)
+    assert list(df.columns) == [0, 1, 2]
+    assert glob.glob(os.path.join(tmp_path, "*.feather"))
+
+    pd.testing.assert_frame_equal(read_file(file_info), df)
+    pd.testing.assert_frame_equal(read_file(file_info, columns=[2]), df[[2]])
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aidrin.structured_data_metrics.privacy_measure import (
+    generate_multiple_attribute_MM_risk_scores,
+    generate_single_attribute_MM_risk_scores,
+)
+
+
+@pytest.fixture(scope="module")
+def people():
+    rng = np.random.default_rng(0)
+    rows = 200
+    # 60 rows sharing "x" give 1 - (60/200) * (1 - 1/60) = 0.7050000000000001,
+    # which round() takes to 0.71 and np.round to 0.7
+    a = np.array(["x"] * 60 + list(rng.choice(["p", "q", "r", "s"], rows - 60)), dtype=object)
+    rng.shuffle(a)
+    return pd.DataFrame({
+        "id": np.arange(rows),
+        "a": a,
+        "b": rng.choice(["u", "v", "w"], rows),
+    })
+
+
+def reference_single_scores(df, id_col, col):
+    # the per-row scoring the vectorized version replaced
+    my_array = df[[id_col, col]].to_numpy()
+    scores = np.zeros(len(my_array))
+    for j in range(len(my_array)):
+        attr1_tot = np.count_nonzero(my_array[:, 1] == my_array[j, 1])
+        count_attr1_user = np.count_nonzero((my_array[:, 0] == my_array[j, 0]) & (my_array[:, 1] == my_array[j, 1]))
+        priv_prob_MM = (attr1_tot / len(my_array)) * (1 - (count_attr1_user / attr1_tot))
+        scores[j] = round(1 - priv_prob_MM, 2)
+    return scores
+
+
+def reference_multiple_scores(df, id_col, eval_cols):
+    my_array = df[[id_col] + eval_cols].to_numpy()
+    n = len(my_array)
+    scores = np.zeros(n)
+    for j in range(n):
+        priv_prob_MM = 1
+        if len(eval_cols) == 1:
+            attr1_tot = np.count_nonzero(my_array[:, 1] == my_array[j][1])
+            count_attr1_user = np.count_nonzero((my_array[:, 0] == my_array[j][0]) & (my_array[:, 1] == my_array[j][1]))
+            priv_prob_MM = priv_prob_MM * (attr1_tot / n) * (1 - (count_attr1_user / attr1_tot))
+        for i in range(2, len(my_array[0])):
+            attr1_tot = np.count_nonzero(my_array[:, i - 1] == my_array[j][i - 1])
+            count_attr1_user = np.count_nonzero((my_array[:, 0] == my_array[j][0]) & (my_array[:, i - 1] == my_array[j][i - 1]))
+            count2_attr1_attr2 = np.count_nonzero((my_array[:, i - 1] == my_array[j][i - 1]) & (my_array[:, i] == my_array[j][i]))
+            attr2_tot = np.count_nonzero(my_array[:, i] == my_array[j][i])
+            count_attr2_user = np.count_nonzero((my_array[:, 0] == my_array[j][0]) & (my_array[:, i] == my_array[j][i]))
+            priv_prob_MM = (
+                priv_prob_MM * (attr1_tot / n) * (1 - (count_attr1_user / attr1_tot))
+                * (count2_attr1_attr2 / attr1_tot) * (1 - (count_attr2_user / attr2_tot))
+            )
+        scores[j] = round(1 - priv_prob_MM, 2)
+    return scores
+
+
+def descriptive_stats(scores):
+    return {
+        "mean": np.mean(scores),
+        "std": np.std(scores),
+        "min": np.min(scores),
+        "25%": np.percentile(scores, 25),
+        "50%": np.median(scores),
+        "75%": np.percentile(scores, 75),
+        "max": np.max(scores),
+    }
+
+
+def test_fixture_hits_half_way_values(people):
+    score = 1 - (len(people[people["a"] == "x"]) / len(people)) * (1 - 1 / 60)
+    assert round(score, 2) != np.round(score, 2)
+
+
+def test_single_attribute_scores_match_per_row_scoring(people):
+    result = generate_single_attribute_MM_risk_scores(people, "id", ["a", "b"])
+
+    assert "Error" not in result, result
+    assert result["Descriptive statistics of the risk scores"] == {
+        col: descriptive_stats(reference_single_scores(people, "id", col)) for col in ["a", "b"]
+    }
+
+
+@pytest.mark.parametrize("eval_cols", [["a"], ["a", "b"]])
+def test_multiple_attribute_scores_match_per_row_scoring(people, eval_cols):
+    result = generate_multiple_attribute_MM_risk_scores(people, "id", eval_cols)
+
+    assert "Error" not in result, result
+    scores = reference_multiple_scores(people, "id", eval_cols)
+    assert result["Descriptive statistics of the risk scores"] == descriptive_stats(scores)
+    assert result["Dataset Risk Score"] == np.linalg.norm(scores) / np.linalg.norm(np.ones(len(scores)))
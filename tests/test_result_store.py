@@ -0,0 +1,42 @@
+import os
+import threading
+
+import pytest
+
+from aidrin.result_store import ResultStore
+
+
+def test_connections_are_per_thread(tmp_path):
+    store = ResultStore(str(tmp_path / "results.sqlite3"), "1.0")
+    store.put("data:abc:.csv", "Duplicity", "{}", {"Duplicity scores": 1.0})
+    main_conn = store._connection()
+
+    seen = {}
+
+    def worker():
+        seen["conn"] = store._connection()
+        seen["value"] = store.get("data:abc:.csv", "Duplicity", "{}")
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+
+    assert seen["conn"] is not main_conn
+    assert seen["value"] == {"Duplicity scores": 1.0}
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_forked_process_opens_its_own_connection(tmp_path):
+    store = ResultStore(str(tmp_path / "results.sqlite3"), "1.0")
+    store.put("data:abc:.csv", "Duplicity", "{}", {"Duplicity scores": 1.0})
+    parent_conn = store._connection()
+
+    pid = os.fork()
+    if pid == 0:
+        ok = store._connection() is not parent_conn
+        ok = ok and store.put("data:abc:.csv", "Outliers", "{}", {"Outlier scores": {}})
+        os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+
+    assert os.WEXITSTATUS(status) == 0
+    assert store.get("data:abc:.csv", "Outliers", "{}") == {"Outlier scores": {}}
@@ -0,0 +1,74 @@
+import json
+import time
+import zlib
+
+import numpy as np
+
+from aidrin.results_cache import RESULTS_CACHE_REDIS_PREFIX, SharedResultsCache
+
+
+class FakeRedis:
+    # the few Redis commands SharedResultsCache uses, without expiry
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, px=None):
+        self.data[key] = value
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def scan_iter(self, match=None, count=None):
+        prefix = match.rstrip("*")
+        return [key.encode() for key in self.data if key.startswith(prefix)]
+
+
+def test_entries_are_shared_as_json():
+    client = FakeRedis()
+    writer = SharedResultsCache(client)
+    result = {"Duplicity scores": {"Overall duplicity of the dataset": np.float64(0.25)}, "rows": np.int64(3)}
+    writer.set("data:abc:.csv|Duplicity:{}", {"data": result, "timestamp": time.time()})
+
+    payload = client.data[f"{RESULTS_CACHE_REDIS_PREFIX}data:abc:.csv|Duplicity:{{}}"]
+    assert json.loads(zlib.decompress(payload))["value"]["data"] == {
+        "Duplicity scores": {"Overall duplicity of the dataset": 0.25}, "rows": 3
+    }
+
+    reader = SharedResultsCache(client)
+    assert reader["data:abc:.csv|Duplicity:{}"]["data"]["rows"] == 3
+
+
+def test_pickled_entries_are_not_loaded():
+    client = FakeRedis()
+    key = "data:abc:.csv|Duplicity:{}"
+    client.data[f"{RESULTS_CACHE_REDIS_PREFIX}{key}"] = zlib.compress(b"\x80\x05K\x01.")
+
+    assert key not in SharedResultsCache(client)
+    assert not client.data
+
+
+def test_entries_that_are_not_json_stay_local():
+    client = FakeRedis()
+    cache = SharedResultsCache(client)
+    cache.set("local", {"data": object()})
+
+    assert not client.data
+    assert "local" in cache
+
+
+def test_evicted_entries_are_removed_from_redis():
+    client = FakeRedis()
+    cache = SharedResultsCache(client, user_max_bytes=10_000)
+    cache.set("data:a:.csv|Duplicity:{}", {"data": "x" * 6_000}, user="1")
+    cache.set("data:b:.csv|Duplicity:{}", {"data": "x" * 6_000}, user="1")
+
+    # the older entry is over the user's budget in every process, not just this one
+    assert "data:a:.csv|Duplicity:{}" not in SharedResultsCache(client)
+    assert "data:b:.csv|Duplicity:{}" in SharedResultsCache(client)
+    assert cache.stats()["evictions"] == 1